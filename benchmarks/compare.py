@@ -0,0 +1,76 @@
+"""
+Compares two benchmark result files and flags regressions.
+
+    python -m benchmarks.compare benchmarks/results/base.json benchmarks/results/new.json --threshold 10
+
+Exits with status 1 when any throughput drops, or any latency or peak RSS
+grows, by more than the threshold (in percent).
+"""
+import argparse
+import json
+import sys
+from typing import Iterator, List, Tuple
+
+# (metric path, True when higher is better)
+METRICS = (
+    ("comments_per_sec", True),
+    ("scan_comments_per_sec", True),
+    ("storage_write_latency.p99_ms", False),
+    ("request_latency.p99_ms", False),
+    ("lookup_latency.p99_ms", False),
+    ("peak_rss_mb", False),
+)
+
+
+def _lookup(result: dict, path: str):
+    value = result
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def compare(base: dict, new: dict, threshold: float) -> Iterator[Tuple[str, str, float, float, float, bool]]:
+    """Yields (case, metric, base value, new value, change %, regression) for metrics present in both runs."""
+    for case, base_result in base["results"].items():
+        new_result = new["results"].get(case)
+        if new_result is None:
+            continue
+        for path, higher_is_better in METRICS:
+            old_value, new_value = _lookup(base_result, path), _lookup(new_result, path)
+            if not old_value or new_value is None:
+                continue
+            change = 100 * (new_value - old_value) / old_value
+            regression = -change > threshold if higher_is_better else change > threshold
+            yield case, path, old_value, new_value, change, regression
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Compare two benchmark result files')
+    parser.add_argument('base', type=str)
+    parser.add_argument('new', type=str)
+    parser.add_argument('--threshold', type=float, default=10.0, help='Allowed change in percent')
+    args = parser.parse_args(argv)
+
+    with open(args.base, 'r', encoding='utf-8') as f:
+        base = json.load(f)
+    with open(args.new, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+
+    print(f"{base.get('commit')} -> {new.get('commit')}")
+    print(f"{'case':<16}{'metric':<32}{'base':>12}{'new':>12}{'change':>10}")
+    regressions = 0
+    for case, path, old_value, new_value, change, regression in compare(base, new, args.threshold):
+        marker = "✗" if regression else " "
+        print(f"{case:<16}{path:<32}{old_value:>12.1f}{new_value:>12.1f}{change:>9.1f}% {marker}")
+        regressions += regression
+    if regressions:
+        print(f"✗ {regressions} regression(s) above {args.threshold}%")
+        return 1
+    print("✓ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
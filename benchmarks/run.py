@@ -0,0 +1,297 @@
+"""
+Offline benchmark suite.
+
+Replays recorded VK, YouTube and Telegram payloads from local stand-ins and
+runs synthetic storage workloads, each case in a fresh process so peak RSS is
+per case. Results are written as JSON; compare two runs with benchmarks.compare.
+
+    python -m benchmarks.run
+    python -m benchmarks.run --cases storage --sizes 1k,100k,1m
+    python -m benchmarks.run --cases vk,youtube --comments 5000 --latency 0.05
+"""
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+try:
+    import resource
+    _HAS_RESOURCE = True
+except Exception:
+    _HAS_RESOURCE = False
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+CASES = ("vk", "youtube", "telegram", "storage")
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Nearest-rank p50/p90/p99/max of latency samples, in milliseconds."""
+    if not samples:
+        return {"p50_ms": 0.0, "p90_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+
+    def rank(q):
+        return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))] * 1000
+
+    return {"p50_ms": rank(0.5), "p90_ms": rank(0.9), "p99_ms": rank(0.99), "max_ms": ordered[-1] * 1000}
+
+
+def peak_rss_mb() -> Optional[float]:
+    if not _HAS_RESOURCE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _timed_storage(db_path: str):
+    from comment_parser.storage.comments_storage import CommentsStorage
+
+    class TimedStorage(CommentsStorage):
+        """CommentsStorage recording the latency of every batch write."""
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.write_latencies: List[float] = []
+
+        def create_comments(self, create_comment_objs) -> int:
+            started = time.perf_counter()
+            stored = super().create_comments(create_comment_objs)
+            self.write_latencies.append(time.perf_counter() - started)
+            return stored
+
+    return TimedStorage(db_path=db_path)
+
+
+def _request_latency(platform_name: str) -> Dict[str, float]:
+    from comment_parser.monitoring.metrics import HTTP_REQUEST_SECONDS
+    return {
+        "p50_ms": HTTP_REQUEST_SECONDS.quantile(0.5, platform=platform_name) * 1000,
+        "p90_ms": HTTP_REQUEST_SECONDS.quantile(0.9, platform=platform_name) * 1000,
+        "p99_ms": HTTP_REQUEST_SECONDS.quantile(0.99, platform=platform_name) * 1000,
+    }
+
+
+def _parser_result(saved: int, elapsed: float, requests: int, storage) -> dict:
+    return {
+        "comments": saved,
+        "seconds": elapsed,
+        "comments_per_sec": saved / elapsed if elapsed else 0.0,
+        "requests": requests,
+        "storage_write_latency": percentiles(storage.write_latencies),
+    }
+
+
+def bench_vk(workdir: str, comments: int, latency: float) -> dict:
+    from benchmarks.servers import ReplayServer
+    from comment_parser.monitoring.metrics import METRICS
+    from comment_parser.vk.api_vk import ApiVKParser
+
+    METRICS.enable()
+    storage = _timed_storage(os.path.join(workdir, "vk"))
+    parser = ApiVKParser(storage=storage)
+    with ReplayServer(total=comments, latency=latency) as server:
+        parser.api_url = server.vk_url
+        started = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            saved = parser.save_json("-123456", "789", "token", "", max_comments=comments)
+        elapsed = time.perf_counter() - started
+    result = _parser_result(saved, elapsed, server.requests, storage)
+    result["request_latency"] = _request_latency("vk")
+    return result
+
+
+def bench_youtube(workdir: str, comments: int, latency: float) -> dict:
+    from benchmarks.servers import ReplayServer
+    from comment_parser.monitoring.metrics import METRICS
+    from comment_parser.youtube.api_youtube import YouTubeAPIParser
+
+    METRICS.enable()
+    storage = _timed_storage(os.path.join(workdir, "youtube"))
+    parser = YouTubeAPIParser(storage=storage)
+    with ReplayServer(total=comments, latency=latency) as server:
+        parser.base_url = server.youtube_url
+        started = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            saved = parser.parse_comments("dQw4w9WgXcQ", "key", max_comments=comments)
+        elapsed = time.perf_counter() - started
+    result = _parser_result(saved, elapsed, server.requests, storage)
+    result["request_latency"] = _request_latency("youtube")
+    return result
+
+
+def bench_telegram(workdir: str, comments: int, latency: float) -> dict:
+    from benchmarks.servers import FakeTelegramClient
+    from comment_parser.telegram.api_telegram import TelegramCommentsParser
+
+    posts = max(1, comments // 100)
+    storage = _timed_storage(os.path.join(workdir, "telegram"))
+    parser = TelegramCommentsParser(0, "", storage=storage)
+    parser.client = FakeTelegramClient(posts=posts, comments_per_post=comments // posts, latency=latency)
+    started = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        saved = asyncio.run(parser.parse_comments("techdigest", posts_limit=posts,
+                                                  comments_limit=comments // posts, sleep=0))
+    elapsed = time.perf_counter() - started
+    return _parser_result(saved, elapsed, parser.client.requests, storage)
+
+
+class _IdSample:
+    """Storage listener keeping a uniform sample of written ids (reservoir sampling)."""
+
+    def __init__(self, size: int, seed: int = 0):
+        self.size = size
+        self.seen = 0
+        self.ids: List[str] = []
+        self._rng = random.Random(seed)
+
+    def on_write(self, comments: List[dict]) -> None:
+        for comment in comments:
+            self.seen += 1
+            if len(self.ids) < self.size:
+                self.ids.append(comment['id'])
+            else:
+                slot = self._rng.randrange(self.seen)
+                if slot < self.size:
+                    self.ids[slot] = comment['id']
+
+
+def bench_storage(workdir: str, size: int, batch_size: int = 1000, lookups: int = 20) -> dict:
+    from benchmarks.workloads import batches, synthetic_comments
+
+    db_path = os.path.join(workdir, "storage")
+    storage = _timed_storage(db_path)
+    sample = _IdSample(lookups)
+    storage.add_listener(sample)
+
+    started = time.perf_counter()
+    stored = 0
+    for batch in batches(synthetic_comments(size), batch_size):
+        stored += storage.create_comments(batch)
+    write_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    matched = sum(1 for _ in storage.iter_comments(source="vk", min_likes=5))
+    scan_seconds = time.perf_counter() - started
+
+    lookup_latencies = []
+    for comment_id in sample.ids:
+        started = time.perf_counter()
+        storage.get_comment(comment_id)
+        lookup_latencies.append(time.perf_counter() - started)
+
+    return {
+        "comments": stored,
+        "batch_size": batch_size,
+        "write_seconds": write_seconds,
+        "comments_per_sec": stored / write_seconds if write_seconds else 0.0,
+        "storage_write_latency": percentiles(storage.write_latencies),
+        "scan_seconds": scan_seconds,
+        "scan_matched": matched,
+        "scan_comments_per_sec": stored / scan_seconds if scan_seconds else 0.0,
+        "lookup_latency": percentiles(lookup_latencies),
+        "db_bytes": storage.disk_bytes(),
+    }
+
+
+BENCHMARKS = {
+    "vk": bench_vk,
+    "youtube": bench_youtube,
+    "telegram": bench_telegram,
+    "storage": bench_storage,
+}
+
+
+def _run_case(name: str, kwargs: dict) -> dict:
+    with tempfile.TemporaryDirectory() as workdir:
+        result = BENCHMARKS[name](workdir, **kwargs)
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def run_case(name: str, kwargs: dict, isolate: bool = True) -> dict:
+    """Runs one case, by default in a fresh spawned process so peak RSS only covers that case."""
+    if not isolate:
+        return _run_case(name, kwargs)
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(_run_case, (name, kwargs))
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_suite(cases, sizes, comments: int, latency: float, batch_size: int, isolate: bool = True) -> dict:
+    runs = []
+    for name in cases:
+        if name == "storage":
+            runs.extend((f"storage_{size}", name, {"size": size, "batch_size": batch_size}) for size in sizes)
+        else:
+            runs.append((name, name, {"comments": comments, "latency": latency}))
+
+    results = {}
+    for key, name, kwargs in runs:
+        print(f"Running {key} {kwargs}...")
+        results[key] = run_case(name, kwargs, isolate)
+        print(f"✓ {key}: {results[key]['comments_per_sec']:.0f} comments/s, "
+              f"peak RSS {results[key]['peak_rss_mb'] or 0:.1f} MB")
+    return {
+        "commit": git_commit(),
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {"comments": comments, "latency": latency, "batch_size": batch_size, "sizes": sizes},
+        "results": results,
+    }
+
+
+def main():
+    from benchmarks.workloads import parse_size
+
+    parser = argparse.ArgumentParser(description='Offline benchmarks for parsers and storage')
+    parser.add_argument('--cases', type=str, default=",".join(CASES),
+                       help=f'Comma separated cases ({", ".join(CASES)})')
+    parser.add_argument('--sizes', type=str, default='1k',
+                       help='Storage workload sizes, e.g. 1k,100k,1m')
+    parser.add_argument('--comments', type=int, default=2000, help='Comments served per parser case')
+    parser.add_argument('--latency', type=float, default=0.01, help='Stand-in server latency per request in seconds')
+    parser.add_argument('--batch_size', type=int, default=1000, help='Storage workload batch size')
+    parser.add_argument('--no_isolate', action='store_true', help='Run cases in this process (peak RSS is then cumulative)')
+    parser.add_argument('--out', type=str, help='Result file (default: benchmarks/results/<commit>-<time>.json)')
+    args = parser.parse_args()
+
+    cases = [case.strip() for case in args.cases.split(",") if case.strip()]
+    unknown = [case for case in cases if case not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+    sizes = [parse_size(size) for size in args.sizes.split(",") if size.strip()]
+
+    report = run_suite(cases, sizes, args.comments, args.latency, args.batch_size, not args.no_isolate)
+    out = args.out or os.path.join(
+        RESULTS_DIR, f"{report['commit'] or 'unknown'}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"✓ Results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Local stand-ins for the platform APIs, replaying recorded payloads.
+
+The VK and YouTube servers speak just enough of wall.getComments and
+commentThreads for the parsers to page through `total` comments; every
+item is a copy of a recorded fixture item with a fresh id. Telegram has
+no HTTP API to point Telethon at, so FakeTelegramClient replays recorded
+messages through the same async interface TelegramCommentsParser uses.
+"""
+import asyncio
+import copy
+import gzip
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture(name: str) -> dict:
+    with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    server: "ReplayServer"
+    # Keep-alive, like the real APIs
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if parsed.path == "/method/wall.getComments":
+            body = self.server.vk_page(params)
+        elif parsed.path == "/youtube/v3/commentThreads":
+            body = self.server.youtube_page(params)
+        else:
+            self.send_error(404)
+            return
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            payload = gzip.compress(payload, compresslevel=1)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """
+    Serves `total` comments per thread on 127.0.0.1 with `latency` seconds per request.
+
+    Use as a context manager; vk_url and youtube_url go into ApiVKParser.api_url
+    and YouTubeAPIParser.base_url.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, total: int = 1000, latency: float = 0.0):
+        super().__init__(("127.0.0.1", 0), _ReplayHandler)
+        self.total = total
+        self.latency = latency
+        self.requests = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+        self._vk = load_fixture("vk_wall_getComments.json")["response"]
+        self._youtube = load_fixture("youtube_commentThreads.json")
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def vk_url(self) -> str:
+        return f"{self.base_url}/method/wall.getComments"
+
+    @property
+    def youtube_url(self) -> str:
+        return f"{self.base_url}/youtube/v3/commentThreads"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="ReplayServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+    def vk_page(self, params: dict) -> dict:
+        self.requests += 1
+        offset = int(params.get("offset", 0))
+        count = min(int(params.get("count", 100)), 100)
+        templates = self._vk["items"]
+        items = []
+        for i in range(offset, min(offset + count, self.total)):
+            item = copy.deepcopy(templates[i % len(templates)])
+            item["id"] = i + 1
+            item["date"] += i
+            items.append(item)
+        return {"response": {**self._vk, "count": self.total, "items": items}}
+
+    def youtube_page(self, params: dict) -> dict:
+        self.requests += 1
+        offset = int(params.get("pageToken") or 0)
+        count = min(int(params.get("maxResults", 20)), 100)
+        templates = self._youtube["items"]
+        items = []
+        for i in range(offset, min(offset + count, self.total)):
+            item = copy.deepcopy(templates[i % len(templates)])
+            item["id"] = item["snippet"]["topLevelComment"]["id"] = f"Ugz{i}"
+            items.append(item)
+        body = {**self._youtube, "items": items, "pageInfo": {"totalResults": len(items), "resultsPerPage": count}}
+        if offset + count < self.total:
+            body["nextPageToken"] = str(offset + count)
+        else:
+            body.pop("nextPageToken", None)
+        return body
+
+
+class FakeTelegramClient:
+    """
+    Replays recorded channel posts and discussion comments with `latency`
+    seconds per message batch, mimicking the parts of TelegramClient the parser uses.
+    """
+
+    def __init__(self, posts: int = 10, comments_per_post: int = 100, latency: float = 0.0):
+        from telethon.tl.types import Message, PeerChannel, PeerUser
+
+        self._message = Message
+        self._peer_channel = PeerChannel
+        self._peer_user = PeerUser
+        self.posts = posts
+        self.comments_per_post = comments_per_post
+        self.latency = latency
+        self.requests = 0
+        self._fixture = load_fixture("telegram_messages.json")
+
+    def _build(self, raw: dict, message_id: int):
+        from_id = raw.get("from_id")
+        message = self._message(
+            id=message_id,
+            peer_id=self._peer_channel(1),
+            date=datetime.fromisoformat(raw["date"]),
+            message=raw["text"],
+            from_id=self._peer_user(from_id["user_id"]) if from_id else None,
+        )
+        message._text = message.message
+        return message
+
+    async def get_entity(self, entity):
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        user_id = getattr(entity, "user_id", None)
+        if user_id is None:
+            return SimpleNamespace(id=1, username=self._fixture["channel"])
+        user = self._fixture["users"].get(str(user_id))
+        if user is None:
+            raise ValueError(f"Unknown user {user_id}")
+        return SimpleNamespace(id=user_id, **user)
+
+    async def iter_messages(self, entity, limit: Optional[int] = None, reply_to: Optional[int] = None):
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if reply_to is None:
+            templates, total = self._fixture["posts"], self.posts
+        else:
+            templates, total = self._fixture["comments"], self.comments_per_post
+        for i in range(min(total, limit or total)):
+            yield self._build(templates[i % len(templates)], i + 1)
+
+    async def disconnect(self):
+        pass
@@ -0,0 +1,61 @@
+"""Synthetic comment workloads for storage benchmarks."""
+import random
+from datetime import datetime, timezone
+from typing import Iterator, List
+
+from comment_parser.storage.models import CommentRecord
+
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+_WORDS = (
+    "спасибо отличный пост видео когда будет продолжение согласен не всё так просто "
+    "great video thanks love this part who is watching in 2024 the bass line "
+    "danke super gracias por el video merci beaucoup pour la vidéo"
+).split()
+
+_SOURCES = ("vk", "youtube", "telegram")
+
+# Thirty days of comments ending 2024-06-01 UTC
+_END = int(datetime(2024, 6, 1, tzinfo=timezone.utc).timestamp())
+_SPAN = 30 * 86400
+
+
+def parse_size(value: str) -> int:
+    """Parses 1000, 1k, 100k or 1m."""
+    value = value.strip().lower()
+    if value in SIZES:
+        return SIZES[value]
+    return int(value)
+
+
+def synthetic_comments(count: int, seed: int = 0, urls: int = 100) -> Iterator[CommentRecord]:
+    """
+    Yields `count` reproducible comments spread over sources, `urls` threads and thirty days.
+
+    Likes follow a heavy-tailed distribution and texts are 3-40 words, close
+    to what the parsers collect from real threads.
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        source = _SOURCES[i % len(_SOURCES)]
+        timestamp = _END - rng.randrange(_SPAN)
+        yield CommentRecord(
+            url=f"https://example.com/{source}/{rng.randrange(urls)}",
+            content=" ".join(rng.choices(_WORDS, k=rng.randint(3, 40))),
+            likes=int(rng.paretovariate(1.5)) - 1,
+            date=datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+            source=source,
+            author=f"user{rng.randrange(count // 10 + 1)}",
+            timestamp=timestamp,
+        )
+
+
+def batches(records: Iterator[CommentRecord], size: int) -> Iterator[List[CommentRecord]]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,202 @@
+import json
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from logging import getLogger
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from comment_parser.crawler.orchestrator import CrawlOrchestrator
+from comment_parser.crawler.spec import iter_job_manifest, job_platform
+from comment_parser.storage.comments_storage import CommentsStorage
+from comment_parser.storage.segments import remove_segment
+
+_logger = getLogger("JobManifest")
+
+# Per-process state of a pool worker, set up once by _init_worker().
+_worker_orchestrator: Optional[CrawlOrchestrator] = None
+
+
+def _iter_chunks(path: str, chunk_size: int, failures: List[Dict],
+                 group: Optional[Callable[[Dict], str]] = None) -> Iterator[Tuple[str, List[Tuple[int, Dict]]]]:
+    # Chunks hold jobs of one group only (see run_manifest: Telegram jobs go to their own worker)
+    chunks: Dict[str, List[Tuple[int, Dict]]] = {}
+    for line_no, job, error in iter_job_manifest(path):
+        if error:
+            failures.append({"line": line_no, "job": None, "platform": None, "saved": 0, "error": error, "elapsed": 0.0})
+            continue
+        key = group(job) if group else ""
+        chunk = chunks.setdefault(key, [])
+        chunk.append((line_no, job))
+        if len(chunk) >= chunk_size:
+            yield key, chunk
+            chunks[key] = []
+    for key, chunk in chunks.items():
+        if chunk:
+            yield key, chunk
+
+
+def _failed_chunk(chunk: List[Tuple[int, Dict]], config: Dict, error: str) -> List[Dict]:
+    return [{"line": line_no, "job": job, "platform": job_platform(job, config), "saved": 0, "error": error,
+             "elapsed": 0.0} for line_no, job in chunk]
+
+
+def _run_chunk(orchestrator: CrawlOrchestrator, chunk: List[Tuple[int, Dict]]) -> List[Dict]:
+    report = orchestrator.run_sync([job for _, job in chunk])
+    results = report["jobs"]
+    for (line_no, _), result in zip(chunk, results):
+        result["line"] = line_no
+        result["worker"] = os.getpid()
+    return results
+
+
+def _init_worker(config: Dict, segment_dir: str, data_root: str, translate_to: Optional[str], dedup: Optional[str],
+                 max_concurrency: int, http_options: Optional[Dict] = None):
+    global _worker_orchestrator
+    if http_options:
+        from comment_parser.network.http_client import configure_default_client
+        configure_default_client(**http_options)
+    storage = CommentsStorage(db_path=os.path.join(segment_dir, f"segment-{os.getpid()}"))
+    if dedup:
+        from comment_parser.storage.dedup import NearDuplicateDetector
+        storage.add_processor(NearDuplicateDetector(action=dedup))
+    if translate_to:
+        from comment_parser.translation.translator import TranslationService, default_cache
+        # The cache belongs to the main storage, the segments are removed after the merge
+        storage.add_processor(TranslationService(translate_to, cache=default_cache(data_root)))
+    _worker_orchestrator = CrawlOrchestrator(config, storage=storage, max_concurrency=max_concurrency)
+
+
+def _worker_run_chunk(chunk: List[Tuple[int, Dict]]) -> List[Dict]:
+    return _run_chunk(_worker_orchestrator, chunk)
+
+
+def run_manifest(
+    path: str,
+    config: Dict,
+    storage: Optional[CommentsStorage] = None,
+    workers: int = 1,
+    chunk_size: int = 8,
+    max_concurrency: int = 8,
+    translate_to: Optional[str] = None,
+    dedup: Optional[str] = None,
+    http_client=None,
+    http_options: Optional[Dict] = None,
+) -> Dict:
+    """
+    Runs every job of a JSONL manifest and summarizes the results per job.
+
+    With workers > 1 chunks of jobs are sharded across a process pool. Each worker
+    process writes to its own storage segment next to the main DB; the segments are
+    merged into the main storage once all jobs are done, also when a worker failed
+    (its jobs are reported as failed). Telegram jobs all run in one extra worker
+    process, since every process would otherwise open the same Telethon session file.
+
+    Args:
+        path: Path to the JSONL manifest
+        config: Credentials config (see config.json)
+        storage: Main storage, segments are merged into it
+        workers: Number of worker processes (1 runs everything in this process)
+        chunk_size: Jobs handed to a worker at a time
+        max_concurrency: Concurrent jobs inside one process
+        translate_to: Target language for the translation processor in workers
+        dedup: Near-duplicate action ("tag" or "drop") in workers; each worker detects on its own shard
+        http_client: HttpClient for in-process runs (the process-wide default when None)
+        http_options: HttpClient keyword arguments for the default client of each worker process
+
+    Returns:
+        Dict with per-job results sorted by manifest line and totals
+    """
+    storage = storage or CommentsStorage()
+    started = time.perf_counter()
+    results: List[Dict] = []
+
+    if workers <= 1:
+        orchestrator = CrawlOrchestrator(config, storage=storage, max_concurrency=max_concurrency,
+                                         http_client=http_client)
+        for _, chunk in _iter_chunks(path, chunk_size, results):
+            results.extend(_run_chunk(orchestrator, chunk))
+    else:
+        segment_dir = f"{storage.db_path}.segments"
+        os.makedirs(segment_dir, exist_ok=True)
+        initargs = (config, segment_dir, storage.db_path, translate_to, dedup, max_concurrency, http_options)
+        pools: Dict[str, ProcessPoolExecutor] = {}
+        pending: Dict = {}
+
+        def collect(futures) -> None:
+            for future in futures:
+                chunk = pending.pop(future)
+                try:
+                    results.extend(future.result())
+                except Exception as e:
+                    # A crashed worker (or a broken pool) fails its chunk, not the whole run
+                    _logger.error(f"Worker failed on lines {chunk[0][0]}-{chunk[-1][0]}: {e}")
+                    results.extend(_failed_chunk(chunk, config, f"Worker failed: {e!r}"))
+
+        def group(job: Dict) -> str:
+            return "telegram" if job_platform(job, config) == "telegram" else ""
+
+        try:
+            for key, chunk in _iter_chunks(path, chunk_size, results, group):
+                # Keep the manifest streaming: only a couple of chunks per worker in flight
+                if len(pending) >= workers * 2:
+                    done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                    collect(done)
+                pool = pools.get(key)
+                if pool is None:
+                    pool = pools[key] = ProcessPoolExecutor(max_workers=1 if key else workers,
+                                                            initializer=_init_worker, initargs=initargs)
+                try:
+                    pending[pool.submit(_worker_run_chunk, chunk)] = chunk
+                except Exception as e:
+                    results.extend(_failed_chunk(chunk, config, f"Worker failed: {e!r}"))
+            collect(list(pending))
+        finally:
+            for pool in pools.values():
+                pool.shutdown(wait=True)
+            # Whatever the workers finished is kept
+            merged = merge_segments(storage, segment_dir)
+            _logger.info(f"Merged {merged} comments from worker segments")
+
+    results.sort(key=lambda result: result["line"])
+    elapsed = time.perf_counter() - started
+    total_saved = sum(result["saved"] for result in results)
+    return {
+        "jobs": results,
+        "total_jobs": len(results),
+        "failed_jobs": sum(1 for result in results if result["error"]),
+        "total_saved": total_saved,
+        "elapsed": elapsed,
+        "comments_per_sec": total_saved / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def merge_segments(storage: CommentsStorage, segment_dir: str) -> int:
+    """Merges and removes every worker segment in segment_dir. Returns the number of merged comments."""
+    merged = 0
+    for name in sorted(os.listdir(segment_dir)):
+        segment_path = os.path.join(segment_dir, name)
+        # Worker data roots are segment-<pid>; .seg and .json files are left over from earlier versions
+        if not name.startswith("segment-") or name.endswith(".legacy"):
+            continue
+        merged += storage.merge_segment(segment_path)
+        if os.path.isdir(segment_path):
+            shutil.rmtree(segment_path)
+        remove_segment(f"{segment_path}.legacy")
+    try:
+        os.rmdir(segment_dir)
+    except OSError:
+        pass
+    return merged
+
+
+def print_manifest_report(report: Dict) -> None:
+    print(f"\n{'='*60}")
+    for result in report["jobs"]:
+        status = f"✗ {result['error']}" if result["error"] else f"✓ saved {result['saved']}"
+        target = {k: v for k, v in (result["job"] or {}).items() if k not in ("token", "youtube_api_key")}
+        print(f"line {result['line']:<5} {str(result['platform']):<9} {result['elapsed']:6.1f}s  {status}  {json.dumps(target, ensure_ascii=False)}")
+    print(f"\nJobs: {report['total_jobs']} ({report['failed_jobs']} failed)")
+    print(f"✓ Saved {report['total_saved']} comments in {report['elapsed']:.1f}s "
+          f"({report['comments_per_sec']:.1f} comments/sec)")
+    print(f"{'='*60}\n")
@@ -0,0 +1,202 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from logging import getLogger
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from comment_parser.crawler.spec import extract_video_id, job_platform, validate_job, youtube_api_key
+from comment_parser.storage.comments_storage import CommentsStorage
+
+# Jobs per platform that may run at the same time. Selenium starts a whole browser per job.
+DEFAULT_PLATFORM_LIMITS = {
+    "telegram": 4,
+    "vk": 4,
+    "youtube": 4,
+    "selenium": 1,
+}
+
+
+class CrawlOrchestrator:
+    """
+    Runs many crawl jobs across platforms concurrently in one event loop.
+
+    Telegram jobs run natively on the loop and share one connected client; the
+    blocking parsers (VK, YouTube API, Selenium) run in a thread pool. Concurrency
+    is bounded globally and per platform, and all jobs write to one storage.
+    The API parsers share `http_client` (an HttpClient, the process-wide default when None).
+    """
+
+    def __init__(
+        self,
+        config: Optional[Dict] = None,
+        storage: Optional[CommentsStorage] = None,
+        max_concurrency: int = 8,
+        platform_limits: Optional[Dict[str, int]] = None,
+        session_name: str = "comments_parser",
+        http_client=None,
+    ):
+        self._logger = getLogger("CrawlOrchestrator")
+        self.config = config or {}
+        self.storage = storage or CommentsStorage()
+        self.max_concurrency = max_concurrency
+        self.platform_limits = dict(DEFAULT_PLATFORM_LIMITS)
+        self.platform_limits.update(platform_limits or {})
+        self.session_name = session_name
+        self.http_client = http_client
+        self._telegram_parser = None
+        self._telegram_lock: Optional[asyncio.Lock] = None
+
+    def job_platform(self, job: Dict) -> str:
+        return job_platform(job, self.config)
+
+    def _youtube_api_key(self, job: Dict) -> Optional[str]:
+        return youtube_api_key(job, self.config)
+
+    def validate_job(self, job: Dict) -> Optional[str]:
+        return validate_job(job, self.config)
+
+    async def run(self, jobs: Iterable[Dict]) -> Dict:
+        """
+        Runs all jobs and returns an aggregate report.
+
+        Args:
+            jobs: Iterable of job dicts, see validate_job()
+
+        Returns:
+            Dict with per-job results, totals and throughput
+        """
+        jobs = list(jobs)
+        started = time.perf_counter()
+        global_limit = asyncio.Semaphore(self.max_concurrency)
+        limits = {platform: asyncio.Semaphore(limit) for platform, limit in self.platform_limits.items()}
+        self._telegram_lock = asyncio.Lock()
+        blocking_workers = sum(limit for platform, limit in self.platform_limits.items() if platform != "telegram")
+        executor = ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, blocking_workers)),
+                                      thread_name_prefix="crawler")
+
+        async def run_one(job: Dict) -> Dict:
+            platform = self.job_platform(job)
+            result = {"job": job, "platform": platform, "saved": 0, "error": None, "elapsed": 0.0}
+            error = self.validate_job(job)
+            if error:
+                result["error"] = error
+                return result
+            async with global_limit, limits.setdefault(platform, asyncio.Semaphore(1)):
+                job_started = time.perf_counter()
+                try:
+                    if platform == "telegram":
+                        result["saved"] = await self._run_telegram(job)
+                    else:
+                        loop = asyncio.get_running_loop()
+                        result["saved"], result["error"] = await loop.run_in_executor(
+                            executor, self._run_blocking, platform, job)
+                except Exception as e:
+                    self._logger.error(f"Job {job} failed: {e}")
+                    result["error"] = str(e)
+                result["elapsed"] = time.perf_counter() - job_started
+            return result
+
+        try:
+            results = await asyncio.gather(*(run_one(job) for job in jobs))
+        finally:
+            executor.shutdown(wait=True)
+            await self._close_telegram()
+
+        return self._build_report(results, time.perf_counter() - started)
+
+    def run_sync(self, jobs: Iterable[Dict]) -> Dict:
+        return asyncio.run(self.run(jobs))
+
+    async def _get_telegram_parser(self):
+        async with self._telegram_lock:
+            if self._telegram_parser is None:
+                from comment_parser.telegram.api_telegram import TelegramCommentsParser
+                parser = TelegramCommentsParser(
+                    self.config["telegram_api_id"],
+                    self.config["telegram_api_hash"],
+                    session_name=self.session_name,
+                    storage=self.storage,
+                )
+                await parser.connect()
+                self._telegram_parser = parser
+        return self._telegram_parser
+
+    async def _close_telegram(self):
+        if self._telegram_parser is not None:
+            try:
+                await self._telegram_parser.disconnect()
+            except Exception:
+                pass
+            self._telegram_parser = None
+
+    async def _run_telegram(self, job: Dict) -> int:
+        parser = await self._get_telegram_parser()
+        return await parser.parse_comments(
+            job["channel"],
+            posts_limit=job.get("posts_limit", 20),
+            comments_limit=job.get("comments_limit", 200),
+        )
+
+    def _run_blocking(self, platform: str, job: Dict) -> Tuple[int, Optional[str]]:
+        # The API parsers report errors through last_error and keep what they saved before it
+        if platform == "vk":
+            from comment_parser.vk.api_vk import ApiVKParser
+            parser = ApiVKParser(storage=self.storage, http_client=self.http_client)
+            saved = parser.save_json(
+                str(job["owner_id"]),
+                str(job["post_id"]),
+                job.get("token") or self.config.get("vk_token"),
+                "",
+                max_comments=job.get("max_comments"),
+            )
+            return saved, parser.last_error
+        if platform == "youtube":
+            from comment_parser.youtube.api_youtube import YouTubeAPIParser
+            parser = YouTubeAPIParser(storage=self.storage, http_client=self.http_client)
+            saved = parser.parse_comments(
+                extract_video_id(job["video_url"]),
+                self._youtube_api_key(job),
+                job.get("max_comments") or 100,
+            )
+            return saved, parser.last_error
+        if platform == "selenium":
+            return self._run_selenium(job), None
+        raise ValueError(f"Unknown platform: {platform}")
+
+    def _run_selenium(self, job: Dict) -> int:
+        from comment_parser.youtube.selenium_youtube import SeleniumYouTubeParser
+        parser = SeleniumYouTubeParser(headless=job.get("headless", True), storage=self.storage)
+        return parser.save_to_json(job["video_url"], "", max_comments=job.get("max_comments"))
+
+    def _build_report(self, results: List[Dict], elapsed: float) -> Dict:
+        per_platform: Dict[str, Dict] = {}
+        for result in results:
+            stats = per_platform.setdefault(result["platform"], {"jobs": 0, "failed": 0, "saved": 0, "busy_seconds": 0.0})
+            stats["jobs"] += 1
+            stats["saved"] += result["saved"]
+            stats["busy_seconds"] += result["elapsed"]
+            if result["error"]:
+                stats["failed"] += 1
+        total_saved = sum(result["saved"] for result in results)
+        return {
+            "jobs": results,
+            "total_jobs": len(results),
+            "failed_jobs": sum(1 for result in results if result["error"]),
+            "total_saved": total_saved,
+            "elapsed": elapsed,
+            "comments_per_sec": total_saved / elapsed if elapsed > 0 else 0.0,
+            "per_platform": per_platform,
+        }
+
+
+def print_report(report: Dict) -> None:
+    print(f"\n{'='*60}")
+    print(f"Jobs: {report['total_jobs']} ({report['failed_jobs']} failed)")
+    for platform, stats in sorted(report["per_platform"].items()):
+        print(f"  {platform:<10} jobs={stats['jobs']:<4} failed={stats['failed']:<4} saved={stats['saved']}")
+    for result in report["jobs"]:
+        if result["error"]:
+            print(f"✗ {result['platform']} {result['job']}: {result['error']}")
+    print(f"✓ Saved {report['total_saved']} comments in {report['elapsed']:.1f}s "
+          f"({report['comments_per_sec']:.1f} comments/sec)")
+    print(f"{'='*60}\n")
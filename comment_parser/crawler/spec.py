@@ -0,0 +1,73 @@
+import json
+import re
+from typing import Dict, Iterator, Optional, Tuple
+
+# Only the standard library here: main.py uses this module for --check_config
+# without loading any platform client or pydantic.
+
+_VIDEO_ID_RE = re.compile(r'(?:v=|\/)([0-9A-Za-z_-]{11}).*')
+
+REQUIRED_FIELDS = {
+    "telegram": ("channel",),
+    "vk": ("owner_id", "post_id"),
+    "youtube": ("video_url",),
+}
+
+
+def extract_video_id(video_url: str) -> Optional[str]:
+    match = _VIDEO_ID_RE.search(video_url or "")
+    return match.group(1) if match else None
+
+
+def youtube_api_key(job: Dict, config: Dict) -> Optional[str]:
+    return job.get("youtube_api_key") or config.get("youtube_api_key")
+
+
+def job_platform(job: Dict, config: Dict) -> str:
+    """Platform key used for limits: YouTube jobs without an API key fall back to Selenium."""
+    platform = job.get("platform")
+    if platform == "youtube" and (job.get("selenium") or not youtube_api_key(job, config)):
+        return "selenium"
+    return platform
+
+
+def validate_job(job: Dict, config: Dict) -> Optional[str]:
+    """Returns a description of what is wrong with a job spec, or None if it can run."""
+    platform = job.get("platform")
+    if platform not in REQUIRED_FIELDS:
+        return f"Unknown platform: {platform}"
+    missing = [field for field in REQUIRED_FIELDS[platform] if not job.get(field)]
+    if missing:
+        return f"Missing fields for {platform}: {', '.join(missing)}"
+    if platform == "telegram" and not all([config.get("telegram_api_id"), config.get("telegram_api_hash")]):
+        return "Telegram credentials are not configured"
+    if platform == "vk" and not (job.get("token") or config.get("vk_token")):
+        return "VK token is not configured"
+    if platform == "youtube" and not extract_video_id(job["video_url"]):
+        return "Invalid YouTube URL"
+    return None
+
+
+def iter_job_manifest(path: str) -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """
+    Streams target specs from a JSONL manifest, one job object per line.
+
+    Blank lines and lines starting with '#' are skipped.
+
+    Yields:
+        (line number, job dict or None, parse error or None)
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                job = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(job, dict):
+                yield line_no, None, "Job must be a JSON object"
+                continue
+            yield line_no, job, None
@@ -0,0 +1,222 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from fast local writes to slow page loads
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_NULL_TIMER = nullcontext()
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(key) + ([extra] if extra else [])
+    if not items:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in items)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(items, escaped)) + "}"
+
+
+class Counter:
+    def __init__(self, registry: "MetricsRegistry", name: str, help_text: str):
+        self._registry = registry
+        self.name = name
+        self.help = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        if not self._registry.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def total(self) -> float:
+        return sum(self._values.values())
+
+
+class Histogram:
+    def __init__(self, registry: "MetricsRegistry", name: str, help_text: str,
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self._registry = registry
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [bucket counts..., +Inf count, sum]
+        self._values: Dict[LabelKey, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        if not self._registry.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += 1
+            state[-1] += value
+
+    @contextmanager
+    def _time(self, labels: Dict[str, object]) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def time(self, **labels):
+        """Context manager observing the duration of its block (a no-op when metrics are disabled)."""
+        if not self._registry.enabled:
+            return _NULL_TIMER
+        return self._time(labels)
+
+    def count(self, **labels) -> int:
+        state = self._values.get(_label_key(labels))
+        return state[-2] if state else 0
+
+    def sum(self, **labels) -> float:
+        state = self._values.get(_label_key(labels))
+        return state[-1] if state else 0.0
+
+    def quantile(self, q: float, **labels) -> float:
+        """Estimates the q-quantile by linear interpolation inside buckets, like PromQL histogram_quantile."""
+        state = self._values.get(_label_key(labels))
+        if not state or not state[-2]:
+            return 0.0
+        rank = q * state[-2]
+        lower_bound, lower_count = 0.0, 0
+        for bound, count in zip(self.buckets, state):
+            if count >= rank:
+                if count == lower_count:
+                    return bound
+                return lower_bound + (bound - lower_bound) * (rank - lower_count) / (count - lower_count)
+            lower_bound, lower_count = bound, count
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms for crawl runs, exportable as Prometheus text or JSON.
+
+    Disabled by default: every inc/observe/time call then returns after a single
+    attribute check, so instrumented hot paths cost next to nothing.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.started = time.time()
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+        self.started = time.time()
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            for metric in self._metrics.values():
+                metric._values.clear()
+        self.started = time.time()
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        return self._get(name, lambda: Counter(self, name, help_text), Counter)
+
+    def histogram(self, name: str, help_text: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(name, lambda: Histogram(self, name, help_text, buckets), Histogram)
+
+    def _get(self, name, factory, kind):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = factory()
+        if not isinstance(metric, kind):
+            raise ValueError(f"Metric {name} is already registered as {type(metric).__name__}")
+        return metric
+
+    def snapshot(self) -> dict:
+        """JSON-serializable view of all metrics plus derived throughput."""
+        uptime = time.time() - self.started
+        counters, histograms = {}, {}
+        for name, metric in sorted(self._metrics.items()):
+            if isinstance(metric, Counter):
+                counters[name] = [{"labels": dict(key), "value": value} for key, value in metric._values.items()]
+            else:
+                histograms[name] = [
+                    {"labels": dict(key), "count": state[-2], "sum": state[-1],
+                     "buckets": {str(bound): count for bound, count in zip(metric.buckets, state)}}
+                    for key, state in metric._values.items()
+                ]
+        stored = self._metrics.get("comments_stored_total")
+        return {
+            "timestamp": time.time(),
+            "uptime_seconds": uptime,
+            "comments_per_sec": stored.total() / uptime if isinstance(stored, Counter) and uptime > 0 else 0.0,
+            "counters": counters,
+            "histograms": histograms,
+        }
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (node_exporter textfile collector compatible)."""
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            if metric.help:
+                lines.append(f"# HELP {name} {metric.help}")
+            if isinstance(metric, Counter):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(metric._values.items()):
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            else:
+                lines.append(f"# TYPE {name} histogram")
+                for key, state in sorted(metric._values.items()):
+                    for bound, count in zip(metric.buckets, state):
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', str(bound)))} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {state[-2]}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {state[-1]}")
+                    lines.append(f"{name}_count{_format_labels(key)} {state[-2]}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Writes a JSON snapshot for *.json paths, Prometheus text otherwise (atomically)."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            if path.endswith(".json"):
+                json.dump(self.snapshot(), f, indent=2)
+            else:
+                f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+# Process-wide registry used by parsers and storage
+METRICS = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = METRICS.histogram("http_request_seconds", "Latency of platform API requests")
+API_ERRORS = METRICS.counter("api_errors_total", "Errors returned by platform APIs")
+COMMENTS_FETCHED = METRICS.counter("comments_fetched_total", "Comments received from platforms")
+COMMENTS_STORED = METRICS.counter("comments_stored_total", "Comments written to storage")
+STORAGE_WRITE_SECONDS = METRICS.histogram("storage_write_seconds", "Latency of storage batch writes")
+STORAGE_BYTES_WRITTEN = METRICS.counter("storage_bytes_written_total", "Bytes written by storage")
+SLEEP_SECONDS = METRICS.counter("sleep_seconds_total", "Time spent in deliberate sleeps (pacing, scroll pauses)")
+WEBDRIVER_SECONDS = METRICS.histogram("webdriver_call_seconds", "Latency of Selenium WebDriver calls")
+RETRIES = METRICS.counter("http_retries_total", "Retried platform requests")
+RATE_LIMIT_WAIT_SECONDS = METRICS.counter("rate_limit_wait_seconds_total", "Time spent waiting on rate limits")
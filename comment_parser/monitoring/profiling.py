@@ -0,0 +1,174 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter as _Counter
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterator, List, Optional
+
+PHASES_ORDER = ("fetch", "convert", "validate", "store", "translate", "scroll", "extract")
+
+_NULL_PHASE = nullcontext()
+
+
+class PhaseTimer:
+    """
+    Wall-clock time per pipeline phase (fetch, convert, validate, store, ...).
+
+    Disabled unless a Profiler is running, phase() then returns a shared no-op context.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._totals: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._totals.clear()
+
+    @contextmanager
+    def _measure(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                total = self._totals.setdefault(name, [0, 0.0])
+                total[0] += 1
+                total[1] += elapsed
+
+    def phase(self, name: str):
+        if not self.enabled:
+            return _NULL_PHASE
+        return self._measure(name)
+
+    def summary(self) -> Dict[str, dict]:
+        known = [name for name in PHASES_ORDER if name in self._totals]
+        other = sorted(name for name in self._totals if name not in PHASES_ORDER)
+        return {name: {"calls": self._totals[name][0], "seconds": self._totals[name][1]} for name in known + other}
+
+
+PHASES = PhaseTimer()
+
+
+def phase(name: str):
+    """Times the enclosed block as pipeline phase `name` while profiling is on."""
+    return PHASES.phase(name)
+
+
+class StackSampler:
+    """
+    Samples the Python stacks of all threads every `interval` seconds and
+    aggregates them as collapsed stacks ("thread;outer;inner count"),
+    the input format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: _Counter = _Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="StackSampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self.sample(names.get(thread_id, str(thread_id)), frame)
+
+    def sample(self, thread_name: str, frame) -> None:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        stack.append(thread_name)
+        self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> Dict[str, int]:
+        return dict(self.stacks)
+
+
+class Profiler:
+    """
+    Profiles a whole run: phase timings, collapsed stacks from a sampler, and
+    optionally deterministic cProfile statistics of the calling thread.
+
+    Any object with start(), stop() and collapsed() can be passed as `sampler`
+    (e.g. a wrapper around an external sampling profiler).
+    """
+
+    def __init__(self, use_cprofile: bool = True, sampler=None, interval: float = 0.005):
+        self.use_cprofile = use_cprofile
+        self.sampler = sampler or StackSampler(interval)
+        self.elapsed = 0.0
+        self._profile = None
+        self._started = None
+
+    def start(self) -> None:
+        PHASES.reset()
+        PHASES.enabled = True
+        self.sampler.start()
+        if self.use_cprofile:
+            import cProfile
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        self._started = time.perf_counter()
+
+    def stop(self) -> None:
+        if self._started is None:
+            return
+        self.elapsed = time.perf_counter() - self._started
+        self._started = None
+        if self._profile:
+            self._profile.disable()
+        self.sampler.stop()
+        PHASES.enabled = False
+
+    def write(self, prefix: str) -> List[str]:
+        """Writes <prefix>.collapsed, <prefix>.phases.json and, with cProfile, <prefix>.pstats.
+
+        Returns:
+            List[str]: written paths
+        """
+        directory = os.path.dirname(prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        paths = [f"{prefix}.collapsed", f"{prefix}.phases.json"]
+        with open(paths[0], 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.sampler.collapsed().items()):
+                f.write(f"{stack} {count}\n")
+        with open(paths[1], 'w', encoding='utf-8') as f:
+            json.dump({"elapsed_seconds": self.elapsed, "phases": PHASES.summary()}, f, indent=2)
+        if self._profile:
+            paths.append(f"{prefix}.pstats")
+            self._profile.dump_stats(paths[-1])
+        return paths
+
+    def print_summary(self, top: int = 15) -> None:
+        print(f"\n{'='*60}")
+        print(f"Profile: {self.elapsed:.2f}s wall time")
+        print(f"{'='*60}")
+        print(f"{'phase':<12}{'calls':>10}{'seconds':>12}{'% wall':>10}")
+        for name, stats in PHASES.summary().items():
+            share = 100 * stats['seconds'] / self.elapsed if self.elapsed else 0.0
+            print(f"{name:<12}{stats['calls']:>10}{stats['seconds']:>12.3f}{share:>9.1f}%")
+        if self._profile:
+            import pstats
+            print(f"\nTop {top} functions by cumulative time:")
+            pstats.Stats(self._profile, stream=sys.stdout).sort_stats("cumulative").print_stats(top)
@@ -0,0 +1,311 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from logging import getLogger
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..monitoring.metrics import RATE_LIMIT_WAIT_SECONDS, RETRIES
+
+# Failure classes returned by platform classifiers
+RATE_LIMITED = "rate_limited"
+TRANSIENT = "transient"
+
+RETRYABLE_STATUS = {500, 502, 503, 504}
+
+
+class HTTPClientError(Exception):
+    """Request failed for good (retries exhausted or a non-retryable response)"""
+
+
+class CircuitOpenError(HTTPClientError):
+    """Too many recent failures for this host, requests are short-circuited"""
+
+
+class CacheMissError(HTTPClientError):
+    """Request is not in the response cache and the cache is in replay-only mode"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses a Retry-After header (delta seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, honouring Retry-After up to max_retry_after."""
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 0.5, max_delay: float = 30.0,
+                 max_retry_after: float = 300.0, jitter: bool = True):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.jitter = jitter
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before retry number `attempt` (0 based)."""
+        if retry_after is not None:
+            return min(retry_after, self.max_retry_after)
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(0, ceiling) if self.jitter else ceiling
+
+
+class CircuitBreaker:
+    """
+    Per-host breaker: opens after `failure_threshold` consecutive failures and
+    lets a single probe request through once `reset_timeout` seconds have passed.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+# classify(data) -> RATE_LIMITED, TRANSIENT or None for API level errors in a JSON body
+Classifier = Callable[[Optional[dict]], Optional[str]]
+
+
+class HttpClient:
+    """
+    Shared JSON-over-HTTP client for the API parsers.
+
+    Connections are pooled and kept alive: every thread gets its own
+    requests.Session, all mounted on one HTTPAdapter of `pool_size` connections
+    per host, and responses are gzip encoded. With http2=True (needs httpx with
+    the h2 extra) a single thread-safe httpx client is used instead. Pass
+    `session` (anything with a requests-style get()) to route requests through
+    a fake or preconfigured session, and `cache` (a ResponseCache) to serve
+    repeated requests from disk.
+
+    Retries network errors, 429/5xx responses and API errors the platform
+    classifier marks as rate limits or transient, with exponential backoff and
+    jitter (or the server's Retry-After). Every request has a timeout, and a
+    circuit breaker per host stops hammering an API that keeps failing.
+    """
+
+    def __init__(self, timeout: Union[float, Tuple[float, float]] = (5.0, 30.0),
+                 retry: Optional[RetryPolicy] = None, failure_threshold: int = 5,
+                 reset_timeout: float = 30.0, pool_size: int = 10, http2: bool = False,
+                 session=None, cache=None, sleep: Callable[[float], None] = time.sleep):
+        self.timeout = timeout
+        self.retry = retry or RetryPolicy()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.pool_size = pool_size
+        self.cache = cache
+        self._sleep = sleep
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self._logger = getLogger("HttpClient")
+        self._session = session
+        self._sessions: List[requests.Session] = []
+        self._local = threading.local()
+        self._adapter: Optional[HTTPAdapter] = None
+        self._network_errors: Tuple[type, ...] = (requests.ConnectionError, requests.Timeout)
+        self._http2_client = self._create_http2_client() if http2 and session is None else None
+
+    def _create_http2_client(self):
+        try:
+            import httpx
+            import h2  # noqa: F401, httpx only negotiates HTTP/2 when h2 is installed
+        except Exception:
+            self._logger.warning("httpx[http2] is not installed, using HTTP/1.1 keep-alive")
+            print("⚠ httpx[http2] is not installed, using HTTP/1.1 keep-alive")
+            return None
+        connect, read = self.timeout if isinstance(self.timeout, tuple) else (self.timeout, self.timeout)
+        self._network_errors += (httpx.TransportError,)
+        return httpx.Client(
+            http2=True,
+            timeout=httpx.Timeout(read, connect=connect),
+            limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+            headers={"Accept-Encoding": "gzip, deflate"},
+        )
+
+    @property
+    def session(self):
+        """Session of the calling thread; all of them share one connection pool."""
+        if self._session is not None:
+            return self._session
+        session = getattr(self._local, "session", None)
+        if session is None:
+            with self._lock:
+                if self._adapter is None:
+                    self._adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                session = requests.Session()
+                session.headers["Accept-Encoding"] = "gzip, deflate"
+                session.mount("https://", self._adapter)
+                session.mount("http://", self._adapter)
+                self._sessions.append(session)
+            self._local.session = session
+        return session
+
+    def close(self) -> None:
+        """Closes pooled connections; the client can still be used afterwards."""
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions.clear()
+            self._adapter = None
+            self._local = threading.local()
+        if self._http2_client is not None:
+            self._http2_client.close()
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def _send(self, url: str, params: Optional[dict]):
+        if self._http2_client is not None:
+            return self._http2_client.get(url, params=params)
+        return self.session.get(url, params=params, timeout=self.timeout)
+
+    def get_json(self, url: str, params: Optional[dict] = None, classify: Optional[Classifier] = None) -> dict:
+        """
+        GETs `url` and returns the decoded JSON body.
+
+        API errors that are not retryable (or still failing after the last attempt)
+        are returned as the body, so callers keep handling them as before.
+
+        Successful bodies are stored in the response cache (if any); API errors never are.
+
+        Raises:
+            CircuitOpenError: if the host's circuit breaker is open
+            CacheMissError: if the cache is replay-only and has no entry for the request
+            HTTPClientError: if retries are exhausted without a JSON body, or on a non-JSON error response
+        """
+        if self.cache is not None:
+            cached = self.cache.get(url, params)
+            if cached is not None:
+                return cached
+            if self.cache.replay_only:
+                raise CacheMissError(f"{url} is not cached (replay only)")
+
+        host = urlparse(url).netloc
+        breaker = self.breaker(host)
+        last_error = None
+        for attempt in range(self.retry.max_attempts):
+            if not breaker.allow():
+                raise CircuitOpenError(f"Circuit open for {host} after {breaker.failures} failures")
+
+            data, reason, retry_after = None, None, None
+            try:
+                response = self._send(url, params)
+            except self._network_errors as e:
+                reason, last_error = TRANSIENT, e
+            else:
+                try:
+                    data = response.json()
+                except ValueError:
+                    data = None
+                status = response.status_code
+                reason = classify(data) if classify and data is not None else None
+                if reason is None and (status == 429 or status in RETRYABLE_STATUS):
+                    reason = RATE_LIMITED if status == 429 else TRANSIENT
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if reason is None:
+                    breaker.record_success()
+                    if data is None:
+                        raise HTTPClientError(f"HTTP {status} from {host} without a JSON body")
+                    if self.cache is not None and status < 400 and 'error' not in data:
+                        self.cache.put(url, params, data)
+                    return data
+                last_error = HTTPClientError(f"HTTP {status} from {host} ({reason})")
+
+            if reason == TRANSIENT:
+                breaker.record_failure()
+            else:
+                # A rate limit is an answer from a live host: backoff handles it, and a
+                # half-open probe must not stay claimed forever
+                breaker.record_success()
+            if attempt + 1 >= self.retry.max_attempts:
+                break
+            delay = self.retry.delay(attempt, retry_after)
+            RETRIES.inc(host=host, reason=reason)
+            if reason == RATE_LIMITED:
+                RATE_LIMIT_WAIT_SECONDS.inc(delay, host=host)
+            self._logger.warning(f"{host}: {last_error}, retry {attempt + 1} in {delay:.1f}s")
+            print(f"⚠ {host}: {reason}, retrying in {delay:.1f}s ({attempt + 1}/{self.retry.max_attempts - 1})")
+            self._sleep(delay)
+
+        if data is not None:
+            return data
+        raise HTTPClientError(f"Giving up on {host} after {self.retry.max_attempts} attempts: {last_error}")
+
+
+_default_client: Optional[HttpClient] = None
+_default_lock = threading.Lock()
+
+
+def default_client() -> HttpClient:
+    """Process-wide client, so all parsers share connections, retry state and circuit breakers."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
+
+
+def configure_default_client(**kwargs) -> HttpClient:
+    """Replaces the process-wide client, e.g. configure_default_client(pool_size=32, http2=True)."""
+    global _default_client
+    with _default_lock:
+        if _default_client is not None:
+            _default_client.close()
+        _default_client = HttpClient(**kwargs)
+        return _default_client
@@ -0,0 +1,155 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from logging import getLogger
+from typing import Dict, Optional, Tuple
+
+# Credentials never become part of a cache key, so the same crawl hits the
+# cache whichever token or API key it runs with.
+SECRET_PARAMS = {"access_token", "token", "key", "api_key"}
+
+
+def cache_key(url: str, params: Optional[dict] = None) -> str:
+    """Stable key of a GET request: URL plus sorted params without credentials."""
+    normalized = sorted((str(name), str(value)) for name, value in (params or {}).items()
+                        if name not in SECRET_PARAMS and value is not None)
+    raw = json.dumps([url, normalized], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    On-disk cache of JSON API responses for development and re-runs.
+
+    Entries are gzip compressed files under `path`, expire after `ttl` seconds
+    (None keeps them forever) and the least recently used ones are evicted once
+    the cache grows past `max_bytes`. With replay_only=True nothing is fetched:
+    HttpClient raises CacheMissError for requests that are not cached.
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = 7 * 86400, max_bytes: int = 512 * 1024 * 1024,
+                 replay_only: bool = False, compresslevel: int = 6):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.replay_only = replay_only
+        self.compresslevel = compresslevel
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._logger = getLogger("ResponseCache")
+        self._lock = threading.Lock()
+        # key -> (last access, size), loaded lazily from disk
+        self._index: Optional[Dict[str, Tuple[float, int]]] = None
+        self._total_bytes = 0
+        os.makedirs(path, exist_ok=True)
+
+    def __getstate__(self):
+        # Picklable for worker processes; each process rebuilds its own index
+        state = self.__dict__.copy()
+        for name in ("_lock", "_logger", "_index"):
+            state.pop(name)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._logger = getLogger("ResponseCache")
+        self._lock = threading.Lock()
+        self._index = None
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], f"{key}.json.gz")
+
+    def _load_index(self) -> Dict[str, Tuple[float, int]]:
+        if self._index is None:
+            self._index = {}
+            for root, _, files in os.walk(self.path):
+                for name in files:
+                    if name.endswith(".json.gz"):
+                        stat = os.stat(os.path.join(root, name))
+                        self._index[name[:-len(".json.gz")]] = (stat.st_mtime, stat.st_size)
+            self._total_bytes = sum(size for _, size in self._index.values())
+        return self._index
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load_index())
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            self._load_index()
+            return self._total_bytes
+
+    def get(self, url: str, params: Optional[dict] = None) -> Optional[dict]:
+        """Returns the cached body or None on a miss (expired entries count as misses)."""
+        key = cache_key(url, params)
+        path = self._entry_path(key)
+        with self._lock:
+            index = self._load_index()
+            if key not in index:
+                self.stats["misses"] += 1
+                return None
+            try:
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError) as e:
+                self._logger.error(f"Dropping unreadable cache entry {path}: {e}")
+                self._remove(key)
+                self.stats["misses"] += 1
+                return None
+            if self.ttl is not None and time.time() - entry["stored"] > self.ttl and not self.replay_only:
+                self._remove(key)
+                self.stats["misses"] += 1
+                return None
+            now = time.time()
+            index[key] = (now, index[key][1])
+            try:
+                os.utime(path, (now, now))
+            except OSError:
+                pass
+            self.stats["hits"] += 1
+            return entry["body"]
+
+    def put(self, url: str, params: Optional[dict], body: dict) -> None:
+        key = cache_key(url, params)
+        path = self._entry_path(key)
+        stored_params = {name: value for name, value in (params or {}).items() if name not in SECRET_PARAMS}
+        entry = {"url": url, "params": stored_params, "stored": time.time(), "body": body}
+        payload = gzip.compress(json.dumps(entry, ensure_ascii=False).encode('utf-8'), self.compresslevel)
+        with self._lock:
+            index = self._load_index()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+            if key in index:
+                self._total_bytes -= index[key][1]
+            index[key] = (time.time(), len(payload))
+            self._total_bytes += len(payload)
+            self.stats["stores"] += 1
+            self._evict()
+
+    def _remove(self, key: str) -> None:
+        _, size = self._index.pop(key)
+        self._total_bytes -= size
+        try:
+            os.remove(self._entry_path(key))
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        if self._total_bytes <= self.max_bytes:
+            return
+        for key, _ in sorted(self._index.items(), key=lambda item: item[1][0]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._remove(key)
+            self.stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._load_index()):
+                self._remove(key)
@@ -0,0 +1,94 @@
+import itertools
+import json
+import os
+import re
+from logging import getLogger
+from typing import Iterator, List, Optional
+
+from .comments_storage import CHANGE_POLL_INTERVAL, CommentsStorage
+from .wal import atomic_write
+
+_CONSUMER_NAME = re.compile(r"^[\w.-]+$")
+
+
+class ChangeFeed:
+    """
+    Named consumer of a storage's change feed, with its offset saved in
+    <data root>/consumers/<name>.json so a restarted consumer goes on where it stopped.
+
+    Iterating yields the comments of one write at a time. The offset of a write is
+    committed when the next one is requested (or by commit()), so a crash in between
+    delivers that write again: at-least-once delivery.
+
+        feed = ChangeFeed(CommentsStorage(), "sentiment")
+        for comments in feed:
+            score(comments)
+
+        async for comments in feed:
+            await score(comments)
+    """
+
+    def __init__(self, storage: CommentsStorage, name: str, timeout: Optional[float] = None,
+                 poll_interval: float = CHANGE_POLL_INTERVAL, offsets_dir: Optional[str] = None):
+        if not _CONSUMER_NAME.match(name):
+            raise ValueError(f"Invalid consumer name {name!r}: use letters, digits, '.', '_' and '-'")
+        self._logger = getLogger("ChangeFeed")
+        self.storage = storage
+        self.name = name
+        # Stop iterating after this many seconds without new comments; never when None
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.path = os.path.join(offsets_dir or os.path.join(storage.db_path, "consumers"), f"{name}.json")
+        self._offset: Optional[int] = None
+
+    @property
+    def offset(self) -> int:
+        """Sequence number of the last write this consumer has processed, 0 if none."""
+        if self._offset is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._offset = int(json.load(f)["seq"])
+            except FileNotFoundError:
+                self._offset = 0
+        return self._offset
+
+    def commit(self, seq: int) -> None:
+        """Saves seq as processed: the feed resumes after it."""
+        if seq == self._offset:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        atomic_write(self.path, json.dumps({"seq": seq}).encode('utf-8'), self.storage.fsync)
+        self._offset = seq
+
+    def reset(self, seq: int = 0) -> None:
+        """Moves the offset, e.g. back to 0 to process all stored comments again."""
+        self._offset = None
+        self.commit(seq)
+
+    def lag(self) -> int:
+        """Writes stored after the committed offset."""
+        return max(0, self.storage.last_seq - self.offset)
+
+    def poll(self) -> List[dict]:
+        """Comments of the writes after the offset, without waiting or committing."""
+        records, _ = self.storage.read_changes(self.offset)
+        return records
+
+    @staticmethod
+    def _writes(records: List[dict]) -> Iterator[tuple]:
+        # A read_changes() batch never splits a write
+        for seq, comments in itertools.groupby(records, key=lambda record: record['seq']):
+            yield seq, list(comments)
+
+    def __iter__(self) -> Iterator[List[dict]]:
+        for records in self.storage.follow_changes(self.offset, self.timeout, self.poll_interval):
+            for seq, comments in self._writes(records):
+                yield comments
+                # Only reached when the consumer asks for more: the write has been handled
+                self.commit(seq)
+
+    async def __aiter__(self):
+        async for records in self.storage.afollow_changes(self.offset, self.timeout, self.poll_interval):
+            for seq, comments in self._writes(records):
+                yield comments
+                self.commit(seq)
@@ -0,0 +1,253 @@
+import json
+import os
+from logging import getLogger
+from typing import Dict, List, Optional
+
+from .comments_storage import CommentsStorage, record_timestamp
+
+# NumPy is only needed for the analytics store, the parsers work without it
+try:
+    import numpy as np
+    _HAS_NUMPY = True
+except Exception:
+    np = None
+    _HAS_NUMPY = False
+
+# Timestamp stored for comments whose date cannot be parsed
+NO_DATE = -(2 ** 63)
+
+_NUMERIC_COLUMNS = {
+    "likes": "<i8",
+    "date": "<i8",
+    "source": "<i4",
+    "url": "<i4",
+    "author": "<i4",
+    "content_end": "<i8",
+}
+_DICTIONARY_COLUMNS = ("source", "url", "author")
+_ID_DTYPE = "S36"
+
+
+class ColumnarStore:
+    """
+    Read-optimized, memory-mapped copy of the comments DB for analytics scans.
+
+    Every column lives in its own flat file under root: likes and UTC dates as int64
+    arrays, source/url/author as int32 codes into per-column dictionaries, comment ids
+    as fixed 36-byte strings and content as one UTF-8 blob with end offsets. The store
+    is built incrementally from a CommentsStorage's change feed: each build() only
+    appends the comments written since the previous one, and starts over after a
+    compaction removed or rewrote comments (see CommentsStorage.epoch).
+    """
+
+    def __init__(self, root: str):
+        if not _HAS_NUMPY:
+            raise ImportError("ColumnarStore requires numpy: pip install numpy")
+        self._logger = getLogger("ColumnarStore")
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._manifest_path = os.path.join(root, "manifest.json")
+        self.rows = 0
+        # Last storage write in the store, and the storage epoch it was built in
+        self.seq = 0
+        self.epoch: Optional[int] = None
+        self.dictionaries: Dict[str, List[str]] = {column: [] for column in _DICTIONARY_COLUMNS}
+        if os.path.exists(self._manifest_path):
+            with open(self._manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            self.rows = manifest["rows"]
+            # Stores of earlier versions counted rows instead: the next build starts over
+            self.seq = manifest.get("seq", 0)
+            self.epoch = manifest.get("epoch")
+            self.dictionaries.update(manifest["dictionaries"])
+        self._codes = {column: {value: code for code, value in enumerate(values)}
+                       for column, values in self.dictionaries.items()}
+        self._maps: Dict[str, "np.ndarray"] = {}
+
+    def _path(self, column: str) -> str:
+        return os.path.join(self.root, f"{column}.col")
+
+    def column(self, name: str) -> "np.ndarray":
+        """Memory-mapped, read-only view of a column (likes, date, source, url, author, id)."""
+        if name not in self._maps:
+            dtype = _ID_DTYPE if name == "id" else _NUMERIC_COLUMNS[name]
+            if self.rows == 0:
+                self._maps[name] = np.empty(0, dtype=dtype)
+            else:
+                self._maps[name] = np.memmap(self._path(name), dtype=dtype, mode='r', shape=(self.rows,))
+        return self._maps[name]
+
+    def content(self, row: int) -> str:
+        ends = self.column("content_end")
+        start = int(ends[row - 1]) if row > 0 else 0
+        with open(self._path("content"), 'rb') as f:
+            f.seek(start)
+            return f.read(int(ends[row]) - start).decode('utf-8')
+
+    def build(self, storage: CommentsStorage, chunk_size: int = 100000) -> int:
+        """
+        Appends the comments stored since the last build.
+
+        Comments are read from the change feed in write order, so the store only
+        remembers the sequence number of the last write it holds. If the storage was
+        compacted since (its epoch changed), the store is rebuilt from scratch. Writes
+        happen in chunks of about chunk_size rows and the manifest is replaced last,
+        so an interrupted build is simply redone.
+
+        Returns:
+            int: number of appended rows
+        """
+        epoch = storage.epoch
+        if epoch != self.epoch:
+            self._reset(epoch)
+        self._truncate_to_manifest()
+        appended = 0
+        while True:
+            records, seq = storage.read_changes(self.seq, chunk_size)
+            if not records:
+                break
+            appended += self._append(records, seq)
+        return appended
+
+    def _reset(self, epoch: int) -> None:
+        for column in list(_NUMERIC_COLUMNS) + ["id", "content"]:
+            if os.path.exists(self._path(column)):
+                os.remove(self._path(column))
+        self.rows = 0
+        self.seq = 0
+        self.epoch = epoch
+        self.dictionaries = {column: [] for column in _DICTIONARY_COLUMNS}
+        self._codes = {column: {} for column in _DICTIONARY_COLUMNS}
+        self._maps.clear()
+        self._write_manifest()
+
+    def _truncate_to_manifest(self) -> None:
+        # Drop rows written by a build that died before its manifest update
+        content_end = 0
+        if self.rows:
+            content_end = int(np.memmap(self._path("content_end"), dtype="<i8", mode='r', shape=(self.rows,))[-1])
+        sizes = {column: self.rows * np.dtype(dtype).itemsize for column, dtype in _NUMERIC_COLUMNS.items()}
+        sizes["id"] = self.rows * np.dtype(_ID_DTYPE).itemsize
+        sizes["content"] = content_end
+        for column, size in sizes.items():
+            path = self._path(column)
+            if os.path.exists(path) and os.path.getsize(path) != size:
+                with open(path, 'r+b') as f:
+                    f.truncate(size)
+
+    def _encode(self, column: str, value) -> int:
+        value = "" if value is None else str(value)
+        codes = self._codes[column]
+        code = codes.get(value)
+        if code is None:
+            code = len(self.dictionaries[column])
+            codes[value] = code
+            self.dictionaries[column].append(value)
+        return code
+
+    def _append(self, records: List[dict], seq: int) -> int:
+        content_path = self._path("content")
+        offset = os.path.getsize(content_path) if os.path.exists(content_path) else 0
+        blobs = [(record.get('content') or "").encode('utf-8') for record in records]
+        ends = offset + np.cumsum([len(blob) for blob in blobs], dtype=np.int64)
+        dates = [record_timestamp(record) for record in records]
+        columns = {
+            "likes": np.array([record.get('likes') or 0 for record in records], dtype="<i8"),
+            "date": np.array([NO_DATE if ts is None else int(ts) for ts in dates], dtype="<i8"),
+            "content_end": ends.astype("<i8"),
+            "id": np.array([str(record.get('id', '')).encode('ascii', 'ignore') for record in records], dtype=_ID_DTYPE),
+        }
+        for column in _DICTIONARY_COLUMNS:
+            columns[column] = np.array([self._encode(column, record.get(column)) for record in records], dtype="<i4")
+
+        with open(content_path, 'ab') as f:
+            for blob in blobs:
+                f.write(blob)
+        for column, values in columns.items():
+            with open(self._path(column), 'ab') as f:
+                f.write(values.tobytes())
+
+        self.rows += len(records)
+        self.seq = seq
+        self._write_manifest()
+        self._maps.clear()
+        return len(records)
+
+    def _write_manifest(self) -> None:
+        tmp_path = f"{self._manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"rows": self.rows, "seq": self.seq, "epoch": self.epoch, "dictionaries": self.dictionaries},
+                      f, ensure_ascii=False)
+        os.replace(tmp_path, self._manifest_path)
+
+    def mask(self, source: Optional[str] = None, url: Optional[str] = None,
+             date_from: Optional[float] = None, date_to: Optional[float] = None,
+             min_likes: Optional[int] = None) -> "np.ndarray":
+        """Boolean row mask for the given filters (dates as UTC timestamps)."""
+        mask = np.ones(self.rows, dtype=bool)
+        for column, value in (("source", source), ("url", url)):
+            if value is not None:
+                code = self._codes[column].get(value)
+                if code is None:
+                    return np.zeros(self.rows, dtype=bool)
+                mask &= self.column(column) == code
+        if date_from is not None or date_to is not None:
+            dates = self.column("date")
+            mask &= dates != NO_DATE
+            if date_from is not None:
+                mask &= dates >= int(date_from)
+            if date_to is not None:
+                mask &= dates < int(date_to)
+        if min_likes is not None:
+            mask &= self.column("likes") >= min_likes
+        return mask
+
+    def top_liked_per_url(self, k: int = 10, with_content: bool = False, **filters) -> Dict[str, List[dict]]:
+        """
+        The k most liked comments of every url.
+
+        Returns:
+            Dict url -> list of {"id", "likes"[, "content"]} ordered by likes
+        """
+        rows = np.flatnonzero(self.mask(**filters))
+        if not len(rows):
+            return {}
+        urls = self.column("url")[rows]
+        likes = self.column("likes")[rows]
+        order = np.lexsort((-likes, urls))
+        rows, urls, likes = rows[order], urls[order], likes[order]
+        group_starts = np.flatnonzero(np.r_[True, urls[1:] != urls[:-1]])
+        group_sizes = np.diff(np.r_[group_starts, len(urls)])
+        rank = np.arange(len(urls)) - np.repeat(group_starts, group_sizes)
+        keep = rank < k
+
+        ids = self.column("id")
+        result: Dict[str, List[dict]] = {}
+        url_names = self.dictionaries["url"]
+        for row, url_code, like_count in zip(rows[keep], urls[keep], likes[keep]):
+            item = {"id": ids[row].decode('ascii'), "likes": int(like_count)}
+            if with_content:
+                item["content"] = self.content(int(row))
+            result.setdefault(url_names[url_code], []).append(item)
+        return result
+
+    def volume_per_day(self, **filters) -> Dict[str, Dict[str, int]]:
+        """
+        Number of comments per UTC day and source, skipping comments without a date.
+
+        Returns:
+            Dict 'YYYY-MM-DD' -> {source: count}
+        """
+        mask = self.mask(**filters)
+        dates = self.column("date")
+        mask &= dates != NO_DATE
+        days = dates[mask] // 86400
+        sources = self.column("source")[mask].astype(np.int64)
+        n_sources = max(len(self.dictionaries["source"]), 1)
+        keys, counts = np.unique(days * n_sources + sources, return_counts=True)
+
+        result: Dict[str, Dict[str, int]] = {}
+        day_strings = np.datetime_as_string((keys // n_sources).astype("datetime64[D]"))
+        for day, source_code, count in zip(day_strings, keys % n_sources, counts):
+            result.setdefault(str(day), {})[self.dictionaries["source"][source_code]] = int(count)
+        return result
@@ -1,63 +1,970 @@
-from typing import Optional, List
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, List, Iterable, Iterator, Tuple, Union, Sequence
+from datetime import datetime
 from .models import Comment, CreateComment
+from .normalize import normalize_record, parse_absolute_date, parse_date
+from ..monitoring.metrics import COMMENTS_STORED, STORAGE_BYTES_WRITTEN, STORAGE_WRITE_SECONDS
+from ..monitoring.profiling import phase
+from .locking import FileLock
+from .partitions import partition_key, partition_may_match, partition_path
+from .segments import DEFAULT_BLOCK_SIZE, SIDE_FILE_SUFFIXES, Segment, bloom_contains, is_legacy_json, remove_segment
+from .wal import WriteAheadLog, atomic_write
 from logging import getLogger
+import asyncio
+import heapq
+import itertools
 import json
 import os
+import threading
+import time
 import uuid
 
+def iter_json_object(path: str, chunk_size: int = 1 << 16) -> Iterator[Tuple[str, dict]]:
+    """Yields (key, value) pairs of a top-level JSON object without loading the whole file."""
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buf = ''
+        pos = 0
+        eof = False
+
+        def next_token() -> Optional[str]:
+            # Skips whitespace and returns the next significant character, reading more if needed
+            nonlocal buf, pos, eof
+            while True:
+                while pos < len(buf) and buf[pos].isspace():
+                    pos += 1
+                if pos < len(buf):
+                    return buf[pos]
+                if eof:
+                    return None
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buf, pos = buf[pos:] + chunk, 0
+
+        def decode():
+            nonlocal buf, pos, eof
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                    # A value ending exactly at the buffer end may be cut (e.g. a number)
+                    if end < len(buf) or eof:
+                        pos = end
+                        return value
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buf, pos = buf[pos:] + chunk, 0
+
+        token = next_token()
+        if token is None:
+            return
+        if token != '{':
+            raise ValueError(f"{path} does not contain a JSON object")
+        pos += 1
+        if next_token() == '}':
+            return
+        while True:
+            key = decode()
+            if next_token() != ':':
+                raise ValueError(f"Malformed JSON object in {path}")
+            pos += 1
+            next_token()
+            yield key, decode()
+            token = next_token()
+            pos += 1
+            if token == '}':
+                return
+            if token != ',':
+                raise ValueError(f"Malformed JSON object in {path}")
+            next_token()
+
+
+def record_timestamp(record: dict) -> Optional[int]:
+    """UTC timestamp of a stored comment, None if its date is unknown."""
+    timestamp = record.get('timestamp')
+    if timestamp is not None:
+        return timestamp
+    # Records stored before normalization only have the date string
+    return parse_absolute_date(record.get('date'))
+
+
+def iter_legacy_segment(path: str) -> Iterator[dict]:
+    """Comments of a single-file block segment DB (with .ckpt and .wal side files) of an earlier version."""
+    checkpoint = None
+    if os.path.exists(f"{path}.ckpt"):
+        with open(f"{path}.ckpt", 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    segment = Segment(path)
+    if checkpoint is not None:
+        # Blocks past the checkpoint belong to an interrupted checkpoint, their comments are in the log
+        segment.truncate(checkpoint["data_bytes"], checkpoint["index_bytes"])
+    yield from segment.iter_records()
+    if os.path.exists(f"{path}.wal"):
+        wal = WriteAheadLog(f"{path}.wal", fsync=False)
+        for _, records, _ in wal.replay(checkpoint["seq"] if checkpoint else 0, truncate=False):
+            yield from records
+
+
+def decode_block(segment: Segment, block: dict, data: bytes) -> List[dict]:
+    """Comments of a block; those of a merged block all carry the merge's sequence number."""
+    records = segment.decode(block, data)
+    if "write_seq" in block:
+        for record in records:
+            record['seq'] = block["write_seq"]
+    return records
+
+
+def iter_segment_records(segment: Segment, predicate: Optional[Callable[[dict], bool]] = None,
+                         blocks: Optional[List[dict]] = None) -> Iterator[dict]:
+    for block, data in segment.iter_blocks(predicate, blocks):
+        yield from decode_block(segment, block, data)
+
+
+def to_record_dict(comment) -> dict:
+    """Plain dict of a CommentRecord, a pydantic model or a dict."""
+    if isinstance(comment, dict):
+        return dict(comment)
+    if hasattr(comment, '_asdict'):
+        return comment._asdict()
+    return comment.model_dump()
+
+
+# Data root used when none is given: ./data/comments, or $COMMENTS_DATA_ROOT
+DEFAULT_DATA_ROOT = os.path.join("data", "comments")
+# DBs of earlier versions, stored inside the package and imported into the default root on first open
+LEGACY_DB_PATHS = (
+    os.path.join(os.path.dirname(__file__), "comments_db.seg"),
+    os.path.join(os.path.dirname(__file__), "comments_db.json"),
+)
+SEGMENT_FILE = "comments.seg"
+# Change feed: how often tail() looks for writes of other processes, and how many comments it reads at once
+CHANGE_POLL_INTERVAL = 0.5
+CHANGE_BATCH_SIZE = 1000
+
+
+def default_data_root() -> str:
+    return os.environ.get("COMMENTS_DATA_ROOT") or DEFAULT_DATA_ROOT
+
+
 class CommentsStorage: 
-    def __init__(self):
+    """
+    Comments DB under a data root, partitioned by source and comment date.
+
+    Layout of db_path (the data root):
+        manifest.json                              committed partitions and their sizes
+        wal.log                                    batches not yet sealed into partitions
+        source=vk/date=2026-10-16/comments.seg     compressed blocks (+ .idx, see segments.Segment)
+
+    A batch is durable once it is appended to the write-ahead log (fsynced unless
+    fsync=False). When the log holds checkpoint_size comments (or on
+    checkpoint()/close()) they are sealed into blocks of their partitions, which
+    are only ever appended to, and the new partition sizes are committed by
+    atomically renaming manifest.json. Readers only see committed bytes plus the
+    log tail, and after a crash only the log tail is replayed. Queries skip
+    partitions outside their source and date filters.
+
+    Compaction (see compaction.Compactor) rewrites a partition into a new file or
+    drops it; the replaced file is listed as obsolete in the manifest and only
+    deleted by remove_obsolete() after a grace period, so readers that started
+    before the swap finish on the old file.
+
+    Several processes may write the same DB: every write holds an exclusive lock
+    on `.lock` (reads a shared one) and first catches up with log entries and
+    checkpoints other processes wrote.
+
+    Every write (a batch, a merge, an import) gets the next sequence number, stored
+    with its comments as "seq". tail(from_seq) follows the comments written after
+    a sequence number, see changefeed.ChangeFeed for consumers with saved offsets.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, processors: Optional[List] = None,
+                 listeners: Optional[List] = None, codec: Optional[str] = None,
+                 block_size: int = DEFAULT_BLOCK_SIZE, fsync: bool = True,
+                 checkpoint_size: Optional[int] = None):
         self._logger = getLogger("CommentsStorage")
-        self.db_path = os.path.join(os.path.dirname(__file__), "comments_db.json")
-        if not os.path.exists(self.db_path):
-            with open(self.db_path, 'w', encoding='utf-8') as f:
-                json.dump({}, f)
+        self.db_path = db_path or default_data_root()
+        # Processors see every batch before it is written, e.g. TranslationService.
+        # Each one exposes process(records: List[dict]) -> List[dict] and may drop records;
+        # it is called from every writing thread at once, outside the storage lock.
+        self.processors = list(processors or [])
+        # Listeners are told about every batch after it is written, e.g. TextIndex.
+        # Each one exposes on_write(comments: List[dict]), the dicts carry the new "id".
+        self.listeners = list(listeners or [])
+        self.codec = codec
+        self.block_size = block_size
+        # Comments logged before they are sealed; a checkpoint spreads them over the
+        # partitions they fall into, so it holds several blocks' worth
+        self.checkpoint_size = checkpoint_size or 10 * block_size
+        self.fsync = fsync
+        self.manifest_path = os.path.join(self.db_path, "manifest.json")
+        # A DB of an earlier version at db_path itself (a single file) is moved aside and imported
+        legacy_paths = []
+        if os.path.isfile(self.db_path):
+            legacy_path = f"{self.db_path}.legacy"
+            for suffix in ("",) + SIDE_FILE_SUFFIXES:
+                if os.path.exists(f"{self.db_path}{suffix}"):
+                    os.replace(f"{self.db_path}{suffix}", f"{legacy_path}{suffix}")
+            legacy_paths.append(legacy_path)
+        elif db_path is None and not os.path.exists(self.db_path):
+            legacy_paths.extend(path for path in LEGACY_DB_PATHS if os.path.isfile(path) and os.path.getsize(path))
+        os.makedirs(self.db_path, exist_ok=True)
+        # One storage instance may be shared by parsers running in several threads,
+        # and one DB by several processes.
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(os.path.join(self.db_path, ".lock"))
+        self._lock_depth = 0
+        # Committed manifest (and the stat it was read at), open partition segments,
+        # comments in the log but not yet sealed, the last logged batch and how far
+        # the log has been read
+        self._manifest: Optional[dict] = None
+        self._manifest_stat = None
+        self._segments: Dict[Tuple[str, str], Segment] = {}
+        # Partitions sealed since the last manifest commit
+        self._pending: Dict[str, dict] = {}
+        self._tail: List[dict] = []
+        self._seq = 0
+        self._wal_pos = 0
+        # Wakes up tail() in this process on every write
+        self._changed = threading.Condition()
+        self._seq_written = 0
+        with self._locked():
+            self.wal = WriteAheadLog(os.path.join(self.db_path, "wal.log"), fsync)
+            if not os.path.exists(self.manifest_path):
+                self._commit({"version": 1, "seq": 0, "partitions": {}})
+            self._sync(exclusive=True)
+            for legacy_path in legacy_paths:
+                self.import_legacy(legacy_path)
+        if self._tail:
+            self._logger.info(f"Recovered {len(self._tail)} comments from the write-ahead log")
+            print(f"✓ Recovered {len(self._tail)} comments from the write-ahead log of {self.db_path}")
 
-    def create_comment(self, create_comment_obj) -> Optional[bool]:
+    @contextmanager
+    def _locked(self, shared: bool = False):
+        # Thread lock plus the DB's file lock; re-entrant, the outermost call decides shared or exclusive
+        with self._lock:
+            if self._lock_depth == 0:
+                self._file_lock.acquire(shared)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    self._file_lock.release()
+
+    def import_legacy(self, legacy_path: str) -> int:
+        """
+        Imports a single-file DB of an earlier version (comments_db.json or a
+        comments_db.seg block segment) into the partitions, streaming it. The file
+        is left as it is. A JSON file truncated by a crash is salvaged up to the damage.
+        Imported files are recorded in the manifest, importing one again does nothing.
+
+        Returns:
+            int: number of imported comments
+        """
+        with self._locked():
+            self._sync(exclusive=True)
+            if os.path.realpath(legacy_path) in self._manifest.get("legacy", {}):
+                print(f"⚠ {legacy_path} was already imported into {self.db_path}")
+                return 0
+            imported = self._import_legacy(legacy_path)
+        self._changes_written()
+        return imported
+
+    def _import_legacy(self, legacy_path: str) -> int:
+        # The import is one write; with the log sealed first the sequence number can move past it
+        self.checkpoint()
+        seq = self._seq + 1
+        if is_legacy_json(legacy_path):
+            records = ({'id': comment_id, **record} for comment_id, record in iter_json_object(legacy_path))
+        else:
+            records = iter_legacy_segment(legacy_path)
+        imported = 0
+        batch = []
         try:
+            for record in records:
+                batch.append({**record, 'seq': seq})
+                if len(batch) >= self.checkpoint_size:
+                    imported += self._seal(batch)
+                    batch = []
+        except ValueError as e:
+            # Truncated by a crash of an old version: keep what is readable, the original stays as it is
+            self._logger.error(f"{legacy_path} is corrupt ({e}), salvaged the comments before the damage")
+            print(f"⚠ {legacy_path} is corrupt, salvaged the comments before the damage")
+        imported += self._seal(batch)
+        legacy = {**self._manifest.get("legacy", {}), os.path.realpath(legacy_path): imported}
+        self._commit({**self._manifest, "seq": seq, "partitions": self._committed_partitions(), "legacy": legacy})
+        self._seq = seq
+        self._logger.info(f"Imported {imported} comments from {legacy_path} into {self.db_path}")
+        print(f"✓ Imported {imported} comments from {legacy_path} into {self.db_path}")
+        return imported
+
+    def _read_manifest(self) -> dict:
+        stat = os.stat(self.manifest_path)
+        version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if version != self._manifest_stat:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self._manifest = json.load(f)
+            self._manifest_stat = version
+        return self._manifest
+
+    def _sync(self, exclusive: bool) -> None:
+        """
+        Catches up with the manifest and log entries on disk, written by other
+        processes or left by a crash. Call with the file lock held; only an exclusive
+        holder cuts off a torn log tail.
+        """
+        previous = self._manifest
+        manifest = self._read_manifest()
+        if previous is not None and manifest.get("epoch", 0) != previous.get("epoch", 0):
+            # Partitions were rewritten or dropped: a cached segment may stand for a deleted file whose name is reused
+            self._segments = {}
+        if previous is None or manifest["seq"] != previous["seq"]:
+            # Checkpointed (by another process): the log was emptied and its comments are in partitions now
+            self._tail = []
+            self._wal_pos = 0
+        self._seq = max(self._seq, manifest["seq"])
+        # Entries up to _seq are already in the tail (or sealed), even if read again from an older position
+        for seq, records, end in self.wal.replay(self._seq, self._wal_pos, truncate=exclusive):
+            for record in records:
+                # Logged before comments carried their sequence number
+                record.setdefault('seq', seq)
+            self._tail.extend(records)
+            self._seq = seq
+            self._wal_pos = end
+
+    def _commit(self, manifest: dict) -> None:
+        # The rename is the commit point: readers and recovery see the old or the new partition sizes
+        atomic_write(self.manifest_path, json.dumps(manifest, ensure_ascii=False, indent=1).encode('utf-8'), self.fsync)
+        self._manifest = manifest
+        self._manifest_stat = None
+
+    def _segment(self, key: str, file_name: str = SEGMENT_FILE) -> Segment:
+        segment = self._segments.get((key, file_name))
+        if segment is None:
+            path = partition_path(self.db_path, key, file_name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            segment = self._segments[(key, file_name)] = Segment(path, self.codec, self.block_size)
+        return segment
+
+    def _committed_segment(self, key: str) -> Segment:
+        """Segment of a committed partition, showing only its committed blocks."""
+        partition = self._manifest["partitions"][key]
+        segment = self._segment(key, partition["file"])
+        segment.refresh(index_limit=partition["index_bytes"])
+        return segment
+
+    def _seal(self, records: List[dict]) -> int:
+        """
+        Appends records as blocks of their partitions and keeps the new sizes in
+        _pending until the caller commits them. Call with the exclusive lock held.
+        """
+        by_partition: Dict[str, List[dict]] = {}
+        for record in records:
+            by_partition.setdefault(partition_key(record.get('source'), record_timestamp(record)), []).append(record)
+        for key, partition_records in by_partition.items():
+            partition, segment = self._open_partition(key)
+            STORAGE_BYTES_WRITTEN.inc(segment.append(partition_records, fsync=self.fsync))
+            self._pending[key] = self._partition_entry(partition, segment, len(partition_records),
+                                                 [record_timestamp(record) for record in partition_records])
+        return len(records)
+
+    def _open_partition(self, key: str) -> Tuple[dict, Segment]:
+        """Manifest entry (pending or committed) and segment of a partition, ready for appending."""
+        partition = self._pending.get(key) or self._manifest["partitions"].get(key)
+        if partition is None:
+            file_name = self._free_file_name(key)
+            segment = self._segment(key, file_name)
+            # New partition: drop whatever an interrupted checkpoint left in it
+            segment.truncate(0, 0)
+            return {"file": file_name, "count": 0, "min_ts": None, "max_ts": None}, segment
+        segment = self._segment(key, partition["file"])
+        if key not in self._pending:
+            # Cut blocks of an interrupted checkpoint before appending after them
+            segment.truncate(partition["data_bytes"], partition["index_bytes"])
+        return partition, segment
+
+    @staticmethod
+    def _partition_entry(partition: dict, segment: Segment, count: int, timestamps: List[int]) -> dict:
+        # Manifest entry of a partition after count comments with these timestamps were appended
+        timestamps = [ts for ts in timestamps if ts is not None]
+        if partition["min_ts"] is not None:
+            timestamps += [partition["min_ts"], partition["max_ts"]]
+        return {
+            "file": partition["file"],
+            "count": partition["count"] + count,
+            "blocks": len(segment.blocks),
+            "min_ts": min(timestamps) if timestamps else None,
+            "max_ts": max(timestamps) if timestamps else None,
+            # Blocks are appended in write order, the last one has the newest comments
+            "max_seq": segment.blocks[-1].get("max_seq", 0) if segment.blocks else 0,
+            "data_bytes": os.path.getsize(segment.path),
+            "index_bytes": os.path.getsize(segment.index_path),
+        }
+
+    def _free_file_name(self, key: str) -> str:
+        # comments.seg, else comments-<n>.seg: never the partition's current file or one readers may still use
+        taken = set(self._manifest.get("obsolete", {}))
+        partition = self._manifest["partitions"].get(key)
+        if partition is not None:
+            taken.add(f"{key}/{partition['file']}")
+        for generation in itertools.count():
+            file_name = SEGMENT_FILE if generation == 0 else f"comments-{generation}.seg"
+            if f"{key}/{file_name}" not in taken:
+                return file_name
+
+    def _commit_partitions(self, updates: Dict[str, Optional[dict]], obsolete: Sequence[str] = ()) -> None:
+        # Commits replaced (None: removed) partitions; their old files become obsolete as of now
+        partitions = dict(self._manifest["partitions"])
+        for key, partition in updates.items():
+            if partition is None:
+                partitions.pop(key, None)
+            else:
+                partitions[key] = partition
+        stale = dict(self._manifest.get("obsolete", {}))
+        stale.update({path: time.time() for path in obsolete})
+        self._commit({**self._manifest, "epoch": self._manifest.get("epoch", 0) + (1 if obsolete else 0),
+                      "partitions": dict(sorted(partitions.items())), "obsolete": stale})
+
+    def _committed_partitions(self) -> Dict[str, dict]:
+        # Manifest partitions updated with everything sealed since the last commit
+        partitions = {**self._manifest["partitions"], **self._pending}
+        self._pending = {}
+        return dict(sorted(partitions.items()))
+
+    def checkpoint(self) -> int:
+        """Seals the logged comments into their partitions and empties the log. Returns the sealed count."""
+        with self._locked():
+            self._sync(exclusive=True)
+            if not self._tail:
+                return 0
+            with STORAGE_WRITE_SECONDS.time(op="checkpoint"):
+                tail = self._tail
+                self._seal(tail)
+                # A crash before the commit replays the log into fresh blocks
+                self._commit({**self._manifest, "seq": self._seq, "partitions": self._committed_partitions()})
+                self.wal.reset()
+                self._tail = []
+                self._wal_pos = 0
+            return len(tail)
+
+    def close(self) -> None:
+        """Checkpoints the log; the storage stays usable."""
+        self.checkpoint()
+
+    def rewrite_partition(self, key: str, keep: Optional[Callable[[dict], bool]] = None) -> Optional[dict]:
+        """
+        Rewrites a committed partition into a new file of full blocks with a fresh
+        block index, leaving out the comments keep() rejects. Streams one block at a
+        time. A partition left empty is dropped.
+
+        Args:
+            key: Partition key, e.g. "source=vk/date=2026-10-16"
+            keep: Called with every comment in write order; all are kept when None
+
+        Returns:
+            dict: {"kept", "removed", "bytes_before", "bytes_after"}, None if there is no such partition
+        """
+        with self._locked(), STORAGE_WRITE_SECONDS.time(op="compact"):
+            self._sync(exclusive=True)
+            partition = self._manifest["partitions"].get(key)
+            if partition is None:
+                return None
+            source = self._committed_segment(key)
+            file_name = self._free_file_name(key)
+            segment = self._segment(key, file_name)
+            # Leftovers of an interrupted rewrite
+            segment.truncate(0, 0)
+            kept = removed = 0
+            # Date range of the kept comments, as [min, max]
+            timestamps: List[int] = []
+            batch: List[dict] = []
+
+            def flush():
+                nonlocal kept, timestamps, batch
+                STORAGE_BYTES_WRITTEN.inc(segment.append(batch, fsync=self.fsync))
+                block = segment.blocks[-1]
+                timestamps = [ts for ts in timestamps + [block["min_ts"], block["max_ts"]] if ts is not None]
+                timestamps = [min(timestamps), max(timestamps)] if timestamps else []
+                kept += len(batch)
+                batch = []
+
+            for record in iter_segment_records(source, blocks=list(source.blocks)):
+                if keep is not None and not keep(record):
+                    removed += 1
+                    continue
+                batch.append(record)
+                if len(batch) >= self.block_size:
+                    flush()
+            if batch:
+                flush()
+            bytes_before = partition["data_bytes"] + partition["index_bytes"]
+            obsolete = [f"{key}/{partition['file']}"]
+            if kept:
+                entry = self._partition_entry({"file": file_name, "count": 0, "min_ts": None, "max_ts": None},
+                                              segment, kept, timestamps)
+                entry["compacted_bytes"] = entry["data_bytes"]
+                bytes_after = entry["data_bytes"] + entry["index_bytes"]
+                self._commit_partitions({key: entry}, obsolete)
+            else:
+                # The empty new file is not referenced and goes with the next remove_obsolete()
+                bytes_after = 0
+                self._commit_partitions({key: None}, obsolete)
+            self._segments.pop((key, partition["file"]), None)
+            return {"kept": kept, "removed": removed, "bytes_before": bytes_before, "bytes_after": bytes_after}
+
+    def mark_compacted(self, key: str) -> None:
+        """Records that a partition needs no compaction until comments are appended to it."""
+        with self._locked():
+            self._sync(exclusive=True)
+            partition = self._manifest["partitions"].get(key)
+            if partition is not None and partition.get("compacted_bytes") != partition["data_bytes"]:
+                self._commit_partitions({key: {**partition, "compacted_bytes": partition["data_bytes"]}})
+
+    def drop_partition(self, key: str) -> Optional[dict]:
+        """Removes a partition from the DB, e.g. when it is past retention. Returns its last manifest entry."""
+        with self._locked():
+            self._sync(exclusive=True)
+            partition = self._manifest["partitions"].get(key)
+            if partition is not None:
+                self._commit_partitions({key: None}, [f"{key}/{partition['file']}"])
+                self._segments.pop((key, partition["file"]), None)
+            return partition
+
+    def remove_obsolete(self, grace_seconds: float = 0) -> int:
+        """
+        Deletes partition files replaced or dropped at least grace_seconds ago, and
+        files no committed partition refers to (left by an interrupted rewrite or
+        checkpoint). Readers that started before a file was replaced may still be
+        reading it, so give them time.
+
+        Returns:
+            int: bytes freed
+        """
+        with self._locked():
+            self._sync(exclusive=True)
+            now = time.time()
+            obsolete = dict(self._manifest.get("obsolete", {}))
+            expired = [path for path, since in obsolete.items() if now - since >= grace_seconds]
+            for path in expired:
+                del obsolete[path]
+            referenced = set(obsolete) | {f"{key}/{partition['file']}"
+                                          for key, partition in self._manifest["partitions"].items()}
+            freed = 0
+            for source_dir in os.listdir(self.db_path):
+                if not source_dir.startswith("source=") or not os.path.isdir(os.path.join(self.db_path, source_dir)):
+                    continue
+                for date_dir in os.listdir(os.path.join(self.db_path, source_dir)):
+                    key = f"{source_dir}/{date_dir}"
+                    directory = os.path.join(self.db_path, source_dir, date_dir)
+                    for file_name in os.listdir(directory):
+                        if file_name.endswith(".seg") and f"{key}/{file_name}" not in referenced:
+                            path = os.path.join(directory, file_name)
+                            freed += sum(os.path.getsize(name) for name in (path, f"{path}.idx") if os.path.exists(name))
+                            remove_segment(path)
+                            self._segments.pop((key, file_name), None)
+                    if not os.listdir(directory):
+                        os.rmdir(directory)
+                if not os.listdir(os.path.join(self.db_path, source_dir)):
+                    os.rmdir(os.path.join(self.db_path, source_dir))
+            if expired:
+                self._commit({**self._manifest, "obsolete": obsolete})
+            return freed
+
+    def partitions(self, source: Optional[str] = None, date_from=None, date_to=None) -> Dict[str, dict]:
+        """Committed partitions (key -> manifest entry), pruned by source and date range."""
+        ts_from, ts_to = parse_date(date_from), parse_date(date_to)
+        with self._locked(shared=True):
+            self._sync(exclusive=False)
+            return {key: dict(partition) for key, partition in self._manifest["partitions"].items()
+                    if partition_may_match(key, source, ts_from, ts_to)}
+
+    def add_processor(self, processor) -> None:
+        self.processors.append(processor)
+
+    def add_listener(self, listener) -> None:
+        self.listeners.append(listener)
+
+    def _notify(self, comments: List[dict]) -> None:
+        for listener in self.listeners:
             try:
-                with open(self.db_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-            except json.JSONDecodeError:
-                data = {}
-            comment_id = str(uuid.uuid4())
-            data[comment_id] = create_comment_obj.model_dump()
-            with open(self.db_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            self._logger.info("Comment created successfully.")
-            return True 
+                listener.on_write(comments)
+            except Exception as e:
+                self._logger.error(f"Storage listener {type(listener).__name__} failed: {e}")
+
+    def _process(self, records: List[dict]) -> List[dict]:
+        for processor in self.processors:
+            if not records:
+                break
+            records = processor.process(records)
+        return records
+
+    def create_comment(self, create_comment_obj) -> Optional[bool]:
+        return self.create_comments([create_comment_obj]) == 1
+
+    def create_comments(self, create_comment_objs: Iterable) -> int:
+        """Stores a batch of comments (CommentRecord, CreateComment or dicts) with one write-ahead log append.
+
+        Returns:
+            int: number of stored comments
+        """
+        try:
+            now = time.time()
+            with phase("validate"):
+                records = [normalize_record(to_record_dict(obj), now) for obj in create_comment_objs]
+            # Processors may call out to the network (translation): other writers must not wait for them
+            records = self._process(records)
+            if not records:
+                return 0
+            with self._lock:
+                with phase("store"), STORAGE_WRITE_SECONDS.time(op="create"), self._locked():
+                    self._sync(exclusive=True)
+                    seq = self._seq + 1
+                    written = [{'id': str(uuid.uuid4()), **record, 'seq': seq} for record in records]
+                    written_bytes = self.wal.append(seq, written)
+                    STORAGE_BYTES_WRITTEN.inc(written_bytes)
+                    self._seq = seq
+                    self._wal_pos += written_bytes
+                    self._tail.extend(written)
+                    if len(self._tail) >= self.checkpoint_size:
+                        self.checkpoint()
+                for record in written:
+                    COMMENTS_STORED.inc(source=record.get('source', ''))
+                self._notify(written)
+            self._changes_written()
+            self._logger.info(f"{len(records)} comments created successfully.")
+            return len(records)
         except Exception as e:
             self._logger.error(f"Error creating comment: {e}")
-            return False
+            return 0
+
+    def merge_segment(self, segment_path: str) -> int:
+        """Copies all comments of another storage (e.g. a job worker's data root) into this one, keeping their ids.
+
+        Processors are not applied again, the segment was written through them already.
+        The segment is recovered and checkpointed first, then its compressed blocks are
+        copied partition by partition as they are and only decoded if there are listeners.
+
+        Returns:
+            int: number of merged comments
+        """
+        try:
+            source = CommentsStorage(db_path=segment_path, codec=self.codec, block_size=self.block_size,
+                                     fsync=self.fsync)
+            source.checkpoint()
+            partitions = source.partitions()
+        except Exception as e:
+            self._logger.error(f"Error reading segment {segment_path}: {e}")
+            return 0
+        merged = 0
+        with self._locked(), phase("store"), STORAGE_WRITE_SECONDS.time(op="merge"):
+            self._sync(exclusive=True)
+            # The merge is one write: blocks are copied as they are and their comments take
+            # its sequence number via "write_seq", so the log is sealed first to keep seq order
+            self.checkpoint()
+            seq = self._seq + 1
+            for key in partitions:
+                source_segment = source._committed_segment(key)
+                blocks = list(source_segment.iter_blocks())
+                if not blocks:
+                    continue
+                partition, segment = self._open_partition(key)
+                STORAGE_BYTES_WRITTEN.inc(segment.append_encoded(
+                    [(data, {**block, "min_seq": seq, "max_seq": seq, "write_seq": seq}) for block, data in blocks], self.fsync))
+                count = sum(block["count"] for block, _ in blocks)
+                self._pending[key] = self._partition_entry(
+                    partition, segment, count, [ts for block, _ in blocks for ts in (block["min_ts"], block["max_ts"])])
+                for block, _ in blocks:
+                    for block_source, block_count in block["sources"].items():
+                        COMMENTS_STORED.inc(block_count, source=block_source)
+                if self.listeners:
+                    self._notify([{**record, 'seq': seq} for block, data in blocks
+                                  for record in source_segment.decode(block, data)])
+                merged += count
+            self._commit({**self._manifest, "seq": seq, "partitions": self._committed_partitions()})
+            self._seq = seq
+        self._changes_written()
+        return merged
+
+    def disk_bytes(self) -> int:
+        """Size of the DB on disk: partitions, manifest and write-ahead log."""
+        return sum(os.path.getsize(os.path.join(root, name))
+                   for root, _, files in os.walk(self.db_path) for name in files)
+
+    def _snapshot(self, source: Optional[str] = None, ts_from: Optional[float] = None,
+                  ts_to: Optional[float] = None) -> Tuple[List[Tuple[Segment, List[dict]]], List[dict]]:
+        # Committed blocks of the partitions that may match and the log tail, as of one
+        # instant, so a concurrent checkpoint neither hides nor repeats comments
+        with self._locked(shared=True):
+            self._sync(exclusive=False)
+            partitions = []
+            for key in self._manifest["partitions"]:
+                if partition_may_match(key, source, ts_from, ts_to):
+                    segment = self._committed_segment(key)
+                    partitions.append((segment, list(segment.blocks)))
+            return partitions, [dict(record) for record in self._tail]
+
+    def iter_partition(self, key: str) -> Iterator[dict]:
+        """Streams the committed comments of one partition in write order (nothing if there is no such partition)."""
+        with self._locked(shared=True):
+            self._sync(exclusive=False)
+            if key not in self._manifest["partitions"]:
+                return
+            segment = self._committed_segment(key)
+            blocks = list(segment.blocks)
+        yield from iter_segment_records(segment, blocks=blocks)
 
     def get_comment(self, comment_id):
         try: 
-            with open(self.db_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            if comment_id in data:
-                return Comment(**data[comment_id])
+            partitions, tail = self._snapshot()
+            record = next((record for record in tail if record['id'] == comment_id), None)
+            for segment, blocks in partitions:
+                if record is not None:
+                    break
+                record = next((record for record in iter_segment_records(
+                    segment, lambda block: bloom_contains(block["bloom"], comment_id), blocks)
+                    if record['id'] == comment_id), None)
+            if record is not None:
+                return Comment(**record)
             self._logger.info("Comment not found.")
             return None
         except Exception as e:
             self._logger.error(f"Error retrieving comment: {e}")
             return None
 
+    def _changes_written(self) -> None:
+        with self._changed:
+            self._seq_written = max(self._seq_written, self._seq)
+            self._changed.notify_all()
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the latest write, by this or any other process."""
+        with self._locked(shared=True):
+            self._sync(exclusive=False)
+            return self._seq
+
+    @property
+    def epoch(self) -> int:
+        """
+        Changes whenever stored comments are rewritten or removed (compaction, retention).
+        Copies kept up to date from the change feed must be rebuilt when it does.
+        """
+        with self._locked(shared=True):
+            self._sync(exclusive=False)
+            return self._manifest.get("epoch", 0)
+
+    def _changes(self, from_seq: int) -> Tuple[Iterator[dict], int]:
+        # Comments written after from_seq in write order, and the sequence number they are complete up to.
+        # Only partitions and blocks holding newer writes are read.
+        with self._locked(shared=True):
+            self._sync(exclusive=False)
+            blocks = []
+            for key, partition in self._manifest["partitions"].items():
+                if partition.get("max_seq", 0) > from_seq:
+                    segment = self._committed_segment(key)
+                    blocks.extend((block["min_seq"], segment, block) for block in segment.blocks
+                                  if block.get("max_seq", 0) > from_seq)
+            tail = [dict(record) for record in self._tail if record['seq'] > from_seq]
+            return self._merge_changes(from_seq, blocks, tail), self._seq
+
+    @staticmethod
+    def _merge_changes(from_seq: int, blocks: List[tuple], tail: List[dict]) -> Iterator[dict]:
+        # Blocks of different partitions overlap in seq: a block is decoded once its
+        # min_seq is the smallest pending one, so memory holds a few blocks at a time
+        heap = [(min_seq, order, segment, block) for order, (min_seq, segment, block) in enumerate(blocks)]
+        heapq.heapify(heap)
+        order = itertools.count(len(heap))
+        while heap:
+            _, _, segment, item = heapq.heappop(heap)
+            if segment is None:
+                yield item
+                continue
+            for record in iter_segment_records(segment, blocks=[item]):
+                if record.get('seq', 0) > from_seq:
+                    heapq.heappush(heap, (record['seq'], next(order), None, record))
+        # The log tail holds the newest writes
+        yield from tail
+
+    def read_changes(self, from_seq: int = 0, max_records: int = CHANGE_BATCH_SIZE) -> Tuple[List[dict], int]:
+        """
+        One poll of the change feed, without waiting: about max_records comments
+        written after from_seq, in write order, never splitting a write.
+
+        Returns:
+            Tuple[List[dict], int]: the comments (each with "seq") and the sequence number to poll from next
+        """
+        records, seq = self._changes(from_seq)
+        batch = []
+        for record in records:
+            if len(batch) >= max_records and record['seq'] != batch[-1]['seq']:
+                return batch, batch[-1]['seq']
+            batch.append(record)
+        return batch, seq
+
+    def wait_for_changes(self, seq: int, timeout: Optional[float] = None,
+                         poll_interval: float = CHANGE_POLL_INTERVAL) -> bool:
+        """
+        Blocks until a write after seq is visible. Writes through this instance wake
+        the caller at once, writes of other processes are seen within poll_interval.
+
+        Returns:
+            bool: False if timeout seconds passed first
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.last_seq <= seq:
+            wait = poll_interval if deadline is None else min(poll_interval, deadline - time.monotonic())
+            if wait <= 0:
+                return False
+            with self._changed:
+                if self._seq_written <= seq:
+                    self._changed.wait(wait)
+        return True
+
+    def follow_changes(self, from_seq: int = 0, timeout: Optional[float] = None,
+                       poll_interval: float = CHANGE_POLL_INTERVAL) -> Iterator[List[dict]]:
+        """Blocking generator of read_changes() batches, waiting for new writes between them; see tail()."""
+        seq = from_seq
+        while True:
+            records, seq = self.read_changes(seq)
+            if records:
+                yield records
+            elif not self.wait_for_changes(seq, timeout, poll_interval):
+                return
+
+    async def afollow_changes(self, from_seq: int = 0, timeout: Optional[float] = None,
+                              poll_interval: float = CHANGE_POLL_INTERVAL):
+        """Async version of follow_changes(); reads and waits in worker threads, the event loop is never blocked."""
+        seq = from_seq
+        idle_since = time.monotonic()
+        while True:
+            records, seq = await asyncio.to_thread(self.read_changes, seq)
+            if records:
+                idle_since = time.monotonic()
+                yield records
+                continue
+            idle = time.monotonic() - idle_since
+            if timeout is not None and idle >= timeout:
+                return
+            # Short waits, so a cancelled consumer does not leave a thread blocked for long
+            wait = poll_interval if timeout is None else min(poll_interval, timeout - idle)
+            await asyncio.to_thread(self.wait_for_changes, seq, wait, poll_interval)
+
+    def tail(self, from_seq: int = 0, timeout: Optional[float] = None,
+             poll_interval: float = CHANGE_POLL_INTERVAL) -> Iterator[dict]:
+        """
+        Blocking generator of the comments written after from_seq, in write order,
+        each with its "seq", following new writes as they are stored. Each poll
+        costs O(new comments): only partitions and blocks with newer writes are read.
+
+        Args:
+            from_seq: Last sequence number already processed, 0 for everything
+            timeout: Stop after this many seconds without new comments; never when None
+            poll_interval: Seconds between checks for writes of other processes
+
+        Yields:
+            Comment dicts with "id" and "seq"
+        """
+        for records in self.follow_changes(from_seq, timeout, poll_interval):
+            yield from records
+
+    async def atail(self, from_seq: int = 0, timeout: Optional[float] = None,
+                    poll_interval: float = CHANGE_POLL_INTERVAL):
+        """Async iterator version of tail()."""
+        async for records in self.afollow_changes(from_seq, timeout, poll_interval):
+            for record in records:
+                yield record
+
     def get_all_comments(self) -> List[Comment]:
         try:
-            with open(self.db_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            return [Comment(id=k, **v) for k, v in data.items()]
+            return [Comment(**record) for record in self.iter_comments()]
         except Exception as e:
             self._logger.error(f"Error retrieving all comments: {e}")
             return []
 
-    def save_comments_to_db(self, comments: List[Comment]) -> Optional[bool]:
-        """Сохраняет список комментариев в базу данных."""
-        try:
-            for comment in comments:
-                self._storage.add(comment.dict())
-            self._logger.info(f"✓ Сохранено {len(comments)} комментариев в базу данных.")
+    def iter_comments(
+        self,
+        source: Optional[str] = None,
+        url: Optional[str] = None,
+        author: Optional[str] = None,
+        date_from: Union[datetime, str, float, None] = None,
+        date_to: Union[datetime, str, float, None] = None,
+        min_likes: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> Iterator[dict]:
+        """
+        Streams stored comments matching all given filters in constant memory.
+
+        Partitions outside the source and date filters are skipped, as are blocks
+        whose index entry rules out a match (source, date range, likes). Comments
+        come partition by partition (source, then date), in write order within one,
+        followed by those still in the write-ahead log.
+
+        Args:
+            source: Platform (telegram/vk/youtube)
+            url: Exact source URL
+            author: Exact author
+            date_from: Inclusive lower bound (datetime, ISO or relative string, UTC timestamp)
+            date_to: Exclusive upper bound; comments with unparseable dates are skipped when a bound is set
+            min_likes: Minimum likes
+            fields: Projection, e.g. ["id", "content"]; all fields when None
+            offset: Number of matching comments to skip (pagination)
+            limit: Maximum number of comments to yield
+
+        Yields:
+            Comment dicts with an "id" key
+        """
+        ts_from = parse_date(date_from)
+        ts_to = parse_date(date_to)
+        matched = 0
+        yielded = 0
+        if limit is not None and limit <= 0:
+            return
+
+        def may_match(block: dict) -> bool:
+            if source is not None and source not in block["sources"]:
+                return False
+            if min_likes is not None and block["max_likes"] is not None and block["max_likes"] < min_likes:
+                return False
+            if ts_from is not None or ts_to is not None:
+                if block["min_ts"] is None:
+                    return False
+                if (ts_from is not None and block["max_ts"] < ts_from) or (ts_to is not None and block["min_ts"] >= ts_to):
+                    return False
             return True
-        except Exception as e:
-            self._logger.error(f"Ошибка при сохранении комментариев в БД: {e}")
-            return False
+
+        partitions, tail = self._snapshot(source, ts_from, ts_to)
+        scans = [iter_segment_records(segment, may_match, blocks) for segment, blocks in partitions]
+        for record in itertools.chain(*scans, tail):
+            if source is not None and record.get('source') != source:
+                continue
+            if url is not None and record.get('url') != url:
+                continue
+            if author is not None and record.get('author') != author:
+                continue
+            if min_likes is not None and record.get('likes', 0) < min_likes:
+                continue
+            if ts_from is not None or ts_to is not None:
+                ts = record_timestamp(record)
+                if ts is None or (ts_from is not None and ts < ts_from) or (ts_to is not None and ts >= ts_to):
+                    continue
+            matched += 1
+            if matched <= offset:
+                continue
+            if fields is not None:
+                record = {field: record.get(field) for field in fields}
+            yield record
+            yielded += 1
+            if limit is not None and yielded >= limit:
+                return
+
+    def save_comments_to_db(self, comments: List[CreateComment]) -> Optional[bool]:
+        """Сохраняет список комментариев в базу данных."""
+        saved = self.create_comments(comments)
+        if saved:
+            self._logger.info(f"✓ Сохранено {saved} комментариев в базу данных.")
+        return saved > 0
@@ -0,0 +1,145 @@
+import hashlib
+import time
+from logging import getLogger
+from typing import Callable, Dict, Optional
+
+from .comments_storage import CommentsStorage
+from .partitions import DAY, parse_partition_key, partition_range
+
+# Retention key applying to every source without its own entry
+ANY_SOURCE = "*"
+# Replaced files are deleted this long after the swap, readers that started before it finish on them
+DEFAULT_GRACE_SECONDS = 600
+
+
+def parse_retention(spec: str) -> Dict[str, int]:
+    """Parses "vk=30,telegram=7,*=365" into days to keep per source ("*": any other source)."""
+    retention = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        source, sep, days = item.partition("=")
+        if not sep or not days.strip().isdigit():
+            raise ValueError(f"Invalid retention {item!r}, expected <source>=<days>")
+        retention[source.strip()] = int(days)
+    return retention
+
+
+def duplicate_filter() -> Callable[[dict], bool]:
+    """
+    keep() for CommentsStorage.rewrite_partition that drops repeated comments: the
+    same id, or the same source, url, author, date and text (the same comment
+    fetched again by a later crawl). Remembers 16-byte digests, one partition at a time.
+    """
+    seen = set()
+
+    def keep(record: dict) -> bool:
+        content_key = "\x1f".join(str(record.get(field) or "") for field in ("source", "url", "author", "date", "content"))
+        keys = (b"i" + hashlib.blake2b(str(record.get('id')).encode('utf-8'), digest_size=15).digest(),
+                b"c" + hashlib.blake2b(content_key.encode('utf-8'), digest_size=15).digest())
+        if keys[0] in seen or keys[1] in seen:
+            return False
+        seen.update(keys)
+        return True
+
+    return keep
+
+
+class Compactor:
+    """
+    Compaction and retention for a CommentsStorage, run from the CLI (--compact) or cron.
+
+    Works partition by partition, so memory holds one block plus the dedup digests
+    of one partition:
+    - partitions older than their source's retention are dropped whole;
+    - partitions appended to since their last compaction are rewritten into full
+      blocks with a fresh index if they have more blocks than needed or hold
+      duplicates (see duplicate_filter); unchanged partitions are skipped;
+    - files replaced more than grace_seconds ago are deleted.
+
+    Removing or rewriting comments bumps the storage epoch: derived copies such as
+    ColumnarStore and TextIndex still hold the removed comments until their next
+    build(), which then starts over.
+
+        report = Compactor(CommentsStorage(), retention_days={"vk": 30, "*": 365}).run()
+    """
+
+    def __init__(self, storage: CommentsStorage, retention_days: Optional[Dict[str, int]] = None,
+                 dedup: bool = True, force: bool = False, grace_seconds: float = DEFAULT_GRACE_SECONDS):
+        self._logger = getLogger("Compactor")
+        self.storage = storage
+        self.retention_days = dict(retention_days or {})
+        self.dedup = dedup
+        # Rewrite every partition, e.g. to re-encode with another codec or block size
+        self.force = force
+        self.grace_seconds = grace_seconds
+
+    def is_expired(self, key: str, now: float) -> bool:
+        source, day = parse_partition_key(key)
+        days = self.retention_days.get(source, self.retention_days.get(ANY_SOURCE))
+        bounds = partition_range(day)
+        # Comments without a date are never expired
+        return days is not None and bounds is not None and bounds[1] <= now - days * DAY
+
+    def needs_rewrite(self, key: str, partition: dict) -> bool:
+        if self.force:
+            return True
+        if partition.get("compacted_bytes") == partition["data_bytes"]:
+            return False
+        # Each checkpoint appends a partly filled block to every partition it touches
+        if partition.get("blocks", 0) > -(-partition["count"] // self.storage.block_size):
+            return True
+        if self.dedup:
+            keep = duplicate_filter()
+            return not all(keep(record) for record in self.storage.iter_partition(key))
+        return False
+
+    def run(self, now: Optional[float] = None) -> Dict:
+        """
+        Runs one compaction pass.
+
+        Args:
+            now: Reference time for retention, time.time() by default
+
+        Returns:
+            Dict: partitions dropped/rewritten, comments expired/deduplicated,
+            bytes reclaimed (old minus new size of the touched partitions) and
+            bytes deleted from disk in this pass
+        """
+        now = time.time() if now is None else now
+        started = time.perf_counter()
+        report = {"partitions": 0, "dropped": 0, "rewritten": 0, "expired": 0, "duplicates": 0,
+                  "reclaimed_bytes": 0, "deleted_bytes": 0}
+        # Comments still in the write-ahead log belong to partitions as well
+        self.storage.checkpoint()
+        for key, partition in self.storage.partitions().items():
+            report["partitions"] += 1
+            try:
+                if self.is_expired(key, now):
+                    dropped = self.storage.drop_partition(key)
+                    if dropped is not None:
+                        report["dropped"] += 1
+                        report["expired"] += dropped["count"]
+                        report["reclaimed_bytes"] += dropped["data_bytes"] + dropped["index_bytes"]
+                    continue
+                if not self.needs_rewrite(key, partition):
+                    self.storage.mark_compacted(key)
+                    continue
+                result = self.storage.rewrite_partition(key, duplicate_filter() if self.dedup else None)
+                if result is not None:
+                    report["rewritten"] += 1
+                    report["duplicates"] += result["removed"]
+                    report["reclaimed_bytes"] += result["bytes_before"] - result["bytes_after"]
+            except Exception as e:
+                # One broken partition must not stop the others from being compacted
+                self._logger.error(f"Compaction of {key} failed: {e}")
+                print(f"✗ Compaction of {key} failed: {e}")
+        report["deleted_bytes"] = self.storage.remove_obsolete(self.grace_seconds)
+        report["elapsed"] = time.perf_counter() - started
+        self._logger.info(f"Compaction: {report}")
+        return report
+
+
+def print_compaction_report(report: Dict) -> None:
+    print(f"✓ Compacted {report['partitions']} partitions in {report['elapsed']:.1f}s: "
+          f"{report['rewritten']} rewritten, {report['dropped']} dropped")
+    print(f"✓ Removed {report['duplicates']} duplicates and {report['expired']} expired comments, "
+          f"reclaimed {report['reclaimed_bytes'] / 1e6:.2f} MB ({report['deleted_bytes'] / 1e6:.2f} MB deleted now)")
@@ -0,0 +1,183 @@
+import hashlib
+import random
+import re
+import threading
+import unicodedata
+import zlib
+from collections import Counter, OrderedDict
+from logging import getLogger
+from typing import Dict, List, Optional, Tuple
+
+# Vectorized MinHash when NumPy is available, plain Python otherwise
+try:
+    import numpy as np
+    _HAS_NUMPY = True
+except Exception:
+    np = None
+    _HAS_NUMPY = False
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_NON_WORD = re.compile(r"[\W_]+")
+
+ACTIONS = ("tag", "drop")
+
+
+def normalize_for_shingles(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def shingles(text: str, size: int = 5) -> List[int]:
+    """Hashes of the character n-grams of already normalized text."""
+    if len(text) <= size:
+        return [zlib.crc32(text.encode('utf-8')) % _MERSENNE_PRIME]
+    return list({zlib.crc32(text[i:i + size].encode('utf-8')) % _MERSENNE_PRIME
+                 for i in range(len(text) - size + 1)})
+
+
+class NearDuplicateDetector:
+    """
+    Streaming near-duplicate detection with MinHash signatures and an LSH index.
+
+    Registered as a CommentsStorage processor it sees every batch from every parser
+    before it is stored. Comments whose estimated Jaccard similarity to an earlier
+    one reaches the threshold join that comment's cluster and are either tagged with
+    "duplicate_of": <cluster id> or dropped. Memory stays bounded: only the latest
+    max_signatures signatures are kept in the index.
+
+        storage = CommentsStorage(processors=[NearDuplicateDetector(action="drop"), TranslationService("ru")])
+    """
+
+    def __init__(self, threshold: float = 0.8, action: str = "tag", num_perm: int = 64, bands: int = 16,
+                 shingle_size: int = 5, min_length: int = 20, max_signatures: int = 200000,
+                 max_clusters: int = 10000, seed: int = 1):
+        if action not in ACTIONS:
+            raise ValueError(f"action must be one of {ACTIONS}")
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self._logger = getLogger("NearDuplicateDetector")
+        self.threshold = threshold
+        self.action = action
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.min_length = min_length
+        self.max_signatures = max_signatures
+        self.max_clusters = max_clusters
+
+        rng = random.Random(seed)
+        self._a = [rng.randrange(1, _MERSENNE_PRIME) for _ in range(num_perm)]
+        self._b = [rng.randrange(0, _MERSENNE_PRIME) for _ in range(num_perm)]
+        if _HAS_NUMPY:
+            self._a_np = np.array(self._a, dtype=np.int64)[:, None]
+            self._b_np = np.array(self._b, dtype=np.int64)[:, None]
+
+        # signature id -> (signature, cluster id, band keys), oldest first
+        self._signatures: "OrderedDict[int, Tuple[tuple, str, List[int]]]" = OrderedDict()
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(bands)]
+        self._next_id = 0
+        self._cluster_sizes: Counter = Counter()
+        self._cluster_samples: Dict[str, str] = {}
+        # process() is called by every writing thread of a storage
+        self._lock = threading.Lock()
+        self.seen = 0
+        self.duplicates = 0
+
+    def signature(self, text: str) -> tuple:
+        hashes = shingles(normalize_for_shingles(text), self.shingle_size)
+        if _HAS_NUMPY:
+            values = np.array(hashes, dtype=np.int64)[None, :]
+            return tuple(((self._a_np * values + self._b_np) % _MERSENNE_PRIME).min(axis=1).tolist())
+        return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in zip(self._a, self._b))
+
+    def _band_keys(self, signature: tuple) -> List[int]:
+        return [hash(signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def _similarity(self, first: tuple, second: tuple) -> float:
+        return sum(1 for x, y in zip(first, second) if x == y) / self.num_perm
+
+    def match(self, text: str) -> Optional[str]:
+        """
+        Adds a text to the index and returns the cluster id of its near-duplicate, if any.
+
+        Texts shorter than min_length are never treated as duplicates: short replies
+        like "first!" are legitimately repeated by real users.
+        """
+        if len(normalize_for_shingles(text)) < self.min_length:
+            return None
+        signature = self.signature(text)
+        band_keys = self._band_keys(signature)
+
+        best_cluster, best_score = None, 0.0
+        checked = set()
+        for band, key in enumerate(band_keys):
+            for candidate in self._buckets[band].get(key, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                candidate_signature, cluster, _ = self._signatures[candidate]
+                score = self._similarity(signature, candidate_signature)
+                if score > best_score:
+                    best_cluster, best_score = cluster, score
+
+        duplicate = best_cluster if best_score >= self.threshold else None
+        cluster = duplicate or hashlib.sha1(normalize_for_shingles(text).encode('utf-8')).hexdigest()[:12]
+        if duplicate:
+            self._count_duplicate(cluster, text)
+        self._insert(signature, cluster, band_keys)
+        return duplicate
+
+    def _insert(self, signature: tuple, cluster: str, band_keys: List[int]) -> None:
+        signature_id = self._next_id
+        self._next_id += 1
+        self._signatures[signature_id] = (signature, cluster, band_keys)
+        for band, key in enumerate(band_keys):
+            self._buckets[band].setdefault(key, []).append(signature_id)
+        while len(self._signatures) > self.max_signatures:
+            old_id, (_, _, old_keys) = self._signatures.popitem(last=False)
+            for band, key in enumerate(old_keys):
+                bucket = self._buckets[band].get(key)
+                if bucket:
+                    bucket.remove(old_id)
+                    if not bucket:
+                        del self._buckets[band][key]
+
+    def _count_duplicate(self, cluster: str, text: str) -> None:
+        self.duplicates += 1
+        if cluster not in self._cluster_sizes:
+            # the first member is not counted as a duplicate but belongs to the cluster
+            self._cluster_sizes[cluster] = 1
+            self._cluster_samples[cluster] = text[:200]
+        self._cluster_sizes[cluster] += 1
+        if len(self._cluster_sizes) > self.max_clusters:
+            for small, _ in self._cluster_sizes.most_common()[self.max_clusters // 2:]:
+                del self._cluster_sizes[small]
+                self._cluster_samples.pop(small, None)
+
+    def process(self, records: List[dict]) -> List[dict]:
+        """CommentsStorage processor hook: tags or drops near-duplicate records."""
+        result = []
+        with self._lock:
+            for record in records:
+                self.seen += 1
+                cluster = self.match(record.get('content', ''))
+                if cluster is None:
+                    result.append(record)
+                elif self.action == "tag":
+                    result.append(dict(record, duplicate_of=cluster))
+        return result
+
+    def stats(self, top: int = 10) -> dict:
+        """Counters and the largest clusters seen so far."""
+        return {
+            "seen": self.seen,
+            "duplicates": self.duplicates,
+            "duplicate_ratio": self.duplicates / self.seen if self.seen else 0.0,
+            "clusters": len(self._cluster_sizes),
+            "tracked_signatures": len(self._signatures),
+            "top_clusters": [
+                {"cluster": cluster, "size": size, "sample": self._cluster_samples.get(cluster, "")}
+                for cluster, size in self._cluster_sizes.most_common(top)
+            ],
+        }
@@ -0,0 +1,112 @@
+import csv
+import json
+from typing import Iterable, Optional, Sequence
+
+EXPORT_FIELDS = ["id", "url", "content", "likes", "date", "source", "author"]
+
+# Parquet export is optional, like undetected_chromedriver for Selenium
+try:
+    import pyarrow
+    import pyarrow.parquet as pq
+    _HAS_PYARROW = True
+except Exception:
+    _HAS_PYARROW = False
+
+
+def export_jsonl(comments: Iterable[dict], path: str) -> int:
+    """
+    Writes comments as JSON Lines, one comment per line.
+
+    Args:
+        comments: Comment dicts, e.g. CommentsStorage.iter_comments(...)
+        path: Output file
+
+    Returns:
+        int: number of exported comments
+    """
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for comment in comments:
+            f.write(json.dumps(comment, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def export_csv(comments: Iterable[dict], path: str, fields: Optional[Sequence[str]] = None) -> int:
+    """
+    Writes comments as CSV with a header row.
+
+    Args:
+        comments: Comment dicts
+        path: Output file
+        fields: Columns to write, EXPORT_FIELDS by default
+
+    Returns:
+        int: number of exported comments
+    """
+    count = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(fields or EXPORT_FIELDS), extrasaction='ignore')
+        writer.writeheader()
+        for comment in comments:
+            writer.writerow(comment)
+            count += 1
+    return count
+
+
+def export_parquet(comments: Iterable[dict], path: str, fields: Optional[Sequence[str]] = None,
+                   row_group_size: int = 50000) -> int:
+    """
+    Writes comments to a Parquet file, buffering at most one row group in memory.
+
+    Requires pyarrow (pip install pyarrow).
+
+    Args:
+        comments: Comment dicts
+        path: Output file
+        fields: Columns to write, EXPORT_FIELDS by default
+        row_group_size: Comments per row group
+
+    Returns:
+        int: number of exported comments
+    """
+    if not _HAS_PYARROW:
+        raise ImportError("Parquet export requires pyarrow: pip install pyarrow")
+
+    fields = list(fields or EXPORT_FIELDS)
+    schema = pyarrow.schema([(field, pyarrow.int64() if field == "likes" else pyarrow.string()) for field in fields])
+    columns: dict = {field: [] for field in fields}
+    count = 0
+
+    def flush(writer):
+        writer.write_table(pyarrow.table(columns, schema=schema))
+        for values in columns.values():
+            values.clear()
+
+    with pq.ParquetWriter(path, schema) as writer:
+        for comment in comments:
+            for field in fields:
+                value = comment.get(field)
+                columns[field].append(value if value is None or field == "likes" else str(value))
+            count += 1
+            if count % row_group_size == 0:
+                flush(writer)
+        if count % row_group_size or not count:
+            flush(writer)
+    return count
+
+
+EXPORTERS = {
+    ".jsonl": export_jsonl,
+    ".csv": export_csv,
+    ".parquet": export_parquet,
+}
+
+
+def export_comments(comments: Iterable[dict], path: str) -> int:
+    """Exports comments picking the format from the file extension (.jsonl, .csv, .parquet)."""
+    for extension, exporter in EXPORTERS.items():
+        if path.endswith(extension):
+            return exporter(comments, path)
+    raise ValueError(f"Unsupported export format: {path}")
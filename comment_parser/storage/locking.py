@@ -0,0 +1,62 @@
+import os
+import time
+
+# flock on POSIX, byte range locks on Windows
+try:
+    import fcntl
+    _HAS_FCNTL = True
+except Exception:
+    fcntl = None
+    _HAS_FCNTL = False
+
+try:
+    import msvcrt
+    _HAS_MSVCRT = True
+except Exception:
+    msvcrt = None
+    _HAS_MSVCRT = False
+
+
+class FileLock:
+    """
+    Advisory lock shared by every process that opens the same lock file.
+
+    Uses fcntl.flock where available (shared or exclusive) and falls back to
+    msvcrt.locking on Windows, where every lock is exclusive. The lock is held
+    per instance, not per thread: guard an instance with a threading lock too.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.01):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+
+    def acquire(self, shared: bool = False) -> None:
+        if _HAS_FCNTL:
+            fcntl.flock(self._fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        elif _HAS_MSVCRT:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            while True:
+                try:
+                    msvcrt.locking(self._fd, msvcrt.LK_NBLCK, 1)
+                    return
+                except OSError:
+                    time.sleep(self.poll_interval)
+
+    def release(self) -> None:
+        if _HAS_FCNTL:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        elif _HAS_MSVCRT:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
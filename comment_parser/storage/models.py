@@ -1,3 +1,4 @@
+from typing import NamedTuple, Optional
 from pydantic import BaseModel 
 
 class Comment(BaseModel): 
@@ -7,6 +8,10 @@ class Comment(BaseModel):
     likes: int 
     date: str  
     source: str
+    author: str = ""
+    duplicate_of: Optional[str] = None
+    timestamp: Optional[int] = None
+    seq: Optional[int] = None
 
 class CreateComment(BaseModel):
     url: str
@@ -14,4 +19,18 @@ class CreateComment(BaseModel):
     likes: int 
     date: str 
     source: str 
-    author: str 
\ No newline at end of file
+    author: str
+    timestamp: Optional[int] = None
+
+class CommentRecord(NamedTuple):
+    """Lightweight comment used on the parsing hot path; validated models stay at the API boundary.
+
+    timestamp is UTC epoch seconds; when None, storage derives it from date.
+    """
+    url: str
+    content: str
+    likes: int
+    date: str
+    source: str
+    author: str
+    timestamp: Optional[int] = None
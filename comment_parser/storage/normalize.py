@@ -0,0 +1,176 @@
+import re
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Iterable, List, Optional, Union
+
+# Seconds per relative-date unit, keyed by the unit stems used in the locale patterns below
+_UNIT_SECONDS = {
+    "second": 1, "minute": 60, "hour": 3600, "day": 86400, "week": 7 * 86400,
+    "month": 30 * 86400, "year": 365 * 86400,
+}
+
+_UNIT_STEMS = {
+    "second": ("second", "sec", "секунд", "сек", "sekunde", "segundo", "seconde"),
+    "minute": ("minute", "min", "минут", "мин", "хвилин", "хв", "minuto"),
+    "hour": ("hour", "час", "ч", "годин", "stunde", "hora", "heure"),
+    "day": ("day", "дн", "день", "tag", "día", "dia", "jour"),
+    "week": ("week", "недел", "неделю", "нед", "тижн", "тиждень", "тиж", "woche", "semana", "semaine"),
+    "month": ("month", "месяц", "мес", "місяц", "міс", "monat", "mes", "mois"),
+    "year": ("year", "год", "г", "лет", "рік", "рок", "jahr", "año", "an"),
+}
+
+_RELATIVE_PATTERNS = [
+    re.compile(r"(?P<n>\d+|an?|one)?\s*(?P<unit>[a-z]+?)s?\s+ago"),                       # en
+    re.compile(r"(?P<n>\d+|одну|один|одна)?\s*(?P<unit>[а-яё]+?)\.?\s+назад"),              # ru, "4 ч. назад"
+    re.compile(r"(?P<n>\d+)?\s*(?P<unit>[а-яіїєґ]+?)\.?\s+тому"),                           # uk
+    re.compile(r"vor\s+(?P<n>\d+|einem|einer)\s+(?P<unit>[a-zä]+)"),                        # de
+    re.compile(r"hace\s+(?P<n>\d+|un|una)\s+(?P<unit>[a-zñí]+)"),                           # es
+    re.compile(r"il y a\s+(?P<n>\d+|un|une)\s+(?P<unit>[a-z]+)"),                           # fr
+]
+
+_JUST_NOW = ("just now", "только что", "щойно", "gerade eben", "justo ahora", "à l'instant")
+_EDITED = re.compile(r"\((edited|изменено|змінено|bearbeitet|editado|modifié)\)")
+_PREFIXES = re.compile(r"^(streamed|premiered|трансляция закончилась|премьера состоялась)\s+")
+
+_LIKES = re.compile(r"^(?P<number>\d[\d\s  .,]*)\s*(?P<suffix>[^\d\s]*)$")
+_LIKES_MULTIPLIERS = {
+    "": 1,
+    "k": 1_000, "к": 1_000, "тыс": 1_000, "тис": 1_000, "tsd": 1_000, "mil": 1_000,
+    "m": 1_000_000, "млн": 1_000_000, "mio": 1_000_000, "mln": 1_000_000,
+    "b": 1_000_000_000, "млрд": 1_000_000_000, "mrd": 1_000_000_000,
+}
+
+
+def _unit(stem: str) -> Optional[str]:
+    for unit, stems in _UNIT_STEMS.items():
+        if any(stem.startswith(candidate) for candidate in stems):
+            return unit
+    return None
+
+
+@lru_cache(maxsize=65536)
+def relative_offset(text: str) -> Optional[int]:
+    """Seconds before "now" described by relative text like "3 weeks ago" or "2 дня назад"."""
+    text = _PREFIXES.sub("", _EDITED.sub("", text.strip().casefold())).strip()
+    if text in _JUST_NOW:
+        return 0
+    for pattern in _RELATIVE_PATTERNS:
+        match = pattern.search(text)
+        if not match:
+            continue
+        unit = _unit(match.group("unit"))
+        if unit is None:
+            continue
+        n = match.group("n")
+        count = int(n) if n and n.isdigit() else 1
+        return count * _UNIT_SECONDS[unit]
+    return None
+
+
+@lru_cache(maxsize=65536)
+def _absolute_timestamp(text: str) -> Optional[int]:
+    text = text.strip()
+    # fromisoformat() only accepts a "Z" UTC suffix from Python 3.11 on
+    if text[-1:] in ("Z", "z"):
+        text = text[:-1] + "+00:00"
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def parse_absolute_date(text: Optional[str]) -> Optional[int]:
+    """UTC timestamp of an ISO date string; relative text ("3 weeks ago") gives None."""
+    if not text or not isinstance(text, str):
+        return None
+    return _absolute_timestamp(text)
+
+
+def parse_date(value: Union[str, int, float, datetime, None], now: Optional[float] = None) -> Optional[int]:
+    """
+    Converts any stored date to a UTC epoch timestamp.
+
+    Accepts epoch numbers, datetimes, ISO strings (naive ones are taken as UTC) and
+    relative text in English, Russian, Ukrainian, German, Spanish and French, which is
+    resolved against now (defaults to the current time).
+
+    Returns:
+        int timestamp or None if the value cannot be parsed
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    timestamp = _absolute_timestamp(value)
+    if timestamp is not None:
+        return timestamp
+    offset = relative_offset(value)
+    if offset is None:
+        return None
+    return int((time.time() if now is None else now) - offset)
+
+
+def parse_dates(values: Iterable, now: Optional[float] = None) -> List[Optional[int]]:
+    """Batch version of parse_date: every distinct value is parsed once."""
+    now = time.time() if now is None else now
+    values = list(values)
+    parsed = {}
+    for value in values:
+        key = value if isinstance(value, (str, int, float)) or value is None else id(value)
+        if key not in parsed:
+            parsed[key] = parse_date(value, now)
+    return [parsed[value if isinstance(value, (str, int, float)) or value is None else id(value)]
+            for value in values]
+
+
+@lru_cache(maxsize=65536)
+def _parse_likes_text(text: str) -> int:
+    text = text.strip().casefold().replace(" ", " ")
+    match = _LIKES.match(text)
+    if not match:
+        return 0
+    number = match.group("number").strip()
+    suffix = match.group("suffix").rstrip(".")
+    multiplier = _LIKES_MULTIPLIERS.get(suffix)
+    if multiplier is None:
+        return 0
+    if multiplier == 1:
+        # No suffix: separators are thousands separators ("1,234", "1.234", "1 234")
+        digits = re.sub(r"\D", "", number)
+        return int(digits) if digits else 0
+    number = re.sub(r"[\s ]", "", number).replace(",", ".")
+    try:
+        return int(round(float(number) * multiplier))
+    except ValueError:
+        return 0
+
+
+def parse_likes(value: Union[str, int, float, None]) -> int:
+    """Converts like counters such as 12, "1.2K", "1,2 тыс." or "3M" to an int."""
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return int(value)
+    return _parse_likes_text(str(value))
+
+
+def parse_likes_batch(values: Iterable) -> List[int]:
+    return [parse_likes(value) for value in values]
+
+
+def normalize_record(record: dict, now: Optional[float] = None) -> dict:
+    """Fills record["timestamp"] (UTC epoch seconds) and makes record["likes"] an int, in place."""
+    if record.get('timestamp') is None:
+        record['timestamp'] = parse_date(record.get('date'), now)
+    record['likes'] = parse_likes(record.get('likes'))
+    return record
@@ -0,0 +1,48 @@
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from urllib.parse import quote, unquote
+
+# Partition directories are source=<source>/date=<YYYY-MM-DD> of the comment's UTC date
+UNKNOWN = "unknown"
+DAY = 86400
+
+
+def partition_key(source: Optional[str], timestamp: Optional[int]) -> str:
+    """Relative directory of the partition holding a comment, e.g. "source=vk/date=2026-10-16"."""
+    day = datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%d") if timestamp is not None else UNKNOWN
+    return f"source={quote(source or UNKNOWN, safe='')}/date={day}"
+
+
+def parse_partition_key(key: str) -> Tuple[str, str]:
+    """(source, date) of a partition key; date is YYYY-MM-DD or "unknown"."""
+    source_part, date_part = key.split("/")
+    return unquote(source_part[len("source="):]), date_part[len("date="):]
+
+
+def partition_range(day: str) -> Optional[Tuple[int, int]]:
+    """[start, end) UTC timestamps of a partition date, None for the unknown date partition."""
+    if day == UNKNOWN:
+        return None
+    start = datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    return int(start.timestamp()), int((start + timedelta(days=1)).timestamp())
+
+
+def partition_may_match(key: str, source: Optional[str] = None, ts_from: Optional[float] = None,
+                        ts_to: Optional[float] = None) -> bool:
+    """False if no comment of the partition can match the source and [ts_from, ts_to) filters."""
+    partition_source, day = parse_partition_key(key)
+    if source is not None and partition_source != (source or UNKNOWN):
+        return False
+    if ts_from is None and ts_to is None:
+        return True
+    bounds = partition_range(day)
+    if bounds is None:
+        # Comments without a date never match a date filter
+        return False
+    start, end = bounds
+    return (ts_from is None or end > ts_from) and (ts_to is None or start < ts_to)
+
+
+def partition_path(root: str, key: str, file_name: str) -> str:
+    return os.path.join(root, *key.split("/"), file_name)
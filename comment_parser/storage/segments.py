@@ -0,0 +1,327 @@
+import base64
+import gzip
+import hashlib
+import json
+import os
+import struct
+import threading
+from logging import getLogger
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional
+
+# zstd compresses comment text better and decodes several times faster than gzip,
+# but it is an optional dependency; gzip is always available
+try:
+    import zstandard
+    _HAS_ZSTD = True
+except Exception:
+    zstandard = None
+    _HAS_ZSTD = False
+
+CODECS = {"gzip": 1, "zstd": 2}
+_CODEC_NAMES = {codec_id: name for name, codec_id in CODECS.items()}
+DEFAULT_CODEC = "zstd" if _HAS_ZSTD else "gzip"
+DEFAULT_BLOCK_SIZE = 1000
+
+# Every block starts with magic, codec id and payload length, so a segment can be
+# re-indexed by walking the headers if its index is lost
+BLOCK_MAGIC = b"CPSB"
+BLOCK_HEADER = struct.Struct("<4sBI")
+
+# Per-block Bloom filter over comment ids: ~10 bits and 4 probes per id give about 1% false positives
+BLOOM_BITS_PER_ID = 10
+BLOOM_HASHES = 4
+
+
+def index_path(path: str) -> str:
+    return f"{path}.idx"
+
+
+def is_legacy_json(path: str) -> bool:
+    """True if path holds a comments DB in the old single JSON object format."""
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(64).lstrip()
+    except OSError:
+        return False
+    return head.startswith(b"{")
+
+
+# Files next to a segment: block index, write-ahead log, checkpoint and lock (see CommentsStorage)
+SIDE_FILE_SUFFIXES = (".idx", ".wal", ".ckpt", ".lock")
+
+
+def remove_segment(path: str) -> None:
+    """Removes a segment file together with its side files."""
+    for name in [path] + [f"{path}{suffix}" for suffix in SIDE_FILE_SUFFIXES]:
+        try:
+            os.remove(name)
+        except FileNotFoundError:
+            pass
+
+
+def compress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if not _HAS_ZSTD:
+            raise ImportError("zstd segments require zstandard: pip install zstandard")
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    raise ValueError(f"Unknown segment codec: {codec}")
+
+
+def decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if not _HAS_ZSTD:
+            raise ImportError("Segment has zstd blocks, install zstandard to read it: pip install zstandard")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def _bloom_positions(key: str, bits: int) -> List[int]:
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=4 * BLOOM_HASHES).digest()
+    return [int.from_bytes(digest[i:i + 4], 'little') % bits for i in range(0, len(digest), 4)]
+
+
+def bloom_build(keys: List[str]) -> bytes:
+    bits = max(64, -(-len(keys) * BLOOM_BITS_PER_ID // 8) * 8)
+    bloom = bytearray(bits // 8)
+    for key in keys:
+        for position in _bloom_positions(key, bits):
+            bloom[position >> 3] |= 1 << (position & 7)
+    return bytes(bloom)
+
+
+def bloom_contains(bloom: bytes, key: str) -> bool:
+    return all(bloom[position >> 3] & (1 << (position & 7)) for position in _bloom_positions(key, len(bloom) * 8))
+
+
+def block_stats(records: List[dict]) -> dict:
+    """Summary of a block used to skip it in scans: counts per source, date and write sequence range, max likes."""
+    from .comments_storage import record_timestamp
+
+    source_counts: Dict[str, int] = {}
+    timestamps = []
+    max_likes = 0
+    for record in records:
+        source = record.get('source') or ''
+        source_counts[source] = source_counts.get(source, 0) + 1
+        ts = record_timestamp(record)
+        if ts is not None:
+            timestamps.append(ts)
+        likes = record.get('likes', 0)
+        if max_likes is not None:
+            max_likes = max(max_likes, likes) if isinstance(likes, (int, float)) else None
+    return {
+        "count": len(records),
+        "sources": source_counts,
+        "min_ts": min(timestamps) if timestamps else None,
+        "max_ts": max(timestamps) if timestamps else None,
+        "max_likes": max_likes,
+        # Write sequence numbers (CommentsStorage change feed), 0 for comments stored before they existed
+        "min_seq": min((record.get('seq') or 0 for record in records), default=0),
+        "max_seq": max((record.get('seq') or 0 for record in records), default=0),
+        "bloom": bloom_build([record['id'] for record in records]),
+    }
+
+
+def _index_line(entry: dict) -> str:
+    return json.dumps({**entry, "bloom": base64.b64encode(entry["bloom"]).decode('ascii')}, ensure_ascii=False) + "\n"
+
+
+class Segment:
+    """
+    Append-only file of compressed comment blocks with a block index.
+
+    Each block holds up to `block_size` comments (dicts with their "id") as one
+    compressed JSON array, gzip or zstd. The index next to it (`<path>.idx`, one
+    JSON line per block) stores each block's offset and length, per-source counts,
+    date range, max likes and a Bloom filter of its ids, so scans skip blocks that
+    cannot match and a lookup by id only decodes the blocks that may hold it.
+    Appending a batch writes new blocks and index lines, nothing is rewritten.
+    """
+
+    def __init__(self, path: str, codec: Optional[str] = None, block_size: int = DEFAULT_BLOCK_SIZE):
+        codec = codec or DEFAULT_CODEC
+        if codec not in CODECS:
+            raise ValueError(f"Unknown segment codec: {codec}")
+        if codec == "zstd" and not _HAS_ZSTD:
+            raise ImportError("zstd segments require zstandard: pip install zstandard")
+        self._logger = getLogger("Segment")
+        self.path = path
+        self.index_path = index_path(path)
+        self.codec = codec
+        self.block_size = block_size
+        self.blocks: List[dict] = []
+        self._index_pos = 0
+        self._lock = threading.Lock()
+        if not os.path.exists(path):
+            open(path, 'ab').close()
+        if is_legacy_json(path):
+            raise ValueError(f"{path} is a legacy JSON DB, import it with CommentsStorage.import_legacy()")
+        if not os.path.exists(self.index_path):
+            if os.path.getsize(path):
+                self.rebuild_index()
+            else:
+                open(self.index_path, 'ab').close()
+        self.refresh()
+
+    @property
+    def count(self) -> int:
+        self.refresh()
+        return sum(block["count"] for block in self.blocks)
+
+    def disk_bytes(self) -> int:
+        size = os.path.getsize(self.path)
+        if os.path.exists(self.index_path):
+            size += os.path.getsize(self.index_path)
+        return size
+
+    def truncate(self, data_bytes: int, index_bytes: int) -> None:
+        """Cuts data and index back to a checkpointed size, dropping blocks of an interrupted append."""
+        with self._lock:
+            if os.path.getsize(self.path) > data_bytes:
+                os.truncate(self.path, data_bytes)
+            if os.path.getsize(self.index_path) > index_bytes:
+                os.truncate(self.index_path, index_bytes)
+            self.blocks = []
+            self._index_pos = 0
+        self.refresh()
+
+    def refresh(self, index_limit: Optional[int] = None) -> None:
+        """Picks up blocks appended by other Segment instances (or processes) since the last call.
+
+        Args:
+            index_limit: Read the index only up to this many bytes, e.g. a committed checkpoint
+        """
+        with self._lock:
+            if index_limit is not None and self._index_pos > index_limit:
+                # Blocks past the limit were seen before it was known (uncommitted), start over
+                self.blocks = []
+                self._index_pos = 0
+            try:
+                if os.path.getsize(self.index_path) == self._index_pos or self._index_pos == index_limit:
+                    return
+            except FileNotFoundError:
+                return
+            data_size = os.path.getsize(self.path)
+            with open(self.index_path, 'rb') as f:
+                f.seek(self._index_pos)
+                for line in f:
+                    if index_limit is not None and self._index_pos + len(line) > index_limit:
+                        break
+                    if not line.endswith(b"\n"):
+                        # Torn write of the last index line, the block is ignored
+                        break
+                    entry = json.loads(line)
+                    if entry["offset"] + entry["length"] > data_size:
+                        break
+                    entry["bloom"] = base64.b64decode(entry["bloom"])
+                    self.blocks.append(entry)
+                    self._index_pos += len(line)
+
+    def rebuild_index(self) -> int:
+        """Recreates the block index by walking the block headers. Returns the number of blocks."""
+        entries = []
+        with open(self.path, 'rb') as f:
+            offset = 0
+            while True:
+                header = f.read(BLOCK_HEADER.size)
+                if len(header) < BLOCK_HEADER.size:
+                    break
+                magic, codec_id, length = BLOCK_HEADER.unpack(header)
+                payload = f.read(length)
+                if magic != BLOCK_MAGIC or codec_id not in _CODEC_NAMES or len(payload) < length:
+                    self._logger.warning(f"Stopping index rebuild of {self.path} at corrupt block at {offset}")
+                    break
+                codec = _CODEC_NAMES[codec_id]
+                records = json.loads(decompress(codec, payload))
+                entries.append({"offset": offset, "length": BLOCK_HEADER.size + length,
+                                "codec": codec, **block_stats(records)})
+                offset += BLOCK_HEADER.size + length
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(_index_line(entry))
+        os.replace(tmp_path, self.index_path)
+        with self._lock:
+            self.blocks = []
+            self._index_pos = 0
+        return len(entries)
+
+    def encode_block(self, records: List[dict]) -> bytes:
+        payload = compress(self.codec, json.dumps(records, ensure_ascii=False, separators=(",", ":")).encode('utf-8'))
+        return BLOCK_HEADER.pack(BLOCK_MAGIC, CODECS[self.codec], len(payload)) + payload
+
+    def append(self, records: List[dict], fsync: bool = False) -> int:
+        """Appends records (dicts with "id") as one or more blocks. Returns the bytes written."""
+        blocks = []
+        for start in range(0, len(records), self.block_size):
+            chunk = records[start:start + self.block_size]
+            blocks.append((self.encode_block(chunk), {"codec": self.codec, **block_stats(chunk)}))
+        return self.append_encoded(blocks, fsync)
+
+    def append_encoded(self, blocks: List[tuple], fsync: bool = False) -> int:
+        """
+        Appends already encoded (block bytes, stats) pairs, e.g. blocks of another
+        segment as yielded by iter_blocks(). Data goes first, then the index lines,
+        so a crash in between leaves unindexed bytes but never a dangling index entry.
+        """
+        if not blocks:
+            return 0
+        self.refresh()
+        written = 0
+        lines = []
+        with open(self.path, 'ab') as f:
+            offset = f.tell()
+            for data, stats in blocks:
+                f.write(data)
+                lines.append(_index_line({**stats, "offset": offset, "length": len(data)}))
+                offset += len(data)
+                written += len(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        index_data = "".join(lines).encode('utf-8')
+        with open(self.index_path, 'ab') as f:
+            f.write(index_data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        self.refresh()
+        return written + len(index_data)
+
+    def read_raw(self, f: BinaryIO, block: dict) -> bytes:
+        f.seek(block["offset"])
+        return f.read(block["length"])
+
+    def decode(self, block: dict, data: bytes) -> List[dict]:
+        return json.loads(decompress(block["codec"], data[BLOCK_HEADER.size:]))
+
+    def iter_blocks(self, predicate: Optional[Callable[[dict], bool]] = None,
+                    blocks: Optional[List[dict]] = None) -> Iterator[tuple]:
+        """Yields (index entry, raw block bytes) of the blocks accepted by predicate, in write order.
+
+        Iterates a snapshot: `blocks` if given, else the blocks indexed when iteration starts.
+        """
+        if blocks is None:
+            self.refresh()
+            blocks = list(self.blocks)
+        if not blocks:
+            return
+        with open(self.path, 'rb') as f:
+            for block in blocks:
+                if predicate is None or predicate(block):
+                    yield block, self.read_raw(f, block)
+
+    def iter_records(self, predicate: Optional[Callable[[dict], bool]] = None,
+                     blocks: Optional[List[dict]] = None) -> Iterator[dict]:
+        """Streams records block by block, so memory holds one decoded block at a time."""
+        for block, data in self.iter_blocks(predicate, blocks):
+            yield from self.decode(block, data)
+
+    def get(self, comment_id: str) -> Optional[dict]:
+        for record in self.iter_records(lambda block: bloom_contains(block["bloom"], comment_id)):
+            if record.get('id') == comment_id:
+                return record
+        return None
+
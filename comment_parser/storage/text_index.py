@@ -0,0 +1,200 @@
+import re
+import sqlite3
+import threading
+import unicodedata
+from datetime import datetime
+from logging import getLogger
+from typing import Iterable, List, Optional, Union
+
+from .comments_storage import CommentsStorage, record_timestamp
+from .normalize import parse_date
+
+_TOKEN = re.compile(r"[^\W_]+")
+_QUERY_TOKEN = re.compile(r'"[^"]*"|\(|\)|[^\s()"]+')
+_OPERATORS = {"AND", "OR", "NOT"}
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits text into normalized word tokens.
+
+    Works on any Unicode script (Cyrillic, Latin, ...): NFKC normalization,
+    case folding and ё -> е, so "Ёлка", "ёлка" and "елка" match each other.
+    """
+    text = unicodedata.normalize("NFKC", text or "").casefold().replace("ё", "е")
+    return _TOKEN.findall(text)
+
+
+def _phrase(tokens: List[str]) -> str:
+    return '"' + " ".join(tokens) + '"'
+
+
+def build_match_query(query: str) -> str:
+    """
+    Translates a user query into an FTS5 MATCH expression.
+
+    Supported syntax: words (all must match), "exact phrases", OR, NOT / -word
+    and parentheses, e.g. 'спам OR "free money" -bitcoin'.
+    """
+    parts = []
+    for raw in _QUERY_TOKEN.findall(query):
+        if raw in _OPERATORS or raw in ("(", ")"):
+            parts.append(raw)
+            continue
+        negate = raw.startswith("-") and len(raw) > 1
+        if negate:
+            raw = raw[1:]
+        tokens = tokenize(raw.strip('"'))
+        if not tokens:
+            continue
+        if negate:
+            parts.append("NOT")
+        parts.append(_phrase(tokens))
+    if not parts:
+        raise ValueError("Empty search query")
+    if parts[0] in _OPERATORS or parts[-1] in _OPERATORS:
+        raise ValueError("Search query cannot start or end with an operator")
+    return " ".join(parts)
+
+
+class TextIndex:
+    """
+    Full-text inverted index over comment content, stored in SQLite FTS5.
+
+    Attach it as a storage listener so it is updated on every write:
+
+        index = TextIndex("comments_index.sqlite")
+        storage = CommentsStorage(listeners=[index])
+
+    Content is tokenized in Python (see tokenize()) and kept only as postings,
+    source and date are kept alongside for filtering. Compaction can remove
+    comments the index still holds: build() after it reindexes from scratch.
+    """
+
+    def __init__(self, path: str):
+        self._logger = getLogger("TextIndex")
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS docs (
+                rowid INTEGER PRIMARY KEY,
+                comment_id TEXT UNIQUE NOT NULL,
+                source TEXT,
+                ts REAL
+            );
+            CREATE INDEX IF NOT EXISTS docs_source_ts ON docs (source, ts);
+            CREATE VIRTUAL TABLE IF NOT EXISTS postings USING fts5(
+                tokens, content='', tokenize='unicode61 remove_diacritics 0'
+            );
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+        """)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def add(self, comments: Iterable[dict]) -> int:
+        """
+        Indexes comments (dicts with "id"); already indexed ids are skipped.
+
+        Returns:
+            int: number of newly indexed comments
+        """
+        added = 0
+        with self._lock, self._conn:
+            for comment in comments:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO docs (comment_id, source, ts) VALUES (?, ?, ?)",
+                    (comment['id'], comment.get('source'), record_timestamp(comment)),
+                )
+                if not cursor.rowcount:
+                    continue
+                self._conn.execute(
+                    "INSERT INTO postings (rowid, tokens) VALUES (?, ?)",
+                    (cursor.lastrowid, " ".join(tokenize(comment.get('content', '')))),
+                )
+                added += 1
+        return added
+
+    def on_write(self, comments: List[dict]) -> None:
+        self.add(comments)
+
+    @property
+    def epoch(self) -> Optional[int]:
+        """Storage epoch of the last build() (see CommentsStorage.epoch)."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'epoch'").fetchone()
+        return row[0] if row else None
+
+    def _reset(self, epoch: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM docs")
+            self._conn.execute("INSERT INTO postings (postings) VALUES ('delete-all')")
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('epoch', ?)", (epoch,))
+
+    def build(self, storage: CommentsStorage, batch_size: int = 10000) -> int:
+        """
+        Indexes every stored comment that is not in the index yet.
+
+        If the storage was compacted since the last build (its epoch changed), the
+        index is emptied first, so comments removed by dedup or retention are no
+        longer found.
+        """
+        epoch = storage.epoch
+        if epoch != self.epoch:
+            self._reset(epoch)
+        added = 0
+        batch = []
+        for comment in storage.iter_comments(fields=['id', 'content', 'source', 'date', 'timestamp']):
+            batch.append(comment)
+            if len(batch) >= batch_size:
+                added += self.add(batch)
+                batch = []
+        if batch:
+            added += self.add(batch)
+        return added
+
+    def search(
+        self,
+        query: str,
+        source: Optional[str] = None,
+        date_from: Union[datetime, str, float, None] = None,
+        date_to: Union[datetime, str, float, None] = None,
+        limit: Optional[int] = 100,
+    ) -> List[str]:
+        """
+        Finds comments matching a query, best matches first.
+
+        Args:
+            query: Words, "phrases", OR, NOT/-word, parentheses (see build_match_query)
+            source: Only comments from this platform
+            date_from: Inclusive lower date bound
+            date_to: Exclusive upper date bound
+            limit: Maximum number of results (None for all)
+
+        Returns:
+            List of comment ids
+        """
+        sql = ["SELECT docs.comment_id FROM postings JOIN docs ON docs.rowid = postings.rowid",
+               "WHERE postings MATCH ?"]
+        params: list = [build_match_query(query)]
+        if source is not None:
+            sql.append("AND docs.source = ?")
+            params.append(source)
+        if date_from is not None:
+            sql.append("AND docs.ts >= ?")
+            params.append(parse_date(date_from))
+        if date_to is not None:
+            sql.append("AND docs.ts < ?")
+            params.append(parse_date(date_to))
+        sql.append("ORDER BY postings.rank")
+        if limit is not None:
+            sql.append("LIMIT ?")
+            params.append(limit)
+        with self._lock:
+            return [row[0] for row in self._conn.execute(" ".join(sql), params)]
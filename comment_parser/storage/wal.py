@@ -0,0 +1,106 @@
+import json
+import os
+import struct
+import zlib
+from logging import getLogger
+from typing import Iterator, List, Tuple
+
+# Every entry is framed with payload length, CRC32 of the payload and the batch
+# sequence number, so a write torn by a crash is detected and cut off on replay
+WAL_HEADER = struct.Struct("<IIQ")
+
+
+def fsync_dir(path: str) -> None:
+    """Makes a rename in the directory of path durable (no-op where directories cannot be opened)."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: str, data: bytes, fsync: bool = True) -> None:
+    """Replaces path with data via a temporary file and rename: readers see the old or the new file, never a mix."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    if fsync:
+        fsync_dir(path)
+
+
+class WriteAheadLog:
+    """
+    Append-only log of comment batches not yet checkpointed into the segment.
+
+    A batch is acknowledged once its entry is in the log (and fsynced when
+    fsync=True). Replaying after a crash returns every complete entry and
+    truncates a torn last one.
+    """
+
+    def __init__(self, path: str, fsync: bool = True):
+        self._logger = getLogger("WriteAheadLog")
+        self.path = path
+        self.fsync = fsync
+        if not os.path.exists(path):
+            open(path, 'ab').close()
+
+    def append(self, seq: int, records: List[dict]) -> int:
+        """Appends one batch. Returns the bytes written."""
+        payload = json.dumps(records, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+        entry = WAL_HEADER.pack(len(payload), zlib.crc32(payload), seq) + payload
+        with open(self.path, 'ab') as f:
+            f.write(entry)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        return len(entry)
+
+    def replay(self, after_seq: int = 0, start: int = 0,
+               truncate: bool = True) -> Iterator[Tuple[int, List[dict], int]]:
+        """
+        Yields (seq, records, end offset) of complete entries newer than after_seq.
+
+        Args:
+            after_seq: Skip entries up to this (checkpointed) sequence number
+            start: Byte offset to read from, the end offset of an entry seen before
+            truncate: Cut off an incomplete last entry; only safe while holding the writer lock
+        """
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            while True:
+                start = f.tell()
+                header = f.read(WAL_HEADER.size)
+                if not header:
+                    return
+                payload = b""
+                if len(header) == WAL_HEADER.size:
+                    length, crc, seq = WAL_HEADER.unpack(header)
+                    payload = f.read(length)
+                if len(header) < WAL_HEADER.size or len(payload) < length or zlib.crc32(payload) != crc:
+                    break
+                if seq > after_seq:
+                    yield seq, json.loads(payload), f.tell()
+        if not truncate:
+            return
+        self._logger.warning(f"Discarding torn write-ahead log tail of {self.path} at byte {start}")
+        print(f"⚠ Discarding torn write-ahead log tail of {self.path} at byte {start}")
+        os.truncate(self.path, start)
+
+    def reset(self) -> None:
+        """Empties the log once its batches are checkpointed."""
+        with open(self.path, 'r+b') as f:
+            f.truncate(0)
+            if self.fsync:
+                os.fsync(f.fileno())
+
+    def size(self) -> int:
+        return os.path.getsize(self.path)
@@ -1,13 +1,86 @@
 
 import asyncio
-from typing import List, Dict, Optional
+import json
+from collections import OrderedDict
+from logging import getLogger
+from typing import Callable, List, Dict, Optional, Tuple
 
-from telethon import TelegramClient
+from telethon import TelegramClient, events, utils
 from telethon.tl.functions.channels import GetFullChannelRequest
 from telethon.tl.types import Message
 
 from ..storage.comments_storage import CommentsStorage
-from ..storage.models import CreateComment
+from ..storage.models import CommentRecord
+from ..storage.wal import atomic_write
+from ..monitoring.metrics import COMMENTS_FETCHED, SLEEP_SECONDS
+from ..monitoring.profiling import phase
+
+# Message ids remembered per discussion group to drop events that a backfill also returned
+LIVE_RECENT_IDS = 10000
+
+
+class CommentBatcher:
+    """
+    Writes comments that arrive one at a time (live mode) to storage in batches.
+
+    A batch is written when it holds max_batch comments or when its first comment
+    has waited flush_interval seconds, so a comment is stored at most
+    flush_interval (plus one write) after it arrived. Writes run in a worker
+    thread, the event loop keeps receiving updates meanwhile. After each write
+    on_flush gets the highest stored message id per chat.
+    """
+
+    def __init__(self, storage: CommentsStorage, flush_interval: float = 1.0, max_batch: int = 500,
+                 on_flush: Optional[Callable[[Dict[int, int]], None]] = None):
+        self._logger = getLogger("CommentBatcher")
+        self.storage = storage
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.on_flush = on_flush
+        self.positions: Dict[int, int] = {}
+        self.saved = 0
+        self._queue: "asyncio.Queue[Optional[Tuple[int, int, CommentRecord]]]" = asyncio.Queue()
+
+    def add(self, chat_id: int, message_id: int, record: CommentRecord) -> None:
+        self._queue.put_nowait((chat_id, message_id, record))
+
+    async def close(self) -> None:
+        """Makes run() write what is queued and return."""
+        await self._queue.put(None)
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        closed = False
+        while not closed:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    closed = True
+                    break
+                batch.append(item)
+            await self._write(batch)
+
+    async def _write(self, batch: List[Tuple[int, int, CommentRecord]]) -> None:
+        COMMENTS_FETCHED.inc(len(batch), platform="telegram")
+        self.saved += await asyncio.to_thread(self.storage.create_comments, [record for _, _, record in batch])
+        for chat_id, message_id, _ in batch:
+            self.positions[chat_id] = max(self.positions.get(chat_id, 0), message_id)
+        if self.on_flush is not None:
+            try:
+                self.on_flush(dict(self.positions))
+            except Exception as e:
+                self._logger.error(f"Saving live positions failed: {e}")
 
 
 class TelegramCommentsParser:
@@ -15,13 +88,14 @@ class TelegramCommentsParser:
         self,
         api_id: int,
         api_hash: str,
-        session_name: str = "comments_parser"
+        session_name: str = "comments_parser",
+        storage: Optional[CommentsStorage] = None
     ):
         self.api_id = api_id
         self.api_hash = api_hash
         self.session_name = session_name
         self.client: Optional[TelegramClient] = None
-        self.storage = CommentsStorage()
+        self.storage = storage or CommentsStorage()
 
     async def connect(self):
         self.client = TelegramClient(
@@ -53,34 +127,226 @@ class TelegramCommentsParser:
             if not post.id:
                 continue
             
+            post_comments = []
             try:
-                # iter_messages will handle finding the discussion group and comments
-                async for comment in self.client.iter_messages(channel, reply_to=post.id, limit=comments_limit):
-                    if isinstance(comment, Message) and comment.text:
-                        author = "unknown"
-                        if comment.from_id:
-                            try:
-                                user = await self.client.get_entity(comment.from_id)
-                                author = user.username or f"{user.first_name or ''} {user.last_name or ''}".strip() or str(getattr(comment.from_id, 'user_id', ''))
-                            except:
-                                author = str(getattr(comment.from_id, 'user_id', ''))
-    
-                        url = f"https.t.me/{channel_username}/{post.id}?comment={comment.id}"
-                        create_comment = CreateComment(
-                            url=url,
-                            content=comment.text,
-                            likes=comment.reactions.result if comment.reactions and hasattr(comment.reactions, 'result') else 0,
-                            date=comment.date.isoformat() if comment.date else "",
-                            source="telegram",
-                            author=author
-                        )
-                        success = self.storage.create_comment(create_comment)
-                        if success:
-                            saved_count += 1
+                with phase("fetch"):
+                    # iter_messages will handle finding the discussion group and comments
+                    async for comment in self.client.iter_messages(channel, reply_to=post.id, limit=comments_limit):
+                        if isinstance(comment, Message) and comment.text:
+                            author = await self._author(comment)
+                            post_comments.append(self._comment_record(comment, channel_username, post.id, author))
                 
+                COMMENTS_FETCHED.inc(len(post_comments), platform="telegram")
+                SLEEP_SECONDS.inc(sleep, platform="telegram")
                 await asyncio.sleep(sleep)
             except Exception as e:
                 print(f"Could not get comments for post {post.id}: {e}")
-                continue
+            
+            if post_comments:
+                # The write fsyncs and takes the DB file lock: keep it off the event loop
+                saved_count += await asyncio.to_thread(self.storage.create_comments, post_comments)
         
         return saved_count
+
+    async def _author(self, comment: Message) -> str:
+        author = "unknown"
+        if comment.from_id:
+            try:
+                user = await self.client.get_entity(comment.from_id)
+                author = user.username or f"{user.first_name or ''} {user.last_name or ''}".strip() or str(getattr(comment.from_id, 'user_id', ''))
+            except Exception:
+                author = str(getattr(comment.from_id, 'user_id', ''))
+        return author
+
+    @staticmethod
+    def _comment_record(comment: Message, channel_username: str, post_id: int, author: str) -> CommentRecord:
+        return CommentRecord(
+            url=f"https.t.me/{channel_username}/{post_id}?comment={comment.id}",
+            content=comment.text,
+            likes=comment.reactions.result if comment.reactions and hasattr(comment.reactions, 'result') else 0,
+            date=comment.date.isoformat() if comment.date else "",
+            source="telegram",
+            author=author,
+            timestamp=int(comment.date.timestamp()) if comment.date else None
+        )
+
+    async def discussion_group(self, channel_username: str):
+        """The discussion group linked to a channel (where its comments live), None if it has none."""
+        full = await self.client(GetFullChannelRequest(await self.client.get_entity(channel_username)))
+        linked_id = full.full_chat.linked_chat_id
+        if not linked_id:
+            return None
+        return next((chat for chat in full.chats if chat.id == linked_id), None)
+
+    @staticmethod
+    def _load_live_state(path: str) -> Dict[int, int]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return {int(chat_id): message_id for chat_id, message_id in json.load(f).items()}
+        except FileNotFoundError:
+            return {}
+
+    async def monitor(
+        self,
+        channels: List[str],
+        flush_interval: float = 1.0,
+        max_batch: int = 500,
+        state_path: Optional[str] = None,
+        check_interval: float = 5.0,
+        backfill_interval: float = 60.0,
+        stop: Optional[asyncio.Event] = None
+    ) -> int:
+        """
+        Live mode: stores comments on the channels' posts as they are written, until
+        stop is set or the task is cancelled.
+
+        Subscribes to new messages of the discussion groups linked to the channels
+        and batches the replies to channel posts into storage (see CommentBatcher).
+        The last stored message id per group is kept in state_path. On start, after
+        a reconnect and every backfill_interval seconds the messages after it are
+        fetched (min_id backfill), so comments posted while offline, during a drop
+        too short for a connection check to notice or lost to an update gap are
+        still stored. Backfills while running start where the previous one ended,
+        not at the newest live message, so a live message received after a gap
+        does not hide it; stopping runs a last backfill. A group seen for the
+        first time starts at its newest message instead of downloading its history.
+
+        Args:
+            channels: Channel usernames, e.g. ["@channel1", "@channel2"]
+            flush_interval: Maximum seconds a received comment waits before it is stored
+            max_batch: Comments per storage write
+            state_path: JSON file with the last stored message id per group, <session>.live.json by default
+            check_interval: Seconds between connection checks
+            backfill_interval: Seconds between backfills while connected
+            stop: Event that ends the monitoring
+
+        Returns:
+            int: number of stored comments
+        """
+        if not self.client:
+            raise RuntimeError("Client not connected")
+        logger = getLogger("TelegramCommentsParser")
+        state_path = state_path or f"{self.session_name}.live.json"
+        last_ids = self._load_live_state(state_path)
+        stop = stop or asyncio.Event()
+
+        groups = {}
+        for channel_username in channels:
+            group = await self.discussion_group(channel_username)
+            if group is None:
+                print(f"⚠ {channel_username} has no discussion group, skipped")
+                continue
+            groups[utils.get_peer_id(group)] = (channel_username, group)
+        if not groups:
+            print("✗ None of the channels has a discussion group to monitor")
+            return 0
+
+        recent: Dict[int, "OrderedDict[int, None]"] = {chat_id: OrderedDict() for chat_id in groups}
+        post_ids: "OrderedDict[Tuple[int, int], Optional[int]]" = OrderedDict()
+        # Groups being backfilled: their saved position must not move past the gap yet
+        catching_up = set()
+        # Per group, the message id up to which a backfill has read every message. Live events
+        # never move it: one that gets through after an update gap must not hide the gap.
+        synced: Dict[int, int] = {}
+
+        def save_state(positions: Dict[int, int]) -> None:
+            for chat_id, message_id in positions.items():
+                if chat_id not in catching_up:
+                    last_ids[chat_id] = max(last_ids.get(chat_id, 0), message_id)
+            atomic_write(state_path, json.dumps({str(k): v for k, v in last_ids.items()}).encode('utf-8'), fsync=False)
+
+        batcher = CommentBatcher(self.storage, flush_interval, max_batch, on_flush=save_state)
+
+        async def channel_post_id(chat_id: int, group, root_id: int) -> Optional[int]:
+            # Replies hang under the group's copy of the channel post, which is forwarded from the channel
+            key = (chat_id, root_id)
+            if key not in post_ids:
+                root = await self.client.get_messages(group, ids=root_id)
+                fwd_from = getattr(root, 'fwd_from', None)
+                post_ids[key] = getattr(fwd_from, 'channel_post', None)
+                if len(post_ids) > LIVE_RECENT_IDS:
+                    post_ids.popitem(last=False)
+            return post_ids[key]
+
+        async def accept(chat_id: int, message) -> bool:
+            # False if the message was already received
+            seen = recent.get(chat_id)
+            if seen is None or message.id in seen:
+                return False
+            seen[message.id] = None
+            if len(seen) > LIVE_RECENT_IDS:
+                seen.popitem(last=False)
+            # Only replies are comments; the group also gets the channel posts themselves
+            if not isinstance(message, Message) or not message.text or not message.reply_to:
+                return True
+            channel_username, group = groups[chat_id]
+            root_id = message.reply_to.reply_to_top_id or message.reply_to.reply_to_msg_id
+            try:
+                post_id = await channel_post_id(chat_id, group, root_id)
+                if post_id is None:
+                    return True
+                author = await self._author(message)
+            except Exception as e:
+                logger.error(f"Could not read comment {message.id} of {channel_username}: {e}")
+                return True
+            batcher.add(chat_id, message.id, self._comment_record(message, channel_username, post_id, author))
+            return True
+
+        async def on_message(event) -> None:
+            await accept(event.chat_id, event.message)
+
+        async def backfill() -> None:
+            for chat_id, (channel_username, group) in groups.items():
+                if chat_id not in last_ids:
+                    newest = await self.client.get_messages(group, limit=1)
+                    last_ids[chat_id] = synced[chat_id] = newest[0].id if newest else 0
+                    continue
+                # Stays set if the backfill fails, until a retry gets through the gap
+                catching_up.add(chat_id)
+                start = synced.get(chat_id, last_ids[chat_id])
+                fetched = 0
+                # Messages received live since the last backfill are read again and dropped by accept()
+                async for message in self.client.iter_messages(group, min_id=start, reverse=True):
+                    fetched += await accept(chat_id, message)
+                    synced[chat_id] = message.id
+                catching_up.discard(chat_id)
+                if fetched:
+                    print(f"✓ Backfilled {fetched} messages of {channel_username} after message {start}")
+            save_state({})
+
+        event_filter = events.NewMessage(chats=[group for _, group in groups.values()])
+        self.client.add_event_handler(on_message, event_filter)
+        writer = asyncio.create_task(batcher.run())
+        print(f"✓ Monitoring {len(groups)} discussion groups, Ctrl+C to stop")
+        try:
+            loop = asyncio.get_running_loop()
+            connected = False
+            last_backfill = 0.0
+            while not stop.is_set():
+                if self.client.is_connected():
+                    # First start or reconnect: fetch what arrived in between. Drops shorter than
+                    # check_interval and update gaps are not seen here, the periodic backfill covers them.
+                    if not connected or loop.time() - last_backfill >= backfill_interval:
+                        try:
+                            await backfill()
+                            connected = True
+                            last_backfill = loop.time()
+                        except Exception as e:
+                            logger.error(f"Backfill failed, retrying: {e}")
+                else:
+                    connected = False
+                try:
+                    await asyncio.wait_for(stop.wait(), check_interval)
+                except asyncio.TimeoutError:
+                    pass
+            if self.client.is_connected():
+                # Messages lost to a gap since the last backfill would be skipped after a restart
+                try:
+                    await backfill()
+                except Exception as e:
+                    logger.error(f"Final backfill failed: {e}")
+        finally:
+            self.client.remove_event_handler(on_message, event_filter)
+            await batcher.close()
+            await writer
+        return batcher.saved
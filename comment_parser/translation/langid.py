@@ -0,0 +1,73 @@
+import re
+from typing import Optional
+
+_CYRILLIC = re.compile(r"[Ѐ-ӿ]")
+_LATIN = re.compile(r"[A-Za-zÀ-ɏ]")
+_LETTER = re.compile(r"[^\W\d_]")
+_WORD = re.compile(r"[^\W\d_]+")
+
+_UKRAINIAN_LETTERS = set("іїєґІЇЄҐ")
+_BELARUSIAN_LETTERS = set("ўЎ")
+
+_STOPWORDS = {
+    "en": {"the", "and", "is", "are", "you", "this", "that", "it", "of", "to", "in", "for",
+           "was", "with", "not", "what", "have", "be", "so", "my", "i", "me", "your", "just"},
+    "de": {"der", "die", "das", "und", "ist", "nicht", "ich", "du", "ein", "eine", "mit",
+           "auf", "für", "sehr", "auch", "wie", "aber"},
+    "fr": {"le", "la", "les", "et", "est", "une", "un", "je", "tu", "pas", "des", "que",
+           "qui", "pour", "très", "mais", "avec"},
+    "es": {"el", "los", "las", "y", "es", "una", "que", "por", "para", "muy", "pero", "con",
+           "del", "lo", "como", "esto", "yo"},
+}
+
+# Share of the letters that must belong to one script before we trust a guess.
+_SCRIPT_THRESHOLD = 0.8
+_MIN_STOPWORD_RATIO = 0.2
+
+
+def has_letters(text: str) -> bool:
+    """True if the text contains anything worth translating (not only emoji, digits or punctuation)."""
+    return bool(_LETTER.search(text or ""))
+
+
+def guess_language(text: str) -> Optional[str]:
+    """
+    Cheap local language identification used to skip remote translation calls.
+
+    Only answers when it is reasonably sure: Cyrillic text is told apart by a few
+    language-specific letters, Latin text by stopword hits. Everything else
+    (short Latin replies, CJK, mixed scripts) returns None and goes to the backend.
+
+    Args:
+        text: Comment text
+
+    Returns:
+        ISO 639-1 language code or None if unknown
+    """
+    if not text:
+        return None
+    letters = len(_LETTER.findall(text))
+    if not letters:
+        return None
+
+    cyrillic = len(_CYRILLIC.findall(text))
+    if cyrillic / letters >= _SCRIPT_THRESHOLD:
+        if any(ch in _UKRAINIAN_LETTERS for ch in text):
+            return "uk"
+        if any(ch in _BELARUSIAN_LETTERS for ch in text):
+            return "be"
+        return "ru"
+
+    latin = len(_LATIN.findall(text))
+    if latin / letters >= _SCRIPT_THRESHOLD:
+        words = [w.lower() for w in _WORD.findall(text)]
+        if not words:
+            return None
+        best_lang, best_hits = None, 0
+        for lang, stopwords in _STOPWORDS.items():
+            hits = sum(1 for w in words if w in stopwords)
+            if hits > best_hits:
+                best_lang, best_hits = lang, hits
+        if best_lang and best_hits / len(words) >= _MIN_STOPWORD_RATIO:
+            return best_lang
+    return None
@@ -0,0 +1,230 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from logging import getLogger
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .langid import guess_language, has_letters
+from ..monitoring.profiling import phase
+from ..storage.comments_storage import default_data_root
+from ..storage.wal import atomic_write
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalizes text for cache lookups: NFKC, collapsed whitespace, case-folded."""
+    text = unicodedata.normalize("NFKC", text or "")
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def cache_key(text: str, target_language: str) -> str:
+    digest = hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{target_language}:{digest}"
+
+
+CACHE_FILE_NAME = "translation_cache.json"
+# Cache of earlier versions, kept inside the package
+LEGACY_CACHE_PATH = os.path.join(os.path.dirname(__file__), CACHE_FILE_NAME)
+
+
+class TranslationCache:
+    """
+    Size-bounded LRU of translations persisted to a JSON file.
+
+    Entries are keyed by cache_key() so the same spam or short reply is only
+    ever sent to the translation backend once per target language.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 50000):
+        self._logger = getLogger("TranslationCache")
+        self.path = path
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._dirty = False
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def load(self, path: str) -> None:
+        """Adds the entries of a cache file, e.g. one left by an earlier version."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for key, value in json.load(f):
+                    self._entries[key] = value
+        except Exception as e:
+            self._logger.error(f"Could not load translation cache {path}: {e}")
+        # Entries from another file are saved to this cache's own file on the next flush
+        self._dirty = self._dirty or path != self.path
+        self._evict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: str) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        self._dirty = True
+        self._evict()
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._dirty = True
+
+    def flush(self) -> None:
+        """Writes the cache to disk (least recently used first) if anything changed."""
+        if not self.path or not self._dirty:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # Job workers share one cache file: each process writes its own temporary file
+        atomic_write(self.path, json.dumps(list(self._entries.items()), ensure_ascii=False).encode('utf-8'),
+                     fsync=False)
+        self._dirty = False
+
+
+def default_cache(data_root: Optional[str] = None) -> TranslationCache:
+    """
+    Translation cache kept in the storage data root (default_data_root() if not given),
+    next to the comments it was filled from. Entries of a cache left in the package
+    directory by an earlier version are carried over on first use.
+    """
+    cache = TranslationCache(os.path.join(data_root or default_data_root(), CACHE_FILE_NAME))
+    if not len(cache) and os.path.exists(LEGACY_CACHE_PATH):
+        cache.load(LEGACY_CACHE_PATH)
+    return cache
+
+
+class GoogleTranslateBackend:
+    """Translation backend on top of googletrans, sending a whole batch per request."""
+
+    def __init__(self):
+        from googletrans import Translator
+        self._translator = Translator()
+
+    def translate_batch(self, texts: List[str], target_language: str) -> List[str]:
+        result = self._translator.translate(texts, dest=target_language)
+        if asyncio.iscoroutine(result):
+            # googletrans >= 4.0.2 only ships the async API
+            result = asyncio.run(result)
+        return [item.text for item in result]
+
+
+class TranslationService:
+    """
+    Batched, cached translation of comment content.
+
+    Can be used directly (translate, translate_batch), wrapped around any comment
+    stream (translate_comments) or registered as a CommentsStorage processor so
+    that every platform parser gets translated content:
+
+        storage = CommentsStorage(processors=[TranslationService("ru")])
+        ApiVKParser(storage=storage)
+    """
+
+    def __init__(self, target_language: str = "ru", backend=None,
+                 cache: Optional[TranslationCache] = None, batch_size: int = 50):
+        self._logger = getLogger("TranslationService")
+        self.target_language = target_language
+        self._backend = backend
+        self.cache = cache if cache is not None else default_cache()
+        self.batch_size = batch_size
+        self.stats = {"skipped": 0, "cache_hits": 0, "translated": 0, "failed": 0}
+        # Guards the cache and stats; backend calls run without it, so storage writers translate in parallel
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = GoogleTranslateBackend()
+        return self._backend
+
+    def translate(self, text: str) -> str:
+        return self.translate_batch([text])[0]
+
+    def translate_batch(self, texts: List[str]) -> List[str]:
+        """
+        Translates texts to the target language.
+
+        Texts without letters or already in the target language are returned as is,
+        cached texts come from the LRU and the rest is deduplicated and sent to the
+        backend in chunks of batch_size. On backend errors the original text is kept.
+
+        Args:
+            texts: Texts to translate
+
+        Returns:
+            List of translated texts in the same order
+        """
+        results: List[Optional[str]] = list(texts)
+        pending: Dict[str, List[int]] = {}
+
+        for i, text in enumerate(texts):
+            if not has_letters(text) or guess_language(text) == self.target_language:
+                with self._lock:
+                    self.stats["skipped"] += 1
+                continue
+            key = cache_key(text, self.target_language)
+            with self._lock:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    self.stats["cache_hits"] += 1
+            if cached is not None:
+                results[i] = cached
+                continue
+            pending.setdefault(key, []).append(i)
+
+        keys = list(pending)
+        for start in range(0, len(keys), self.batch_size):
+            chunk = keys[start:start + self.batch_size]
+            originals = [texts[pending[key][0]] for key in chunk]
+            try:
+                with phase("translate"):
+                    translated = self.backend.translate_batch(originals, self.target_language)
+            except Exception as e:
+                self._logger.error(f"Translation error: {e}")
+                print(f"Translation error: {e}")
+                with self._lock:
+                    self.stats["failed"] += len(chunk)
+                continue
+            with self._lock:
+                for key, text in zip(chunk, translated):
+                    self.cache.put(key, text)
+                    for i in pending[key]:
+                        results[i] = text
+                self.stats["translated"] += len(chunk)
+
+        if pending:
+            try:
+                with self._lock:
+                    self.cache.flush()
+            except Exception as e:
+                self._logger.error(f"Could not save translation cache: {e}")
+        return results
+
+    def process(self, records: List[dict]) -> List[dict]:
+        """CommentsStorage processor hook: translates the content of a batch of records."""
+        translated = self.translate_batch([record.get('content', '') for record in records])
+        return [dict(record, content=text) for record, text in zip(records, translated)]
+
+    def translate_comments(self, comments: Iterable[dict], batch_size: Optional[int] = None) -> Iterator[dict]:
+        """Translates a stream of comment dicts, buffering batch_size comments per backend call."""
+        batch_size = batch_size or self.batch_size
+        buffer: List[dict] = []
+        for comment in comments:
+            buffer.append(comment)
+            if len(buffer) >= batch_size:
+                yield from self.process(buffer)
+                buffer = []
+        if buffer:
+            yield from self.process(buffer)
@@ -1,16 +1,42 @@
-import requests
 import json
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Iterator
 from logging import getLogger
-from datetime import datetime
+from datetime import datetime, timezone
 
 from comment_parser.storage.comments_storage import CommentsStorage
-from comment_parser.storage.models import CreateComment
+from comment_parser.storage.models import CreateComment, CommentRecord
+from comment_parser.monitoring.metrics import API_ERRORS, COMMENTS_FETCHED, HTTP_REQUEST_SECONDS
+from comment_parser.monitoring.profiling import phase
+from comment_parser.network.http_client import HttpClient, HTTPClientError, RATE_LIMITED, TRANSIENT, default_client
+
+# VK error codes worth retrying: 6 too many requests per second, 9 flood control,
+# 1 unknown error and 10 internal server error. 29 (method quota) lasts for a day.
+VK_RATE_LIMIT_ERRORS = {6, 9}
+VK_TRANSIENT_ERRORS = {1, 10}
+
+
+class VKAPIError(Exception):
+    """Error returned by the VK API"""
+
+
+def classify_vk_error(data: Optional[dict]) -> Optional[str]:
+    """Classifies a VK API error body for HttpClient retries"""
+    code = ((data or {}).get('error') or {}).get('error_code')
+    if code in VK_RATE_LIMIT_ERRORS:
+        return RATE_LIMITED
+    if code in VK_TRANSIENT_ERRORS:
+        return TRANSIENT
+    return None
+
 
 class ApiVKParser: 
-    def __init__(self):
-        self._storage = CommentsStorage()
+    def __init__(self, storage: Optional[CommentsStorage] = None, http_client: Optional[HttpClient] = None):
+        self._storage = storage or CommentsStorage()
+        self._http = http_client or default_client()
         self._logger = getLogger("ApiVKParser")  
+        # Why the last save_json() call failed or stopped early, None if it did not
+        self.last_error: Optional[str] = None
+        self.api_url = 'https://api.vk.com/method/wall.getComments'
 
     def parse_comments(self, owner_id: str, token: str, count_comms: int, post_id: str) -> Optional[List[Dict]]:
         """
@@ -26,7 +52,7 @@ class ApiVKParser:
             List of comment dictionaries or None if error occurs
         """
         try:
-            url = 'https://api.vk.com/method/wall.getComments'
+            url = self.api_url
             params = {
                 'owner_id': owner_id,
                 'post_id': post_id,
@@ -38,11 +64,12 @@ class ApiVKParser:
             }
             
             print(f"Fetching comments for post {post_id}...")
-            response = requests.get(url, params=params)
-            data = response.json()
+            with phase("fetch"), HTTP_REQUEST_SECONDS.time(platform="vk"):
+                data = self._http.get_json(url, params=params, classify=classify_vk_error)
             
             if 'error' in data:
                 error_msg = data['error'].get('error_msg', 'Unknown error')
+                API_ERRORS.inc(platform="vk", code=data['error'].get('error_code', ''))
                 self._logger.error(f"VK API error: {error_msg}")
                 print(f"✗ VK API error: {error_msg}")
                 return None
@@ -56,10 +83,76 @@ class ApiVKParser:
             print(f"✗ Failed to parse comments: {e}")
             return None 
         
+    def iter_comment_pages(self, owner_id: str, token: str, post_id: str,
+                           max_comments: Optional[int] = None) -> Iterator[List[Dict]]:
+        """
+        Streams the comments of a VK post page by page
+        
+        Args:
+            owner_id: VK page/group owner ID
+            token: VK API access token
+            post_id: Post ID
+            max_comments: Maximum number of comments to retrieve (None for all)
+            
+        Yields:
+            Lists of at most 100 comment dictionaries
+            
+        Raises:
+            VKAPIError: if the API returns an error
+        """
+        offset = 0
+        collected = 0
+        count_per_request = 100  
+        
+        while True:
+            url = self.api_url
+            params = {
+                'owner_id': owner_id,
+                'post_id': post_id,
+                'access_token': token,
+                'v': '5.131',
+                'count': count_per_request,
+                'offset': offset,
+                'extended': 1,
+                'fields': 'first_name,last_name'
+            }
+            
+            print(f"Fetching comments (offset: {offset})...")
+            with phase("fetch"), HTTP_REQUEST_SECONDS.time(platform="vk"):
+                data = self._http.get_json(url, params=params, classify=classify_vk_error)
+            
+            if 'error' in data:
+                error_msg = data['error'].get('error_msg', 'Unknown error')
+                API_ERRORS.inc(platform="vk", code=data['error'].get('error_code', ''))
+                self._logger.error(f"VK API error: {error_msg}")
+                print(f"✗ VK API error: {error_msg}")
+                raise VKAPIError(error_msg)
+            
+            items = data.get('response', {}).get('items', [])
+            
+            if not items:
+                break
+            COMMENTS_FETCHED.inc(len(items), platform="vk")
+            
+            if max_comments and collected + len(items) >= max_comments:
+                items = items[:max_comments - collected]
+                collected += len(items)
+                print(f"✓ Collected {collected} comments so far")
+                yield items
+                break
+            
+            collected += len(items)
+            print(f"✓ Collected {collected} comments so far")
+            yield items
+            
+            offset += count_per_request
+        
     def parse_all_comments(self, owner_id: str, token: str, post_id: str, max_comments: Optional[int] = None) -> Optional[List[Dict]]:
         """
         Parses all comments from a VK post using pagination
         
+        Prefer iter_comment_pages() for large threads, this buffers every comment.
+        
         Args:
             owner_id: VK page/group owner ID
             token: VK API access token
@@ -70,50 +163,14 @@ class ApiVKParser:
             List of all comment dictionaries or None if error occurs
         """
         all_comments = []
-        offset = 0
-        count_per_request = 100  
-        
         try:
-            while True:
-                url = 'https://api.vk.com/method/wall.getComments'
-                params = {
-                    'owner_id': owner_id,
-                    'post_id': post_id,
-                    'access_token': token,
-                    'v': '5.131',
-                    'count': count_per_request,
-                    'offset': offset,
-                    'extended': 1,
-                    'fields': 'first_name,last_name'
-                }
-                
-                print(f"Fetching comments (offset: {offset})...")
-                response = requests.get(url, params=params)
-                data = response.json()
-                
-                if 'error' in data:
-                    error_msg = data['error'].get('error_msg', 'Unknown error')
-                    self._logger.error(f"VK API error: {error_msg}")
-                    print(f"✗ VK API error: {error_msg}")
-                    return None
-                
-                items = data.get('response', {}).get('items', [])
-                
-                if not items:
-                    break
-                    
-                all_comments.extend(items)
-                print(f"✓ Collected {len(all_comments)} comments so far")
-                
-                if max_comments and len(all_comments) >= max_comments:
-                    all_comments = all_comments[:max_comments]
-                    break
-                
-                offset += count_per_request
-                
+            for page in self.iter_comment_pages(owner_id, token, post_id, max_comments):
+                all_comments.extend(page)
             print(f"✓ Total comments collected: {len(all_comments)}")
             return all_comments
             
+        except VKAPIError:
+            return None
         except Exception as e:
             self._logger.error(f"Failed to parse all comments for post {post_id}: {e}")
             print(f"✗ Failed to parse comments: {e}")
@@ -137,7 +194,7 @@ class ApiVKParser:
                 author = str(comment.get('from_id', 'Unknown'))
                 
                 timestamp = comment.get('date', 0)
-                date_str = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S') if timestamp else ''
+                date_str = datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S') if timestamp else ''
                 
                 create_comment = CreateComment(
                     url=post_url,
@@ -145,7 +202,8 @@ class ApiVKParser:
                     likes=comment.get('likes', {}).get('count', 0),
                     date=date_str,
                     source="vk",
-                    author=author
+                    author=author,
+                    timestamp=timestamp or None
                 )
                 create_comments.append(create_comment)
             except Exception as e:
@@ -154,10 +212,38 @@ class ApiVKParser:
         
         return create_comments
     
+    def convert_vk_to_records(self, vk_comments: List[Dict], post_url: str) -> Iterator[CommentRecord]:
+        """
+        Converts VK comments to lightweight CommentRecord tuples (no pydantic validation)
+        
+        Args:
+            vk_comments: List of VK API comment dictionaries
+            post_url: URL of the VK post
+            
+        Yields:
+            CommentRecord objects
+        """
+        for comment in vk_comments:
+            try:
+                timestamp = comment.get('date', 0)
+                yield CommentRecord(
+                    url=post_url,
+                    content=comment.get('text', ''),
+                    likes=(comment.get('likes') or {}).get('count', 0),
+                    date=datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S') if timestamp else '',
+                    source="vk",
+                    author=str(comment.get('from_id', 'Unknown')),
+                    timestamp=timestamp or None
+                )
+            except Exception as e:
+                self._logger.error(f"Failed to convert comment: {e}")
+                continue
+    
     def save_json(self, owner_id: str, post_id: str, token: str, file_path: str, 
                   max_comments: Optional[int] = None, use_pagination: bool = True) -> int:
         """
-        Parses VK comments and saves them to storage
+        Parses VK comments and saves them to storage page by page, so memory stays
+        flat however long the thread is
         
         Args:
             owner_id: VK page/group owner ID
@@ -170,38 +256,45 @@ class ApiVKParser:
         Returns:
             int: number of saved comments
         """
+        saved = 0
+        self.last_error = None
         try:
             print(f"\n{'='*60}")
             print(f"Starting VK comment parsing")
             print(f"Owner ID: {owner_id}, Post ID: {post_id}")
             print(f"{'='*60}\n")
             
-            if owner_id.startswith('-'):
-                post_url = f"https://vk.com/wall{owner_id}_{post_id}"
-            else:
-                post_url = f"https://vk.com/wall{owner_id}_{post_id}"
+            post_url = f"https://vk.com/wall{owner_id}_{post_id}"
             
             if use_pagination:
-                vk_comments = self.parse_all_comments(owner_id, token, post_id, max_comments)
+                pages = self.iter_comment_pages(owner_id, token, post_id, max_comments)
             else:
                 count = max_comments if max_comments else 100
-                vk_comments = self.parse_comments(owner_id, token, count, post_id)
+                page = self.parse_comments(owner_id, token, count, post_id)
+                if page is None:
+                    print("✗ Failed to fetch comments")
+                    self.last_error = "Failed to fetch comments"
+                    return 0
+                pages = iter([page])
             
-            if vk_comments is None:
-                print("✗ Failed to fetch comments")
-                return 0
+            fetched = 0
+            try:
+                for page in pages:
+                    fetched += len(page)
+                    with phase("convert"):
+                        records = list(self.convert_vk_to_records(page, post_url))
+                    saved += self._storage.create_comments(records)
+            except (VKAPIError, HTTPClientError) as e:
+                self.last_error = str(e)
+                if not fetched:
+                    print("✗ Failed to fetch comments")
+                    return 0
+                print(f"⚠ Stopped after {fetched} comments")
             
-            if not vk_comments:
+            if not fetched:
                 print("⚠ No comments found")
                 return 0
             
-            create_comments = self.convert_vk_to_create_comment(vk_comments, post_url)
-            
-            saved = 0
-            for create_comment in create_comments:
-                if self._storage.create_comment(create_comment):
-                    saved += 1
-            
             print(f"\n{'='*60}")
             print(f"✓ Saved {saved} comments to database")
             print(f"{'='*60}\n")
@@ -211,4 +304,5 @@ class ApiVKParser:
         except Exception as e:
             self._logger.error(f"Failed to save comments to storage: {e}")
             print(f"✗ Failed to save comments: {e}")
-            return 0
\ No newline at end of file
+            self.last_error = str(e)
+            return saved
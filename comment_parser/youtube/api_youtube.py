@@ -1,15 +1,35 @@
-import requests
 import json
 from typing import List, Optional
 from logging import getLogger
 
 from comment_parser.storage.comments_storage import CommentsStorage
-from comment_parser.storage.models import CreateComment
+from comment_parser.storage.models import CommentRecord
+from comment_parser.monitoring.metrics import API_ERRORS, COMMENTS_FETCHED, HTTP_REQUEST_SECONDS
+from comment_parser.monitoring.profiling import phase
+from comment_parser.network.http_client import HttpClient, RATE_LIMITED, TRANSIENT, default_client
+
+# commentThreads error reasons worth retrying; quotaExceeded only resets at midnight PT
+YOUTUBE_RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+YOUTUBE_TRANSIENT_REASONS = {"backendError", "internalError"}
+
+
+def classify_youtube_error(data: Optional[dict]) -> Optional[str]:
+    """Classifies a YouTube Data API error body for HttpClient retries"""
+    errors = ((data or {}).get('error') or {}).get('errors') or []
+    reasons = {error.get('reason') for error in errors if isinstance(error, dict)}
+    if reasons & YOUTUBE_RATE_LIMIT_REASONS:
+        return RATE_LIMITED
+    if reasons & YOUTUBE_TRANSIENT_REASONS:
+        return TRANSIENT
+    return None
 
 class YouTubeAPIParser:
-    def __init__(self):
-        self._storage = CommentsStorage()
+    def __init__(self, storage: Optional[CommentsStorage] = None, http_client: Optional[HttpClient] = None):
+        self._storage = storage or CommentsStorage()
+        self._http = http_client or default_client()
         self._logger = getLogger("YouTubeAPIParser")
+        # Why the last parse_comments() call failed or stopped early, None if it did not
+        self.last_error: Optional[str] = None
         self.base_url = "https://www.googleapis.com/youtube/v3/commentThreads"
 
     def parse_comments(self, video_id: str, api_key: str, max_comments: int = 100) -> int:
@@ -27,6 +47,7 @@ class YouTubeAPIParser:
         saved = 0
         next_page_token = None
         total_fetched = 0
+        self.last_error = None
         
         try:
             while total_fetched < max_comments:
@@ -41,47 +62,51 @@ class YouTubeAPIParser:
                 if next_page_token:
                     params['pageToken'] = next_page_token
                 
-                response = requests.get(self.base_url, params=params)
-                data = response.json()
+                with phase("fetch"), HTTP_REQUEST_SECONDS.time(platform="youtube"):
+                    data = self._http.get_json(self.base_url, params=params, classify=classify_youtube_error)
                 
                 if 'error' in data:
                     error_msg = data['error']['message']
+                    API_ERRORS.inc(platform="youtube", code=data['error'].get('code', ''))
                     self._logger.error(f"YouTube API error: {error_msg}")
                     print(f"✗ YouTube API error: {error_msg}")
+                    self.last_error = error_msg
                     return saved
                 
                 items = data.get('items', [])
                 if not items:
                     break
+                COMMENTS_FETCHED.inc(len(items), platform="youtube")
                 
-                for item in items:
-                    snippet = item['snippet']['topLevelComment']['snippet']
-                    
-                    comment_text = snippet.get('textDisplay', '')
-                    if not comment_text.strip():
-                        continue
-                    
-                    author = snippet.get('authorDisplayName', 'Unknown')
-                    published_at = snippet.get('publishedAt', '')
-                    like_count = snippet.get('likeCount', 0)
-                    
-                    url = f"https://www.youtube.com/watch?v={video_id}"
-                    
-                    create_comment = CreateComment(
-                        url=url,
-                        content=comment_text,
-                        likes=like_count,
-                        date=published_at,
-                        source="youtube",
-                        author=author
-                    )
-                    
-                    if self._storage.create_comment(create_comment):
-                        saved += 1
-                    
-                    total_fetched += 1
-                    if total_fetched >= max_comments:
-                        break
+                page_comments = []
+                with phase("convert"):
+                    for item in items:
+                        snippet = item['snippet']['topLevelComment']['snippet']
+                        
+                        comment_text = snippet.get('textDisplay', '')
+                        if not comment_text.strip():
+                            continue
+                        
+                        author = snippet.get('authorDisplayName', 'Unknown')
+                        published_at = snippet.get('publishedAt', '')
+                        like_count = snippet.get('likeCount', 0)
+                        
+                        url = f"https://www.youtube.com/watch?v={video_id}"
+                        
+                        page_comments.append(CommentRecord(
+                            url=url,
+                            content=comment_text,
+                            likes=like_count,
+                            date=published_at,
+                            source="youtube",
+                            author=author
+                        ))
+                        
+                        total_fetched += 1
+                        if total_fetched >= max_comments:
+                            break
+                
+                saved += self._storage.create_comments(page_comments)
                 
                 next_page_token = data.get('nextPageToken')
                 if not next_page_token:
@@ -90,5 +115,6 @@ class YouTubeAPIParser:
         except Exception as e:
             self._logger.error(f"Failed to parse YouTube comments: {e}")
             print(f"✗ Failed to parse YouTube comments: {e}")
+            self.last_error = str(e)
         
         return saved
@@ -0,0 +1,264 @@
+import functools
+import multiprocessing
+import os
+import queue
+import time
+from collections import deque
+from logging import getLogger
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from comment_parser.storage.comments_storage import CommentsStorage
+from comment_parser.youtube.selenium_youtube import SeleniumYouTubeParser
+
+# Seconds between liveness checks of the worker processes while no message arrives
+POLL_INTERVAL = 0.5
+# Seconds a worker gets to quit its browser after the last video
+SHUTDOWN_TIMEOUT = 30
+# Seconds one attempt at a video may take before its worker is killed and the video requeued
+TASK_TIMEOUT = 3600
+
+
+def _quit(driver) -> None:
+    if driver is not None:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+
+def _worker_main(slot: int, parser_factory: Callable, options: Dict, inbox, results) -> None:
+    """
+    Worker process: one browser, reused for every video it is handed. Comments go
+    back to the coordinator in batches; the worker never opens the storage itself.
+    """
+    parser = parser_factory()
+    driver = None
+    results.put(("ready", slot, os.getpid(), None, None))
+    try:
+        while True:
+            video_url = inbox.get()
+            if video_url is None:
+                break
+            try:
+                if driver is None:
+                    driver = parser._create_driver()
+                batch = []
+                for comment in parser.stream_comments(video_url, options["max_comments"], options["scroll_pause"],
+                                                      driver=driver):
+                    batch.append(comment)
+                    if len(batch) >= options["batch_size"]:
+                        results.put(("comments", slot, os.getpid(), video_url, batch))
+                        batch = []
+                if batch:
+                    results.put(("comments", slot, os.getpid(), video_url, batch))
+                results.put(("done", slot, os.getpid(), video_url, None))
+            except Exception as e:
+                # The browser may be what broke: the next video gets a fresh one
+                _quit(driver)
+                driver = None
+                results.put(("failed", slot, os.getpid(), video_url, f"{type(e).__name__}: {e}"))
+    finally:
+        _quit(driver)
+
+
+class SeleniumPool:
+    """
+    Scrapes many YouTube videos with Selenium in parallel, one browser per worker process.
+
+    Videos are handed out one at a time to whichever worker asks for more, so a worker
+    stuck on a huge comment section never holds back a queue of others: idle workers
+    take over the remaining videos. A failed video is retried (on another worker when
+    one is free) up to max_retries times. A worker whose process dies, busy or idle, is
+    replaced, and so is one that spends more than task_timeout seconds on a video (a
+    hung browser never reports back), which counts as a failed attempt. All workers send their comments to this process, the only storage
+    writer, which drops comments already saved by an earlier attempt of the same video.
+
+        report = SeleniumPool(workers=4, storage=CommentsStorage()).run(video_urls)
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        storage: Optional[CommentsStorage] = None,
+        headless: bool = True,
+        slow_mode: bool = False,
+        max_comments: Optional[int] = None,
+        scroll_pause: float = 2.0,
+        max_retries: int = 2,
+        batch_size: int = 50,
+        prune_dom: bool = False,
+        parser_factory: Optional[Callable] = None,
+        task_timeout: Optional[float] = TASK_TIMEOUT,
+    ):
+        self._logger = getLogger("SeleniumPool")
+        # One browser per core: scrolling and rendering are CPU bound in the browser
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.storage = storage or CommentsStorage()
+        self.max_retries = max_retries
+        self.task_timeout = task_timeout
+        # Builds the parser in each worker process; must be picklable
+        self.parser_factory = parser_factory or functools.partial(SeleniumYouTubeParser, headless=headless,
+                                                                  slow_mode=slow_mode, prune_dom=prune_dom)
+        self.options = {"max_comments": max_comments, "scroll_pause": scroll_pause, "batch_size": batch_size}
+        self._context = multiprocessing.get_context("spawn")
+
+    def _start_worker(self, slot: int, results):
+        inbox = self._context.Queue()
+        process = self._context.Process(target=_worker_main, name=f"selenium-worker-{slot}",
+                                        args=(slot, self.parser_factory, self.options, inbox, results))
+        process.start()
+        return process, inbox
+
+    @staticmethod
+    def _next_task(pending: Deque[str], failed_on: Dict[str, set], pid: int) -> Optional[str]:
+        # Retries go to a worker that has not failed on the video yet, if one is waiting for it
+        for video_url in pending:
+            if pid not in failed_on.get(video_url, ()):
+                pending.remove(video_url)
+                return video_url
+        return pending.popleft() if pending else None
+
+    def run(self, video_urls: Iterable[str]) -> Dict:
+        """
+        Scrapes every video and saves the comments to storage.
+
+        Args:
+            video_urls: YouTube video URLs, duplicates are scraped once
+
+        Returns:
+            Dict with per-video results in input order (saved, attempts, worker pid,
+            error, elapsed), totals and throughput
+        """
+        video_urls = list(dict.fromkeys(video_urls))
+        started = time.perf_counter()
+        videos = {url: {"video_url": url, "saved": 0, "attempts": 0, "worker": None, "error": None, "elapsed": 0.0}
+                  for url in video_urls}
+        pending: Deque[str] = deque(video_urls)
+        failed_on: Dict[str, set] = {}
+        # Comment ids saved per unfinished video, so a retry does not store them twice
+        seen: Dict[str, set] = {url: set() for url in video_urls}
+        remaining = len(video_urls)
+        results = self._context.Queue()
+        slots: Dict[int, Tuple] = {}
+        pids: Dict[int, int] = {}
+        running: Dict[int, Tuple[str, float]] = {}
+
+        def finish(video_url: str, error: Optional[str]) -> None:
+            nonlocal remaining
+            videos[video_url]["error"] = error
+            seen.pop(video_url, None)
+            failed_on.pop(video_url, None)
+            remaining -= 1
+            status = f"✗ {error}" if error else f"✓ {videos[video_url]['saved']} comments"
+            print(f"[{len(video_urls) - remaining}/{len(video_urls)}] {video_url}: {status}")
+
+        def failed(slot: int, video_url: str, error: str) -> None:
+            videos[video_url]["elapsed"] += time.perf_counter() - running.pop(slot)[1]
+            failed_on.setdefault(video_url, set()).add(pids.get(slot))
+            if videos[video_url]["attempts"] <= self.max_retries:
+                self._logger.warning(f"{video_url} failed on attempt {videos[video_url]['attempts']}, retrying: {error}")
+                pending.append(video_url)
+            else:
+                finish(video_url, error)
+
+        def assign(slot: int) -> None:
+            video_url = self._next_task(pending, failed_on, pids[slot])
+            if video_url is None:
+                return
+            videos[video_url]["attempts"] += 1
+            videos[video_url]["worker"] = pids[slot]
+            running[slot] = (video_url, time.perf_counter())
+            slots[slot][1].put(video_url)
+
+        idle: List[int] = []
+        try:
+            for slot in range(min(self.workers, len(video_urls))):
+                slots[slot] = self._start_worker(slot, results)
+            while remaining:
+                try:
+                    kind, slot, pid, video_url, payload = results.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    kind = None
+                if kind == "ready":
+                    pids[slot] = pid
+                    idle.append(slot)
+                elif kind == "comments":
+                    if video_url in seen:
+                        records = []
+                        for comment in payload:
+                            if comment["id"] not in seen[video_url]:
+                                seen[video_url].add(comment["id"])
+                                records.append(SeleniumYouTubeParser.comment_record(comment, video_url))
+                        if records:
+                            videos[video_url]["saved"] += self.storage.create_comments(records)
+                elif kind in ("done", "failed") and pids.get(slot) == pid and running.get(slot, (None,))[0] == video_url:
+                    if kind == "done":
+                        videos[video_url]["elapsed"] += time.perf_counter() - running.pop(slot)[1]
+                        finish(video_url, None)
+                    else:
+                        failed(slot, video_url, payload)
+                    idle.append(slot)
+
+                now = time.perf_counter()
+                for slot, (process, _) in list(slots.items()):
+                    timed_out = (self.task_timeout is not None and slot in running
+                                 and now - running[slot][1] > self.task_timeout)
+                    if timed_out:
+                        process.terminate()
+                        process.join(SHUTDOWN_TIMEOUT)
+                    elif process.exitcode is None:
+                        continue
+                    # The process died (browser crash, OOM kill) or hung: retry its video and replace it
+                    del slots[slot]
+                    if slot in idle:
+                        idle.remove(slot)
+                    if timed_out:
+                        reason = f"timed out after {self.task_timeout:g}s"
+                    else:
+                        reason = f"died with exit code {process.exitcode}"
+                    if slot in running:
+                        video_url = running[slot][0]
+                        self._logger.error(f"Worker {process.pid} {reason} on {video_url}")
+                        failed(slot, video_url, f"worker {reason}")
+                    else:
+                        self._logger.error(f"Worker {process.pid} {reason} while idle")
+                    # A worker that died before it was ready cannot build its parser: a new one would too
+                    if remaining and pids.get(slot) == process.pid:
+                        slots[slot] = self._start_worker(slot, results)
+                if not slots and remaining:
+                    for video_url in list(pending):
+                        finish(video_url, "no worker left")
+                    pending.clear()
+
+                while idle and pending:
+                    assign(idle.pop(0))
+        finally:
+            for process, inbox in slots.values():
+                inbox.put(None)
+            for process, _ in slots.values():
+                process.join(SHUTDOWN_TIMEOUT)
+                if process.is_alive():
+                    process.terminate()
+
+        elapsed = time.perf_counter() - started
+        total_saved = sum(video["saved"] for video in videos.values())
+        return {
+            "videos": list(videos.values()),
+            "total_videos": len(videos),
+            "failed_videos": sum(1 for video in videos.values() if video["error"]),
+            "total_saved": total_saved,
+            "elapsed": elapsed,
+            "comments_per_sec": total_saved / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+def print_pool_report(report: Dict) -> None:
+    print(f"\n{'='*60}")
+    for video in report["videos"]:
+        if video["error"]:
+            print(f"✗ {video['video_url']} after {video['attempts']} attempts: {video['error']}")
+    workers = {video["worker"] for video in report["videos"] if video["worker"]}
+    print(f"Videos: {report['total_videos']} ({report['failed_videos']} failed) on {len(workers)} workers")
+    print(f"✓ Saved {report['total_saved']} comments in {report['elapsed']:.1f}s "
+          f"({report['comments_per_sec']:.1f} comments/sec)")
+    print(f"{'='*60}\n")
@@ -14,28 +14,85 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from http.client import IncompleteRead 
 
 from comment_parser.storage.comments_storage import CommentsStorage 
-from comment_parser.storage.models import Comment 
+from comment_parser.storage.models import CommentRecord
+from comment_parser.storage.normalize import parse_date, parse_likes
+from comment_parser.translation.translator import TranslationService
+from comment_parser.monitoring.metrics import COMMENTS_FETCHED, SLEEP_SECONDS, WEBDRIVER_SECONDS
+from comment_parser.monitoring.profiling import phase
+
+# undetected_chromedriver is optional and slow to import, so it is only loaded
+# when the first driver is created (see _load_uc).
+uc = None
+_USE_UC = None
+
+# Chrome flags of the lean profile: no GPU process, no images, no audio and no autoplay
+LEAN_CHROME_ARGS = [
+    "--disable-gpu",
+    "--blink-settings=imagesEnabled=false",
+    "--mute-audio",
+    "--autoplay-policy=user-gesture-required",
+    "--disable-extensions",
+]
+# Viewport of lean browsers: fewer pixels to lay out and paint on every scroll,
+# comments still load below the player
+LEAN_WINDOW_SIZE = (800, 600)
+WINDOW_SIZE = (1920, 1080)
+# Requests the lean profile blocks over CDP: the video stream, thumbnails, avatars and ads.
+# Comments are plain text, none of these are needed to read them.
+BLOCKED_URLS = [
+    "*.googlevideo.com/*",
+    "*i.ytimg.com/*",
+    "*yt3.ggpht.com/*",
+    "*yt3.googleusercontent.com/*",
+    "*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*",
+    "*doubleclick.net/*",
+    "*googlesyndication.com/*",
+    "*googleadservices.com/*",
+    "*/pagead/*",
+    "*/api/stats/ads*",
+]
+PAUSE_VIDEO_JS = "document.querySelectorAll('video').forEach(v => { v.pause(); v.removeAttribute('src'); v.load(); });"
+PRUNE_COMMENTS_JS = "arguments[0].forEach(e => e.remove());"
+
+
+def _load_uc() -> bool:
+    global uc, _USE_UC
+    if _USE_UC is None:
+        try:
+            import undetected_chromedriver
+            uc = undetected_chromedriver
+            _USE_UC = True
+        except Exception:
+            _USE_UC = False
+    return _USE_UC
 
-try:
-    import undetected_chromedriver as uc
-    _USE_UC = True
-except Exception:
-    _USE_UC = False
 
 class SeleniumYouTubeParser:
-    def __init__(self, headless: bool = False, driver_path: Optional[str] = None, slow_mode: bool = True):
-        self._storage = CommentsStorage()
-        self._driver = self._init_driver()
+    def __init__(self, headless: bool = False, driver_path: Optional[str] = None, slow_mode: bool = True,
+                 storage: Optional[CommentsStorage] = None, lean: bool = True, prune_dom: bool = False):
+        self._storage = storage
+        self._translators: Dict[str, TranslationService] = {}
         self._logger = getLogger("SeleniumYouTubeParser") 
         self.headless = headless
         self.driver_path = driver_path
         self.slow_mode = slow_mode
+        # Block images, video and ads and stop playback (see LEAN_CHROME_ARGS and BLOCKED_URLS)
+        self.lean = lean
+        self.window_size = LEAN_WINDOW_SIZE if lean else WINDOW_SIZE
+        # Remove comment threads from the page once extracted, so a long scroll keeps the DOM small
+        self.prune_dom = prune_dom
+
+    @property
+    def storage(self) -> CommentsStorage:
+        # Opened on first use: SeleniumPool workers only scrape and never write
+        if self._storage is None:
+            self._storage = CommentsStorage()
+        return self._storage
 
     def _create_driver(self):
-        global _USE_UC
         driver = None
         
-        if _USE_UC:
+        if _load_uc():
             for attempt in range(2):
                 try:
                     options = uc.ChromeOptions()
@@ -45,6 +102,9 @@ class SeleniumYouTubeParser:
                     options.add_argument("--disable-blink-features=AutomationControlled")
                     options.add_argument("--disable-dev-shm-usage")
                     options.add_argument("--lang=en-US")
+                    if self.lean:
+                        for argument in LEAN_CHROME_ARGS:
+                            options.add_argument(argument)
                     
                     print(f"Attempting to create undetected_chromedriver ({attempt + 1}/2)...")
                     driver = uc.Chrome(options=options, use_subprocess=True)
@@ -68,8 +128,12 @@ class SeleniumYouTubeParser:
                 options.add_argument("--disable-dev-shm-usage")
                 options.add_argument("--disable-blink-features=AutomationControlled")
                 options.add_argument("--lang=en-US")
-                options.add_argument("--disable-gpu")
-                options.add_argument("--window-size=1920,1080")
+                options.add_argument("--window-size={},{}".format(*self.window_size))
+                if self.lean:
+                    for argument in LEAN_CHROME_ARGS:
+                        options.add_argument(argument)
+                else:
+                    options.add_argument("--disable-gpu")
                 
                 options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
                 
@@ -79,15 +143,33 @@ class SeleniumYouTubeParser:
                 print(f"✗ Critical error creating driver: {e}")
                 raise e
         
-        driver.set_window_size(1920, 1080)
+        driver.set_window_size(*self.window_size)
+        if self.lean:
+            self._block_resources(driver)
         return driver 
+
+    def _block_resources(self, driver):
+        """Blocks BLOCKED_URLS for every page the driver opens"""
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+        except Exception as e:
+            self._logger.warning(f"Could not block resources over CDP: {e}")
+
+    def _pause_video(self, driver):
+        """Stops the player and drops its buffer, the page keeps only the comments busy"""
+        try:
+            driver.execute_script(PAUSE_VIDEO_JS)
+        except Exception as e:
+            self._logger.debug(f"Could not pause video: {e}")
     
     def _scroll_to_comments(self, driver):
         """Scrolls the page to the comments section"""
         print("Scrolling to comments section...")
-        for i in range(5):
-            driver.execute_script("window.scrollBy(0, 400);")
-            time.sleep(0.3)
+        with phase("scroll"):
+            for i in range(5):
+                driver.execute_script("window.scrollBy(0, 400);")
+                time.sleep(0.3)
 
     def _debug_print_html(self, driver):
         """Debug function to print comment structure"""
@@ -102,14 +184,24 @@ class SeleniumYouTubeParser:
             print(f"Debug error: {e}") 
 
     def stream_comments(self, video_url: str, max_comments: int = None, 
-                        scroll_pause: float = 2.0, debug: bool = False) -> Iterator[Dict]:
-            """Streaming comments: yield each found comment thread"""
-            driver = self._create_driver()
+                        scroll_pause: float = 2.0, debug: bool = False, driver=None) -> Iterator[Dict]:
+            """
+            Streaming comments: yield each found comment thread
+
+            A driver passed in is reused and left open (SeleniumPool keeps one browser
+            per worker); otherwise a new one is created and quit at the end.
+            """
+            own_driver = driver is None
+            if own_driver:
+                driver = self._create_driver()
             
             try:
                 print(f"Opening URL: {video_url}")
-                driver.get(video_url)
+                with WEBDRIVER_SECONDS.time(op="get"):
+                    driver.get(video_url)
                 time.sleep(4)
+                if self.lean:
+                    self._pause_video(driver)
                 
                 self._scroll_to_comments(driver)
                 
@@ -120,9 +212,11 @@ class SeleniumYouTubeParser:
                     )
                     print("✓ ytd-comments section found.")
                     time.sleep(3)
+                    # The player may have started after the first pause
+                    if self.lean:
+                        self._pause_video(driver)
                 except TimeoutException:
                     print("✗ Comments section not found.")
-                    driver.quit()
                     return
 
                 try:
@@ -130,7 +224,6 @@ class SeleniumYouTubeParser:
                     msg_text = disabled_msg.text.lower()
                     if "disabled" in msg_text or "отключен" in msg_text or "turned off" in msg_text:
                         print("✗ Comments are disabled for this video.")
-                        driver.quit()
                         return
                 except NoSuchElementException:
                     pass
@@ -154,12 +247,16 @@ class SeleniumYouTubeParser:
                     scroll_count += 1
                     print(f"\n--- Scroll #{scroll_count} ---")
                     
-                    driver.execute_script(
-                        "window.scrollTo({top: document.documentElement.scrollHeight, behavior: 'smooth'});"
-                    )
-                    time.sleep(scroll_pause + (1.0 if self.slow_mode else 0.0))
+                    with phase("scroll"):
+                        driver.execute_script(
+                            "window.scrollTo({top: document.documentElement.scrollHeight, behavior: 'smooth'});"
+                        )
+                        pause = scroll_pause + (1.0 if self.slow_mode else 0.0)
+                        SLEEP_SECONDS.inc(pause, platform="selenium")
+                        time.sleep(pause)
                     
-                    elems = driver.find_elements(By.CSS_SELECTOR, "ytd-comment-thread-renderer")
+                    with phase("extract"), WEBDRIVER_SECONDS.time(op="find_elements"):
+                        elems = driver.find_elements(By.CSS_SELECTOR, "ytd-comment-thread-renderer")
                     print(f"Found ytd-comment-thread-renderer elements: {len(elems)}")
                     
                     if debug and scroll_count == 1 and len(elems) > 0:
@@ -180,79 +277,91 @@ class SeleniumYouTubeParser:
                         print("=" * 50)
                     
                     new_in_batch = 0
+                    handled = []
                     for e in elems:
                         comment_data = None
                         
-                        for thread_sel, text_sel, author_sel, likes_sel in selectors_to_try:
-                            try:
-                                cid = e.get_attribute("id")
-                                
-                                text = ""
-                                try:
-                                    text_elem = e.find_element(By.CSS_SELECTOR, text_sel)
-                                    text = text_elem.text.strip()
-                                except NoSuchElementException:
-                                    continue 
-
-                                if not text:
-                                    continue
-                                
-                                author = ""
+                        # Threads read in an earlier scroll are skipped before their text is fetched
+                        try:
+                            cid = e.get_attribute("id")
+                        except Exception:
+                            continue
+                        if cid and cid in seen_ids:
+                            handled.append(e)
+                            continue
+                        
+                        with phase("extract"):
+                            for thread_sel, text_sel, author_sel, likes_sel in selectors_to_try:
                                 try:
-                                    author_elem = e.find_element(By.CSS_SELECTOR, author_sel)
-                                    author = author_elem.text.strip()
-                                except NoSuchElementException:
-                                    pass
-                                
-                                time_text = ""
-                                time_selectors = [
-                                    "a.yt-simple-endpoint.style-scope.yt-formatted-string",
-                                    "yt-formatted-string.published-time-text a",
-                                    ".published-time-text a",
-                                    "a#published-time-text",
-                                ]
-                                for time_sel in time_selectors:
+                                    text = ""
                                     try:
-                                        time_elem = e.find_element(By.CSS_SELECTOR, time_sel)
-                                        time_text = time_elem.text.strip()
-                                        if time_text:
-                                            break
+                                        text_elem = e.find_element(By.CSS_SELECTOR, text_sel)
+                                        text = text_elem.text.strip()
                                     except NoSuchElementException:
+                                        continue 
+
+                                    if not text:
                                         continue
-                                
-                                likes = "0"
-                                try:
-                                    likes_elem = e.find_element(By.CSS_SELECTOR, likes_sel)
-                                    likes_text = likes_elem.text.strip()
-                                    likes = likes_text if likes_text else "0"
-                                except NoSuchElementException:
-                                    pass
-                                
-                                comment_data = {
-                                    "source": "youtube",
-                                    "url": video_url,
-                                    "id": cid or f"comment_{yielded}",
-                                    "content": text,
-                                    "likes": int(likes.replace(",", "").replace(".", "") if likes else "0"),
-                                    "date": time_text,
-                                    "author": author,
-                                }
-                                break  
-                                
-                            except Exception as ex:
-                                if debug:
-                                    print(f"Error with selector set: {ex}")
-                                continue
+                                    
+                                    author = ""
+                                    try:
+                                        author_elem = e.find_element(By.CSS_SELECTOR, author_sel)
+                                        author = author_elem.text.strip()
+                                    except NoSuchElementException:
+                                        pass
+                                    
+                                    time_text = ""
+                                    time_selectors = [
+                                        "a.yt-simple-endpoint.style-scope.yt-formatted-string",
+                                        "yt-formatted-string.published-time-text a",
+                                        ".published-time-text a",
+                                        "a#published-time-text",
+                                    ]
+                                    for time_sel in time_selectors:
+                                        try:
+                                            time_elem = e.find_element(By.CSS_SELECTOR, time_sel)
+                                            time_text = time_elem.text.strip()
+                                            if time_text:
+                                                break
+                                        except NoSuchElementException:
+                                            continue
+                                    
+                                    likes = "0"
+                                    try:
+                                        likes_elem = e.find_element(By.CSS_SELECTOR, likes_sel)
+                                        likes_text = likes_elem.text.strip()
+                                        likes = likes_text if likes_text else "0"
+                                    except NoSuchElementException:
+                                        pass
+                                    
+                                    comment_data = {
+                                        "source": "youtube",
+                                        "url": video_url,
+                                        "id": cid or f"comment_{yielded}",
+                                        "content": text,
+                                        "likes": parse_likes(likes),
+                                        "date": time_text,
+                                        "timestamp": parse_date(time_text),
+                                        "author": author,
+                                    }
+                                    break  
+                                    
+                                except Exception as ex:
+                                    if debug:
+                                        print(f"Error with selector set: {ex}")
+                                    continue
                         
+                        if comment_data:
+                            handled.append(e)
                         if comment_data and comment_data["id"] not in seen_ids:
                             seen_ids.add(comment_data["id"])
                             yielded += 1
+                            COMMENTS_FETCHED.inc(platform="selenium")
                             new_in_batch += 1
                             yield comment_data
                             
                             if max_comments and yielded >= max_comments:
                                 print(f"✓ Limit reached: {max_comments} comments")
-                                driver.quit()
                                 return
                     
                     print(f"New comments in this scroll: {new_in_batch}")
@@ -270,17 +379,24 @@ class SeleniumYouTubeParser:
                         break
                     
                     last_height = new_height
+                    if self.prune_dom and handled:
+                        # Threads without text yet are left for the next scroll; the page gets
+                        # shorter, so the next height check compares against the pruned page
+                        with WEBDRIVER_SECONDS.time(op="prune"):
+                            driver.execute_script(PRUNE_COMMENTS_JS, handled)
+                            last_height = driver.execute_script("return document.documentElement.scrollHeight")
 
             finally:
-                try:
-                    driver.quit()
-                except:
-                    pass 
+                if own_driver:
+                    try:
+                        driver.quit()
+                    except:
+                        pass 
 
     def save_to_json(self, video_url: str, output_file: str, 
                      max_comments: int = None, scroll_pause: float = 2.0, debug: bool = False) -> int:
         """
-        Parses comments and saves through storage
+        Parses comments and saves them through storage as they are scraped
         
         Returns:
             int: number of saved comments
@@ -290,22 +406,54 @@ class SeleniumYouTubeParser:
         print(f"URL: {video_url}")
         print(f"{'='*60}\n")
         
-        comment_count = 0
-        comments = []  
-        for comment in self.stream_comments(video_url, max_comments, scroll_pause, debug):
-            comments.append(Comment(**comment)) 
-            comment_count += 1
-            if comment_count % 10 == 0:
-                print(f"📝 Comments collected: {comment_count}")
+        comment_count = self._save_stream(self.stream_comments(video_url, max_comments, scroll_pause, debug), video_url)
         
         print(f"\n{'='*60}")
-        print(f"✓ Saved {comment_count} comments to {output_file}")
+        print(f"✓ Saved {comment_count} comments to database")
         print(f"{'='*60}\n")
         return comment_count
 
+    @staticmethod
+    def comment_record(comment: Dict, video_url: str) -> CommentRecord:
+        """Converts a comment dict from stream_comments() into a CommentRecord"""
+        return CommentRecord(
+            url=comment.get('url', video_url),
+            content=comment.get('content', ''),
+            likes=comment.get('likes', 0),
+            date=comment.get('date', ''),
+            source='youtube',
+            author=comment.get('author', ''),
+            timestamp=comment.get('timestamp')
+        )
+
+    def _save_stream(self, comments: Iterator[Dict], video_url: str, batch_size: int = 50) -> int:
+        """Saves streamed comments in small batches, so nothing but the current batch is kept in memory"""
+        saved = 0
+        collected = 0
+        batch = []
+        for comment in comments:
+            with phase("convert"):
+                batch.append(self.comment_record(comment, video_url))
+            collected += 1
+            if collected % 10 == 0:
+                print(f"📝 Comments collected: {collected}")
+            if len(batch) >= batch_size:
+                saved += self.storage.create_comments(batch)
+                batch = []
+        if batch:
+            saved += self.storage.create_comments(batch)
+        return saved
+
+    def _get_translator(self, target_language: str) -> TranslationService:
+        translator = self._translators.get(target_language)
+        if translator is None:
+            translator = TranslationService(target_language)
+            self._translators[target_language] = translator
+        return translator
+
     def translate_comment(self, comment: str, target_language: str = "ru") -> str:
         """
-        Translates comment to specified language using Google Translate.
+        Translates comment to specified language using the shared TranslationService.
         
         Args:
             comment (str): Comment text to translate.
@@ -314,203 +462,16 @@ class SeleniumYouTubeParser:
         Returns:
             str: Translated comment text.
         """
-        from googletrans import Translator, LANGUAGES
-        
-        translator = Translator()
-        try:
-            detected_language = translator.detect(comment).lang
-            print(f"Detected comment language: {LANGUAGES.get(detected_language, detected_language)}")
-            
-            if detected_language != target_language:
-                translated = translator.translate(comment, dest=target_language)
-                print(f"Translated from {LANGUAGES.get(detected_language)} to {LANGUAGES.get(target_language)}")
-                return translated.text
-            else:
-                print("Comment is already in target language.")
-                return comment
-        except Exception as e:
-            print(f"Translation error: {e}")
-            return comment  
+        return self._get_translator(target_language).translate(comment)
 
     def stream_comments_with_translation(self, video_url: str, max_comments: int = None, 
                                          scroll_pause: float = 2.0, debug: bool = False, 
                                          target_language: str = "ru") -> Iterator[Dict]:
-        """Streaming comments with translation: yield each found comment thread"""
-        driver = self._create_driver()
-        
-        try:
-            print(f"Opening URL: {video_url}")
-            driver.get(video_url)
-            time.sleep(4)
-            
-            self._scroll_to_comments(driver)
-            
-            print("Waiting for comments section to load...")
-            try:
-                WebDriverWait(driver, 30).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "ytd-comments"))
-                )
-                print("✓ ytd-comments section found.")
-                time.sleep(3)
-            except TimeoutException:
-                print("✗ Comments section not found.")
-                driver.quit()
-                return
-
-            try:
-                disabled_msg = driver.find_element(By.CSS_SELECTOR, "ytd-message-renderer")
-                msg_text = disabled_msg.text.lower()
-                if "disabled" in msg_text or "отключен" in msg_text or "turned off" in msg_text:
-                    print("✗ Comments are disabled for this video.")
-                    driver.quit()
-                    return
-            except NoSuchElementException:
-                pass
-            
-            if debug:
-                self._debug_print_html(driver)
-            
-            last_height = driver.execute_script("return document.documentElement.scrollHeight")
-            seen_ids = set()
-            yielded = 0
-            no_new_comments_count = 0
-            scroll_count = 0
-            
-            selectors_to_try = [
-                ("ytd-comment-thread-renderer", "yt-attributed-string#content-text", "yt-formatted-string#author-text", "span#vote-count-middle"),
-                ("ytd-comment-thread-renderer", "#content-text", "#author-text span", "#vote-count-middle"),
-                ("ytd-comment-thread-renderer", "yt-formatted-string.ytd-comment-renderer", "#author-text", "#vote-count-middle"),
-            ]
-            
-            while True:
-                scroll_count += 1
-                print(f"\n--- Scroll #{scroll_count} ---")
-                
-                driver.execute_script(
-                    "window.scrollTo({top: document.documentElement.scrollHeight, behavior: 'smooth'});"
-                )
-                time.sleep(scroll_pause + (1.0 if self.slow_mode else 0.0))
-                
-                elems = driver.find_elements(By.CSS_SELECTOR, "ytd-comment-thread-renderer")
-                print(f"Found ytd-comment-thread-renderer elements: {len(elems)}")
-                
-                if debug and scroll_count == 1 and len(elems) > 0:
-                    print("\n=== Checking selectors on first element ===")
-                    test_elem = elems[0]
-                    for i, (thread_sel, text_sel, author_sel, likes_sel) in enumerate(selectors_to_try):
-                        print(f"\nVariant #{i+1}:")
-                        try:
-                            text_e = test_elem.find_element(By.CSS_SELECTOR, text_sel)
-                            print(f"  ✓ Text found: {text_sel} -> '{text_e.text[:50]}...'")
-                        except:
-                            print(f"  ✗ Text NOT found: {text_sel}")
-                        try:
-                            author_e = test_elem.find_element(By.CSS_SELECTOR, author_sel)
-                            print(f"  ✓ Author found: {author_sel} -> '{author_e.text}'")
-                        except:
-                            print(f"  ✗ Author NOT found: {author_sel}")
-                    print("=" * 50)
-                
-                new_in_batch = 0
-                for e in elems:
-                    comment_data = None
-                    
-                    for thread_sel, text_sel, author_sel, likes_sel in selectors_to_try:
-                        try:
-                            cid = e.get_attribute("id")
-                            
-                            text = ""
-                            try:
-                                text_elem = e.find_element(By.CSS_SELECTOR, text_sel)
-                                text = text_elem.text.strip()
-                            except NoSuchElementException:
-                                continue 
-
-                            if not text:
-                                continue
-                            
-                            author = ""
-                            try:
-                                author_elem = e.find_element(By.CSS_SELECTOR, author_sel)
-                                author = author_elem.text.strip()
-                            except NoSuchElementException:
-                                pass
-                            
-                            time_text = ""
-                            time_selectors = [
-                                "a.yt-simple-endpoint.style-scope.yt-formatted-string",
-                                "yt-formatted-string.published-time-text a",
-                                ".published-time-text a",
-                                "a#published-time-text",
-                            ]
-                            for time_sel in time_selectors:
-                                try:
-                                    time_elem = e.find_element(By.CSS_SELECTOR, time_sel)
-                                    time_text = time_elem.text.strip()
-                                    if time_text:
-                                        break
-                                except NoSuchElementException:
-                                    continue
-                            
-                            likes = "0"
-                            try:
-                                likes_elem = e.find_element(By.CSS_SELECTOR, likes_sel)
-                                likes_text = likes_elem.text.strip()
-                                likes = likes_text if likes_text else "0"
-                            except NoSuchElementException:
-                                pass
-                            
-                            comment_data = {
-                                "source": "youtube",
-                                "url": video_url,
-                                "id": cid or f"comment_{yielded}",
-                                "content": text,
-                                "likes": int(likes.replace(",", "").replace(".", "") if likes else "0"),
-                                "date": time_text,
-                                "author": author,
-                            }
-                            break  
-                            
-                        except Exception as ex:
-                            if debug:
-                                print(f"Error with selector set: {ex}")
-                            continue
-                    
-                    if comment_data and comment_data["id"] not in seen_ids:
-                        seen_ids.add(comment_data["id"])
-                        yielded += 1
-                        new_in_batch += 1
-                        
-                        comment_data["content"] = self.translate_comment(comment_data["content"], target_language)
-                        
-                        yield comment_data
-                        
-                        if max_comments and yielded >= max_comments:
-                            print(f"✓ Limit reached: {max_comments} comments")
-                            driver.quit()
-                            return
-                
-                print(f"New comments in this scroll: {new_in_batch}")
-                print(f"Total collected: {yielded}")
-                
-                new_height = driver.execute_script("return document.documentElement.scrollHeight")
-                
-                if new_in_batch == 0:
-                    no_new_comments_count += 1
-                else:
-                    no_new_comments_count = 0
-                
-                if new_height == last_height or no_new_comments_count >= 3:
-                    print(f"\n✓ Parsing completed. Collected {yielded} comments.")
-                    break
-                
-                last_height = new_height
-
-        finally:
-            try:
-                driver.quit()
-            except:
-                pass 
+        """Streaming comments with translation: comments are translated in batches as they are scraped"""
+        translator = self._get_translator(target_language)
+        yield from translator.translate_comments(
+            self.stream_comments(video_url, max_comments, scroll_pause, debug)
+        )
 
     def save_to_json_with_translation(self, video_url: str, output_file: str, 
                                        max_comments: int = None, scroll_pause: float = 2.0, 
@@ -526,15 +487,12 @@ class SeleniumYouTubeParser:
         print(f"URL: {video_url}")
         print(f"{'='*60}\n")
         
-        comment_count = 0
-        comments = [] 
-        for comment in self.stream_comments_with_translation(video_url, max_comments, scroll_pause, debug, target_language):
-            comments.append(Comment(**comment)) 
-            comment_count += 1
-            if comment_count % 10 == 0:
-                print(f"📝 Comments collected: {comment_count}")
+        comment_count = self._save_stream(
+            self.stream_comments_with_translation(video_url, max_comments, scroll_pause, debug, target_language),
+            video_url
+        )
                 
         print(f"\n{'='*60}")
-        print(f"✓ Saved {comment_count} comments to {output_file}")
+        print(f"✓ Saved {comment_count} comments to database")
         print(f"{'='*60}\n")
-        return comment_count
\ No newline at end of file
+        return comment_count
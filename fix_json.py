@@ -1,18 +1,22 @@
-import json
 import os
+import sys
 
-def fix_json_encoding(file_path):
+from comment_parser.storage.comments_storage import LEGACY_DB_PATHS, CommentsStorage
+
+
+def fix_json_encoding(file_path, data_root=None):
+    """Imports a legacy comments_db.json (or comments_db.seg) into the partitioned data root, UTF-8 throughout."""
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        
-        print(f"Successfully fixed encoding for {file_path}")
+        storage = CommentsStorage(db_path=data_root)
+        imported = storage.import_legacy(file_path)
+        print(f"Successfully imported {imported} comments from {file_path} into {storage.db_path}")
     except Exception as e:
         print(f"Error fixing encoding for {file_path}: {e}")
 
 if __name__ == "__main__":
-    db_path = os.path.join(os.path.dirname(__file__), "comment_parser", "storage", "comments_db.json")
-    fix_json_encoding(db_path)
+    if len(sys.argv) > 1:
+        fix_json_encoding(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    else:
+        for path in LEGACY_DB_PATHS:
+            if os.path.isfile(path) and os.path.getsize(path):
+                fix_json_encoding(path)
@@ -1,14 +1,11 @@
-import asyncio
 import argparse
 import os
+import sys
 import json
-import re
-from comment_parser.telegram.api_telegram import TelegramCommentsParser
-from comment_parser.vk.api_vk import ApiVKParser
-from comment_parser.youtube.api_youtube import YouTubeAPIParser
-from comment_parser.youtube.selenium_youtube import SeleniumYouTubeParser
-from comment_parser.storage.comments_storage import CommentsStorage
-from comment_parser.storage.models import CreateComment
+
+# Platform parsers (Telethon, requests, Selenium, pydantic) are imported inside the
+# branch that needs them, so --help, --check_config and single-platform runs only
+# pay for what they use. tests/test_startup.py guards this.
 
 def load_config(config_path: str) -> dict:
     """Load configuration from JSON file"""
@@ -20,9 +17,49 @@ def load_config(config_path: str) -> dict:
             print(f"Warning: Could not load config file {config_path}: {e}")
     return {}
 
+def read_video_urls(path: str) -> list:
+    """Reads a --video_urls file: one URL per line, blank lines and # comments are skipped"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+def check_config(args, config: dict) -> list:
+    """Validate credentials and targets without importing any platform module"""
+    from comment_parser.crawler.spec import iter_job_manifest, validate_job
+
+    problems = []
+    if args.jobs:
+        if not os.path.exists(args.jobs):
+            return [f"Job manifest not found: {args.jobs}"]
+        for line_no, job, error in iter_job_manifest(args.jobs):
+            error = error or validate_job(job, config)
+            if error:
+                problems.append(f"{args.jobs}:{line_no}: {error}")
+        return problems
+
+    if args.video_urls:
+        if not os.path.exists(args.video_urls):
+            return [f"Video list not found: {args.video_urls}"]
+        for video_url in read_video_urls(args.video_urls):
+            error = validate_job({"platform": "youtube", "video_url": video_url}, config)
+            if error:
+                problems.append(f"{args.video_urls}: {video_url}: {error}")
+        return problems
+
+    job = {
+        "platform": args.platform,
+        "channel": args.channel,
+        "owner_id": args.owner_id,
+        "post_id": args.post_id,
+        "video_url": args.video_url,
+    }
+    error = validate_job(job, config)
+    if error:
+        problems.append(error)
+    return problems
+
 def main():
     parser = argparse.ArgumentParser(description="Comments Parsing Tool")
-    parser.add_argument('--platform', choices=['telegram', 'vk', 'youtube'], required=True,
+    parser.add_argument('--platform', choices=['telegram', 'vk', 'youtube'],
                        help='Platform to parse comments from')
     parser.add_argument('--config', type=str, default='config.json',
                        help='Path to config file with credentials')
@@ -30,7 +67,11 @@ def main():
     # Telegram specific args
     parser.add_argument('--api_id', type=int, help='Telegram API ID')
     parser.add_argument('--api_hash', type=str, help='Telegram API Hash')
-    parser.add_argument('--channel', type=str, help='Telegram channel username')
+    parser.add_argument('--channel', type=str, help='Telegram channel username (comma separated list with --live)')
+    parser.add_argument('--live', action='store_true',
+                       help='Telegram: keep running and store new comments as they are posted')
+    parser.add_argument('--flush_interval', type=float, default=1.0,
+                       help='Maximum seconds a live comment waits before it is stored (--live)')
 
     # VK specific args
     parser.add_argument('--owner_id', type=str, help='VK owner ID')
@@ -39,14 +80,50 @@ def main():
 
     # YouTube specific args
     parser.add_argument('--video_url', type=str, help='YouTube video URL')
+    parser.add_argument('--video_urls', type=str,
+                       help='File with one YouTube video URL per line, scraped in parallel by --workers browsers')
+    parser.add_argument('--prune_dom', action='store_true',
+                       help='Selenium: remove comments from the page once read, keeps memory flat on long scrolls')
     parser.add_argument('--youtube_api_key', type=str, help='YouTube Data API key (optional, uses Selenium if not provided)')
 
     # Common args
     parser.add_argument('--posts_limit', type=int, default=20, help='Limit for posts (Telegram)')
     parser.add_argument('--comments_limit', type=int, default=200, help='Limit for comments per post')
     parser.add_argument('--max_comments', type=int, help='Maximum comments to parse')
+    parser.add_argument('--translate_to', type=str, help='Translate comment content to this language before saving (e.g. ru)')
+    parser.add_argument('--dedup', choices=['tag', 'drop'],
+                       help='Tag or drop near-duplicate comments (bot waves) before saving')
+
+    # Batch mode
+    parser.add_argument('--jobs', type=str, help='JSONL manifest with one target spec per line (replaces --platform)')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes for --jobs and --video_urls')
+    parser.add_argument('--check_config', action='store_true',
+                       help='Only validate config and target arguments (or the --jobs manifest), then exit')
+    parser.add_argument('--data_root', type=str,
+                       help='Storage directory (default: $COMMENTS_DATA_ROOT or data/comments)')
+    parser.add_argument('--compact', action='store_true',
+                       help='Compact the storage: merge small blocks, drop duplicates and expired partitions (replaces --platform)')
+    parser.add_argument('--retention', type=str,
+                       help='Days to keep per source for --compact, e.g. vk=30,telegram=7,*=365 (default: config retention_days)')
+    parser.add_argument('--http_pool_size', type=int, default=10,
+                       help='Keep-alive connections per API host shared by the VK and YouTube parsers')
+    parser.add_argument('--http2', action='store_true', help='Use HTTP/2 for API requests (needs httpx[http2])')
+    parser.add_argument('--http_cache', type=str, help='Directory caching VK/YouTube API responses (tokens are not part of the key)')
+    parser.add_argument('--http_cache_ttl', type=float, default=7 * 86400, help='Seconds a cached response stays valid')
+    parser.add_argument('--replay', action='store_true',
+                       help='Only serve API responses from --http_cache, never touch the network')
+    parser.add_argument('--metrics_out', type=str,
+                       help='Collect crawl metrics and write them here on exit (.json for JSON, Prometheus text otherwise)')
+    parser.add_argument('--profile', nargs='?', const='profile', metavar='PREFIX',
+                       help='Profile the run and write PREFIX.collapsed, PREFIX.phases.json and PREFIX.pstats (default prefix: profile)')
+    parser.add_argument('--profile_mode', choices=['cprofile', 'sample'], default='cprofile',
+                       help='cprofile: deterministic profile plus stack samples, sample: stack samples only (lower overhead)')
 
     args = parser.parse_args()
+    if not args.platform and not args.jobs and not args.compact:
+        parser.error("one of --platform, --jobs or --compact is required")
+    if args.replay and not args.http_cache:
+        parser.error("--replay needs --http_cache")
 
     # Load config
     config = load_config(args.config)
@@ -60,19 +137,81 @@ def main():
         config['vk_token'] = args.token
     if args.youtube_api_key:
         config['youtube_api_key'] = args.youtube_api_key
+    if args.data_root:
+        config['data_root'] = args.data_root
+
+    if args.check_config:
+        problems = check_config(args, config)
+        for problem in problems:
+            print(f"✗ {problem}")
+        if problems:
+            sys.exit(1)
+        print("✓ Config is valid")
+        return
+
+    if args.metrics_out:
+        from comment_parser.monitoring.metrics import METRICS
+        METRICS.enable()
+    if args.profile:
+        from comment_parser.monitoring.profiling import Profiler
+        profiler = Profiler(use_cprofile=args.profile_mode == 'cprofile')
+        profiler.start()
+
+    http_options = {"pool_size": args.http_pool_size, "http2": args.http2}
+    if args.platform in ('vk', 'youtube') or args.jobs:
+        from comment_parser.network.http_client import configure_default_client
+        if args.http_cache:
+            from comment_parser.network.response_cache import ResponseCache
+            http_options["cache"] = ResponseCache(args.http_cache, ttl=args.http_cache_ttl, replay_only=args.replay)
+        configure_default_client(**http_options)
+
+    from comment_parser.storage.comments_storage import CommentsStorage
+    storage = CommentsStorage(db_path=config.get('data_root'))
+    if args.dedup:
+        from comment_parser.storage.dedup import NearDuplicateDetector
+        storage.add_processor(NearDuplicateDetector(action=args.dedup))
+    if args.translate_to:
+        from comment_parser.translation.translator import TranslationService, default_cache
+        storage.add_processor(TranslationService(args.translate_to, cache=default_cache(storage.db_path)))
 
     try:
-        if args.platform == 'telegram':
+        if args.compact:
+            from comment_parser.storage.compaction import Compactor, parse_retention, print_compaction_report
+            retention = parse_retention(args.retention) if args.retention else config.get('retention_days')
+            print_compaction_report(Compactor(storage, retention_days=retention).run())
+
+        elif args.jobs:
+            from comment_parser.crawler.jobs import run_manifest, print_manifest_report
+            report = run_manifest(
+                args.jobs,
+                config,
+                storage=storage,
+                workers=args.workers,
+                translate_to=args.translate_to,
+                dedup=args.dedup,
+                http_options=http_options,
+            )
+            print_manifest_report(report)
+
+        elif args.platform == 'telegram':
             api_id = config.get('telegram_api_id')
             api_hash = config.get('telegram_api_hash')
             if not all([api_id, api_hash, args.channel]):
                 print("Error: For Telegram, provide --api_id, --api_hash, and --channel or set in config.json")
                 return
 
+            import asyncio
+            from comment_parser.telegram.api_telegram import TelegramCommentsParser
+
             async def run_telegram():
                 try:
-                    parser = TelegramCommentsParser(api_id, api_hash)
+                    parser = TelegramCommentsParser(api_id, api_hash, storage=storage)
                     await parser.connect()
+                    if args.live:
+                        channels = [channel.strip() for channel in args.channel.split(',') if channel.strip()]
+                        saved = await parser.monitor(channels, flush_interval=args.flush_interval)
+                        print(f"Saved {saved} comments from Telegram (live)")
+                        return
                     saved = await parser.parse_comments(
                         args.channel,
                         posts_limit=args.posts_limit,
@@ -96,8 +235,10 @@ def main():
                 print("Error: For VK, provide --owner_id, --token, and --post_id or set token in config.json")
                 return
 
+            from comment_parser.vk.api_vk import ApiVKParser
+
             try:
-                parser = ApiVKParser()
+                parser = ApiVKParser(storage=storage)
                 saved = parser.save_json(
                     owner_id,
                     args.post_id,
@@ -112,42 +253,39 @@ def main():
             except Exception as e:
                 print(f"Error parsing VK comments: {e}")
 
+        elif args.platform == 'youtube' and args.video_urls:
+            from comment_parser.youtube.selenium_pool import SeleniumPool, print_pool_report
+            pool = SeleniumPool(workers=args.workers, storage=storage, max_comments=args.max_comments,
+                                prune_dom=args.prune_dom)
+            print_pool_report(pool.run(read_video_urls(args.video_urls)))
+
         elif args.platform == 'youtube':
             if not args.video_url:
-                print("Error: For YouTube, provide --video_url")
+                print("Error: For YouTube, provide --video_url or --video_urls")
                 return
 
+            from comment_parser.crawler.spec import extract_video_id
+
             # Extract video ID from URL
-            video_id_match = re.search(r'(?:v=|\/)([0-9A-Za-z_-]{11}).*', args.video_url)
-            if not video_id_match:
+            video_id = extract_video_id(args.video_url)
+            if not video_id:
                 print("Error: Invalid YouTube URL")
                 return
-            video_id = video_id_match.group(1)
 
             api_key = config.get('youtube_api_key') or args.youtube_api_key
             
             try:
                 if api_key:
                     # Use API parser
-                    parser = YouTubeAPIParser()
+                    from comment_parser.youtube.api_youtube import YouTubeAPIParser
+                    parser = YouTubeAPIParser(storage=storage)
                     saved = parser.parse_comments(video_id, api_key, args.max_comments or 100)
                     print(f"Saved {saved} comments from YouTube (API)")
                 else:
                     # Use Selenium parser
-                    parser = SeleniumYouTubeParser()
-                    storage = CommentsStorage()
-                    saved = 0
-                    for comment in parser.stream_comments(args.video_url, max_comments=args.max_comments):
-                        create_comment = CreateComment(
-                            url=comment.get('url', args.video_url),
-                            content=comment.get('content', ''),
-                            likes=comment.get('likes', 0),
-                            date=comment.get('date', ''),
-                            source='youtube',
-                            author=comment.get('author', '')
-                        )
-                        if storage.create_comment(create_comment):
-                            saved += 1
+                    from comment_parser.youtube.selenium_youtube import SeleniumYouTubeParser
+                    parser = SeleniumYouTubeParser(storage=storage, prune_dom=args.prune_dom)
+                    saved = parser.save_to_json(args.video_url, "", max_comments=args.max_comments)
                     print(f"Saved {saved} comments from YouTube (Selenium)")
             except Exception as e:
                 print(f"Error parsing YouTube comments: {e}")
@@ -156,6 +294,16 @@ def main():
         print("\nOperation cancelled by user")
     except Exception as e:
         print(f"Unexpected error: {e}")
+    finally:
+        storage.close()
+        if args.profile:
+            profiler.stop()
+            profiler.print_summary()
+            for path in profiler.write(args.profile):
+                print(f"✓ Profile written to {path}")
+        if args.metrics_out:
+            METRICS.write(args.metrics_out)
+            print(f"✓ Metrics written to {args.metrics_out}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+import unittest
+import requests
+from benchmarks import compare
+from benchmarks.run import bench_storage, percentiles, run_case
+from benchmarks.servers import ReplayServer
+from benchmarks.workloads import parse_size, synthetic_comments
+from comment_parser.monitoring.metrics import METRICS
+
+class TestReplayServer(unittest.TestCase):
+    def test_vk_paging(self):
+        with ReplayServer(total=150) as server:
+            first = requests.get(server.vk_url, params={"offset": 0, "count": 100}).json()
+            second = requests.get(server.vk_url, params={"offset": 100, "count": 100}).json()
+        self.assertEqual(len(first["response"]["items"]), 100)
+        self.assertEqual(len(second["response"]["items"]), 50)
+        self.assertEqual(second["response"]["items"][-1]["id"], 150)
+        self.assertEqual(server.requests, 2)
+
+    def test_youtube_page_token(self):
+        with ReplayServer(total=30) as server:
+            first = requests.get(server.youtube_url, params={"maxResults": 20}).json()
+            second = requests.get(server.youtube_url, params={"maxResults": 20, "pageToken": first["nextPageToken"]}).json()
+        self.assertEqual(len(first["items"]), 20)
+        self.assertEqual(len(second["items"]), 10)
+        self.assertNotIn("nextPageToken", second)
+
+class TestBenchmarks(unittest.TestCase):
+    def tearDown(self):
+        METRICS.disable()
+        METRICS.reset()
+
+    def test_parser_cases(self):
+        for name in ("vk", "youtube", "telegram"):
+            result = run_case(name, {"comments": 200, "latency": 0}, isolate=False)
+            self.assertEqual(result["comments"], 200, name)
+            self.assertGreater(result["comments_per_sec"], 0)
+            self.assertIn("p99_ms", result["storage_write_latency"])
+
+    def test_storage_case(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            result = bench_storage(tmp, 500, batch_size=100, lookups=5)
+        self.assertEqual(result["comments"], 500)
+        self.assertGreater(result["db_bytes"], 0)
+        self.assertGreater(result["lookup_latency"]["max_ms"], 0)
+
+    def test_workload_is_reproducible(self):
+        self.assertEqual(list(synthetic_comments(20, seed=1)), list(synthetic_comments(20, seed=1)))
+        self.assertEqual(parse_size("100k"), 100_000)
+        self.assertEqual(parse_size("1m"), 1_000_000)
+
+    def test_percentiles(self):
+        result = percentiles([0.001 * i for i in range(1, 101)])
+        self.assertAlmostEqual(result["p50_ms"], 50)
+        self.assertAlmostEqual(result["p99_ms"], 99)
+
+    def test_compare_flags_regressions(self):
+        base = {"commit": "a", "results": {"vk": {"comments_per_sec": 1000, "peak_rss_mb": 50}}}
+        new = {"commit": "b", "results": {"vk": {"comments_per_sec": 800, "peak_rss_mb": 51}}}
+        rows = {row[1]: row for row in compare.compare(base, new, threshold=10)}
+        self.assertTrue(rows["comments_per_sec"][-1])
+        self.assertFalse(rows["peak_rss_mb"][-1])
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for name, report in (("base", base), ("new", new)):
+                paths.append(os.path.join(tmp, f"{name}.json"))
+                with open(paths[-1], 'w', encoding='utf-8') as f:
+                    json.dump(report, f)
+            self.assertEqual(compare.main(paths + ["--threshold", "30"]), 0)
+            self.assertEqual(compare.main(paths), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from comment_parser.storage.changefeed import ChangeFeed
+from comment_parser.storage.comments_storage import CommentsStorage
+from comment_parser.storage.segments import Segment
+
+
+def comments(prefix, count, date="2024-01-01 12:00:00", source="vk"):
+    return [{"url": "u", "content": f"{prefix}{i}", "likes": 0, "date": date, "source": source, "author": "a"}
+            for i in range(count)]
+
+
+class TestChangeFeed(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "data")
+        self.storage = CommentsStorage(db_path=self.root, block_size=4, checkpoint_size=4, fsync=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_sequence_numbers_follow_writes(self):
+        self.storage.create_comments(comments("a", 2))
+        self.storage.create_comments(comments("b", 3, date="2024-01-02 12:00:00"))
+        self.storage.create_comments(comments("c", 1, source="youtube"))
+        self.assertEqual(self.storage.last_seq, 3)
+        records, seq = self.storage.read_changes(0)
+        self.assertEqual([(r["seq"], r["content"]) for r in records],
+                         [(1, "a0"), (1, "a1"), (2, "b0"), (2, "b1"), (2, "b2"), (3, "c0")])
+        self.assertEqual(seq, 3)
+        self.assertEqual([r["content"] for r in self.storage.read_changes(2)[0]], ["c0"])
+        self.assertEqual(self.storage.read_changes(3), ([], 3))
+        # Sealed blocks and the log tail keep the same numbers
+        self.storage.close()
+        self.assertEqual([r["seq"] for r in self.storage.read_changes(1)[0]], [2, 2, 2, 3])
+
+    def test_reads_skip_older_partitions(self):
+        self.storage.create_comments(comments("old", 8, date="2023-01-01 12:00:00"))
+        self.storage.close()
+        seq = self.storage.last_seq
+        self.storage.create_comments(comments("new", 8))
+        self.storage.close()
+        read = []
+        iter_blocks = Segment.iter_blocks
+
+        def tracking(segment, *args, **kwargs):
+            read.append(segment.path)
+            return iter_blocks(segment, *args, **kwargs)
+
+        with mock.patch.object(Segment, "iter_blocks", tracking):
+            self.assertEqual(len(self.storage.read_changes(seq)[0]), 8)
+        self.assertEqual(len(read), 2)
+        self.assertTrue(all("date=2024-01-01" in path for path in read))
+
+    def test_merge_is_one_write(self):
+        other = CommentsStorage(db_path=os.path.join(self.tmp.name, "worker"), fsync=False)
+        other.create_comments(comments("w", 3))
+        other.create_comments(comments("x", 2))
+        self.storage.create_comments(comments("a", 1))
+        self.storage.merge_segment(other.db_path)
+        self.storage.create_comments(comments("b", 1))
+        self.assertEqual([(r["seq"], r["content"]) for r in self.storage.read_changes(1)[0]],
+                         [(2, "w0"), (2, "w1"), (2, "w2"), (2, "x0"), (2, "x1"), (3, "b0")])
+        self.assertEqual(self.storage.get_comment(self.storage.read_changes(1)[0][0]["id"]).seq, 2)
+
+    def test_tail_wakes_up_on_writes(self):
+        received = []
+        reader = threading.Thread(target=lambda: received.extend(self.storage.tail(0, timeout=0.3)))
+        reader.start()
+        time.sleep(0.05)
+        started = time.monotonic()
+        self.storage.create_comments(comments("a", 2))
+        while len(received) < 2 and time.monotonic() - started < 1:
+            time.sleep(0.01)
+        # Woken up by the write, not by the poll interval
+        self.assertLess(time.monotonic() - started, 0.25)
+        self.storage.create_comments(comments("b", 1))
+        reader.join(5)
+        self.assertEqual([r["content"] for r in received], ["a0", "a1", "b0"])
+
+    def test_tail_sees_other_instances(self):
+        writer = CommentsStorage(db_path=self.root, fsync=False)
+        threading.Timer(0.1, lambda: writer.create_comments(comments("a", 2))).start()
+        received = list(self.storage.tail(0, timeout=0.3, poll_interval=0.05))
+        self.assertEqual([r["content"] for r in received], ["a0", "a1"])
+
+    def test_atail(self):
+        async def consume():
+            asyncio.get_running_loop().call_later(0.05, self.storage.create_comments, comments("a", 2))
+            return [record["content"] async for record in self.storage.atail(0, timeout=0.5, poll_interval=0.05)]
+
+        self.assertEqual(asyncio.run(consume()), ["a0", "a1"])
+
+    def test_consumer_offsets_are_saved(self):
+        self.storage.create_comments(comments("a", 2))
+        self.storage.create_comments(comments("b", 1))
+        feed = ChangeFeed(self.storage, "sentiment", timeout=0)
+        batches = iter(feed)
+        self.assertEqual([r["content"] for r in next(batches)], ["a0", "a1"])
+        # Stopped before asking for more: the first write was not confirmed
+        batches.close()
+        self.assertEqual(ChangeFeed(self.storage, "sentiment").offset, 0)
+        self.assertEqual([[r["content"] for r in batch] for batch in ChangeFeed(self.storage, "sentiment", timeout=0)],
+                         [["a0", "a1"], ["b0"]])
+        resumed = ChangeFeed(self.storage, "sentiment", timeout=0)
+        self.assertEqual((resumed.offset, resumed.lag(), list(resumed)), (2, 0, []))
+        self.storage.create_comments(comments("c", 1))
+        self.assertEqual([r["content"] for r in resumed.poll()], ["c0"])
+        resumed.reset()
+        self.assertEqual(len(list(ChangeFeed(self.storage, "sentiment", timeout=0))), 3)
+
+    def test_async_consumer(self):
+        self.storage.create_comments(comments("a", 2))
+        feed = ChangeFeed(self.storage, "alerts", timeout=0.1, poll_interval=0.05)
+
+        async def consume():
+            return [[r["content"] for r in batch] async for batch in feed]
+
+        self.assertEqual(asyncio.run(consume()), [["a0", "a1"]])
+        self.assertEqual(ChangeFeed(self.storage, "alerts").offset, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from comment_parser.storage import columnar
+from comment_parser.storage.comments_storage import CommentsStorage
+from comment_parser.storage.models import CreateComment
+
+def comment(url, likes, date, source="vk", content="text"):
+    return CreateComment(url=url, content=content, likes=likes, date=date, source=source, author="a")
+
+@unittest.skipUnless(columnar._HAS_NUMPY, "numpy is not installed")
+class TestColumnarStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = CommentsStorage(db_path=os.path.join(self.tmp.name, "data"), fsync=False)
+        self.root = os.path.join(self.tmp.name, "columnar")
+        self.storage.create_comments([
+            comment("a", 5, "2024-01-01 10:00:00", content="Привет"),
+            comment("a", 50, "2024-01-01 12:00:00", content="top"),
+            comment("a", 1, "2024-01-02 10:00:00"),
+            comment("b", 7, "2024-01-02T10:00:00Z", source="youtube"),
+            comment("b", 3, "", source="youtube"),
+        ])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_incremental_build(self):
+        store = columnar.ColumnarStore(self.root)
+        self.assertEqual(store.build(self.storage), 5)
+        self.assertEqual(store.build(self.storage), 0)
+        self.storage.create_comment(comment("c", 9, "2024-01-03 00:00:00"))
+
+        reopened = columnar.ColumnarStore(self.root)
+        self.assertEqual(reopened.build(self.storage), 1)
+        self.assertEqual(reopened.rows, 6)
+        self.assertEqual(list(reopened.column("likes")), [5, 50, 1, 7, 3, 9])
+        self.assertEqual(reopened.content(0), "Привет")
+        self.assertEqual(reopened.dictionaries["url"], ["a", "b", "c"])
+
+    def test_incremental_build_across_partitions(self):
+        store = columnar.ColumnarStore(self.root)
+        store.build(self.storage)
+        self.storage.checkpoint()
+        # Partition order (source, then date) differs from write order
+        self.storage.create_comments([comment("a", 11, "2023-12-31 10:00:00", source="youtube"),
+                                      comment("a", 12, "2024-01-05 10:00:00", source="telegram")])
+        self.storage.checkpoint()
+        self.assertEqual(store.build(self.storage), 2)
+        self.storage.create_comment(comment("a", 13, "2023-12-30 10:00:00"))
+        self.assertEqual(store.build(self.storage), 1)
+        likes = list(store.column("likes"))
+        # Writes in order; the two comments of one write in partition order
+        self.assertEqual(likes[:5] + sorted(likes[5:7]) + likes[7:], [5, 50, 1, 7, 3, 11, 12, 13])
+        self.assertEqual(columnar.ColumnarStore(self.root).build(self.storage), 0)
+
+    def test_interrupted_build_is_redone(self):
+        store = columnar.ColumnarStore(self.root)
+        store.build(self.storage)
+        with open(os.path.join(self.root, "likes.col"), 'ab') as f:
+            f.write(b"\x00" * 8)
+        store = columnar.ColumnarStore(self.root)
+        self.storage.create_comment(comment("c", 9, "2024-01-03 00:00:00"))
+        store.build(self.storage)
+        self.assertEqual(list(store.column("likes")), [5, 50, 1, 7, 3, 9])
+
+    def test_aggregations(self):
+        store = columnar.ColumnarStore(self.root)
+        store.build(self.storage)
+        top = store.top_liked_per_url(k=2, with_content=True)
+        self.assertEqual([item["likes"] for item in top["a"]], [50, 5])
+        self.assertEqual(top["a"][0]["content"], "top")
+        self.assertEqual([item["likes"] for item in top["b"]], [7, 3])
+        self.assertEqual(store.volume_per_day(), {
+            "2024-01-01": {"vk": 2},
+            "2024-01-02": {"vk": 1, "youtube": 1},
+        })
+        self.assertEqual(store.volume_per_day(source="youtube"), {"2024-01-02": {"youtube": 1}})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from comment_parser.storage.comments_storage import CommentsStorage
+from comment_parser.storage import columnar
+from comment_parser.storage.compaction import Compactor, duplicate_filter, parse_retention
+from comment_parser.storage.text_index import TextIndex
+
+NOW = 1704067200 + 40 * 86400  # 2024-02-10
+
+
+def comment(content, date="2024-02-01 12:00:00", source="vk", author="a"):
+    return {"url": "u", "content": content, "likes": 0, "date": date, "source": source, "author": author}
+
+
+class TestRetentionSpec(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(parse_retention("vk=30, telegram=7,*=365"), {"vk": 30, "telegram": 7, "*": 365})
+        with self.assertRaises(ValueError):
+            parse_retention("vk")
+
+    def test_duplicate_filter(self):
+        keep = duplicate_filter()
+        first = {"id": "1", **comment("hello")}
+        self.assertTrue(keep(first))
+        self.assertFalse(keep({**first, "id": "2"}))
+        self.assertFalse(keep({**comment("other"), "id": "1"}))
+        self.assertTrue(keep({**comment("hello", author="b"), "id": "3"}))
+
+
+class TestCompactor(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "data")
+        self.storage = CommentsStorage(db_path=self.root, block_size=10, checkpoint_size=3, fsync=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def contents(self):
+        return sorted(c["content"] for c in self.storage.iter_comments())
+
+    def test_small_blocks_are_merged(self):
+        for batch in range(5):
+            self.storage.create_comments([comment(f"c{batch}-{i}") for i in range(3)])
+        key = "source=vk/date=2024-02-01"
+        self.assertEqual(self.storage.partitions()[key]["blocks"], 5)
+        report = Compactor(self.storage, grace_seconds=0).run(now=NOW)
+        self.assertEqual((report["rewritten"], report["duplicates"]), (1, 0))
+        partition = self.storage.partitions()[key]
+        self.assertEqual((partition["blocks"], partition["count"]), (2, 15))
+        self.assertEqual(sorted(os.listdir(os.path.join(self.root, *key.split("/")))),
+                         ["comments-1.seg", "comments-1.seg.idx"])
+        self.assertEqual(len(self.contents()), 15)
+        # Nothing changed since: the next pass skips the partition
+        self.assertEqual(Compactor(self.storage, grace_seconds=0).run(now=NOW)["rewritten"], 0)
+
+    def test_duplicates_are_removed(self):
+        self.storage.create_comments([comment("same"), comment("other")])
+        self.storage.create_comments([comment("same")])
+        report = Compactor(self.storage, grace_seconds=0).run(now=NOW)
+        self.assertEqual(report["duplicates"], 1)
+        self.assertEqual(self.contents(), ["other", "same"])
+
+    def test_retention_per_source(self):
+        self.storage.create_comments([comment("old vk", "2023-12-01 12:00:00"), comment("new vk"),
+                                      comment("old tg", "2023-12-01 12:00:00", source="telegram"),
+                                      comment("no date", "")])
+        report = Compactor(self.storage, retention_days={"vk": 30}, grace_seconds=0).run(now=NOW)
+        self.assertEqual((report["dropped"], report["expired"]), (1, 1))
+        self.assertGreater(report["reclaimed_bytes"], 0)
+        self.assertGreater(report["deleted_bytes"], 0)
+        self.assertEqual(self.contents(), ["new vk", "no date", "old tg"])
+        self.assertFalse(os.path.exists(os.path.join(self.root, "source=vk", "date=2023-12-01")))
+        # A late comment for the dropped date starts a new partition
+        self.storage.create_comments([comment("late", "2023-12-01 13:00:00")] * 3)
+        self.assertIn("late", self.contents())
+
+    def test_replaced_files_wait_for_readers(self):
+        self.storage.create_comments([comment(f"c{i}") for i in range(3)])
+        self.storage.create_comments([comment(f"d{i}") for i in range(3)])
+        reader = self.storage.iter_comments()
+        first = next(reader)
+        report = Compactor(self.storage).run(now=NOW)
+        self.assertEqual((report["rewritten"], report["deleted_bytes"]), (1, 0))
+        self.assertEqual(len([first] + list(reader)), 6)
+        self.assertGreater(self.storage.remove_obsolete(), 0)
+        self.assertEqual(len(self.contents()), 6)
+
+    def test_other_instances_follow_rewrites(self):
+        other = CommentsStorage(db_path=self.root, block_size=10, checkpoint_size=3, fsync=False)
+        self.storage.create_comments([comment(f"c{i}") for i in range(3)])
+        self.storage.create_comments([comment(f"d{i}") for i in range(3)])
+        self.assertEqual(len(list(other.iter_comments())), 6)
+        Compactor(self.storage, grace_seconds=0).run(now=NOW)
+        other.create_comments([comment(f"e{i}") for i in range(3)])
+        self.assertEqual(len(self.contents()), 9)
+        self.assertEqual(len(list(other.iter_comments())), 9)
+
+    def test_writers_during_compaction(self):
+        for batch in range(10):
+            self.storage.create_comments([comment(f"c{batch}-{i}") for i in range(3)])
+        writer = threading.Thread(target=lambda: [self.storage.create_comments(
+            [comment(f"w{batch}-{i}") for i in range(3)]) for batch in range(10)])
+        writer.start()
+        Compactor(self.storage, grace_seconds=0).run(now=NOW)
+        writer.join()
+        self.assertEqual(len(self.contents()), 60)
+
+    def test_text_index_forgets_removed_comments(self):
+        index = TextIndex(os.path.join(self.tmp.name, "index.sqlite"))
+        self.storage.add_listener(index)
+        self.assertEqual(index.build(self.storage), 0)
+        self.storage.create_comments([comment("spam old", "2023-12-01 12:00:00"), comment("spam same")])
+        self.storage.create_comments([comment("spam same"), comment("spam new")])
+        # Kept up to date by the listener alone
+        self.assertEqual(index.build(self.storage), 0)
+        self.assertEqual(len(index.search("spam")), 4)
+        Compactor(self.storage, retention_days={"vk": 30}, grace_seconds=0).run(now=NOW)
+        self.assertEqual(index.build(self.storage), 2)
+        self.assertEqual(len(index), 2)
+        self.assertEqual(sorted(index.search("spam")), sorted(c["id"] for c in self.storage.iter_comments()))
+        self.assertEqual(index.build(self.storage), 0)
+        index.close()
+
+    @unittest.skipUnless(columnar._HAS_NUMPY, "numpy is not installed")
+    def test_columnar_store_forgets_removed_comments(self):
+        store = columnar.ColumnarStore(os.path.join(self.tmp.name, "columnar"))
+        self.storage.create_comments([comment("old", "2023-12-01 12:00:00"), comment("same")])
+        self.storage.create_comments([comment("same"), comment("new")])
+        self.assertEqual(store.build(self.storage), 4)
+        Compactor(self.storage, retention_days={"vk": 30}, grace_seconds=0).run(now=NOW)
+        self.assertEqual(store.build(self.storage), 2)
+        self.assertEqual(sorted(store.column("id").astype(str)),
+                         sorted(c["id"] for c in self.storage.iter_comments()))
+
+
+if __name__ == '__main__':
+    unittest.main()
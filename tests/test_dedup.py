@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+from comment_parser.storage import dedup
+from comment_parser.storage.comments_storage import CommentsStorage
+from comment_parser.storage.dedup import NearDuplicateDetector
+from comment_parser.storage.models import CreateComment
+
+SPAM = "Получи бесплатно 1000 рублей на карту, переходи по ссылке в профиле"
+
+def record(content):
+    return {"url": "u", "content": content, "likes": 0, "date": "", "source": "vk", "author": "a"}
+
+class TestNearDuplicateDetector(unittest.TestCase):
+    def test_tags_near_duplicates(self):
+        detector = NearDuplicateDetector()
+        result = detector.process([
+            record(SPAM),
+            record(SPAM.upper() + "!!!"),
+            record(SPAM.replace("1000", "1001")),
+            record("Совершенно другой комментарий про видео и музыку"),
+        ])
+        self.assertEqual(len(result), 4)
+        self.assertNotIn("duplicate_of", result[0])
+        self.assertEqual(result[1]["duplicate_of"], result[2]["duplicate_of"])
+        self.assertNotIn("duplicate_of", result[3])
+        stats = detector.stats()
+        self.assertEqual(stats["duplicates"], 2)
+        self.assertEqual(stats["top_clusters"][0]["size"], 3)
+
+    def test_drop_and_short_texts(self):
+        detector = NearDuplicateDetector(action="drop")
+        result = detector.process([record(SPAM), record(SPAM), record("first!"), record("first!")])
+        self.assertEqual([r["content"] for r in result], [SPAM, "first!", "first!"])
+
+    def test_memory_is_bounded(self):
+        detector = NearDuplicateDetector(max_signatures=10)
+        detector.process([record(f"уникальный комментарий номер {i} " * 3) for i in range(50)])
+        self.assertEqual(detector.stats()["tracked_signatures"], 10)
+        self.assertLessEqual(sum(len(bucket) for bands in detector._buckets for bucket in bands.values()), 10 * 16)
+
+    def test_python_and_numpy_signatures_match(self):
+        detector = NearDuplicateDetector()
+        if not dedup._HAS_NUMPY:
+            self.skipTest("numpy is not installed")
+        vectorized = detector.signature(SPAM)
+        dedup._HAS_NUMPY = False
+        try:
+            self.assertEqual(detector.signature(SPAM), vectorized)
+        finally:
+            dedup._HAS_NUMPY = True
+
+    def test_storage_processor(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = CommentsStorage(db_path=os.path.join(tmp, "data"),
+                                      processors=[NearDuplicateDetector(action="drop")])
+            comments = [CreateComment(url="u", content=SPAM, likes=0, date="", source="vk", author=str(i))
+                        for i in range(3)]
+            self.assertEqual(storage.create_comments(comments), 1)
+            self.assertFalse(storage.create_comment(comments[0]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+from comment_parser.storage import export
+from comment_parser.storage.export import export_comments, export_csv, export_jsonl, export_parquet
+
+COMMENTS = [
+    {"id": "1", "url": "u", "content": "привет, \"мир\"", "likes": 3, "date": "2024-01-01", "source": "vk", "author": "a"},
+    {"id": "2", "url": "u", "content": "line\nbreak", "likes": 0, "date": "", "source": "youtube", "author": "b"},
+]
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_jsonl(self):
+        self.assertEqual(export_jsonl(iter(COMMENTS), self.path("out.jsonl")), 2)
+        with open(self.path("out.jsonl"), encoding='utf-8') as f:
+            self.assertEqual([json.loads(line) for line in f], COMMENTS)
+
+    def test_csv(self):
+        self.assertEqual(export_csv(iter(COMMENTS), self.path("out.csv"), fields=["id", "content"]), 2)
+        with open(self.path("out.csv"), encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([row["content"] for row in rows], [c["content"] for c in COMMENTS])
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            export_comments(COMMENTS, self.path("out.xml"))
+
+    @unittest.skipUnless(export._HAS_PYARROW, "pyarrow is not installed")
+    def test_parquet(self):
+        import pyarrow.parquet as pq
+        self.assertEqual(export_parquet(iter(COMMENTS), self.path("out.parquet"), row_group_size=1), 2)
+        table = pq.read_table(self.path("out.parquet"))
+        self.assertEqual(table.column("likes").to_pylist(), [3, 0])
+        self.assertEqual(pq.ParquetFile(self.path("out.parquet")).num_row_groups, 2)
+
+if __name__ == '__main__':
+    unittest.main()
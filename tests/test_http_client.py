@@ -0,0 +1,154 @@
+import os
+import tempfile
+import unittest
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+import requests
+from comment_parser.network.http_client import (
+    CircuitBreaker, CircuitOpenError, HttpClient, HTTPClientError, RetryPolicy, parse_retry_after
+)
+from comment_parser.storage.comments_storage import CommentsStorage
+from comment_parser.vk.api_vk import ApiVKParser, classify_vk_error
+from comment_parser.youtube.api_youtube import classify_youtube_error
+
+def response(body=None, status=200, headers=None):
+    mock = MagicMock(status_code=status, headers=headers or {})
+    if body is None:
+        mock.json.side_effect = ValueError("no json")
+    else:
+        mock.json.return_value = body
+    return mock
+
+class TestHttpClient(unittest.TestCase):
+    def setUp(self):
+        self.sleeps = []
+        self.session = MagicMock()
+        self.client = HttpClient(retry=RetryPolicy(max_attempts=4, jitter=False), session=self.session,
+                                 sleep=self.sleeps.append)
+
+    def test_retries_network_errors_with_backoff(self):
+        self.session.get.side_effect = [requests.ConnectionError("reset"), requests.Timeout("slow"), response({"ok": 1})]
+        self.assertEqual(self.client.get_json("https://api.vk.com/method/x"), {"ok": 1})
+        self.assertEqual(self.sleeps, [0.5, 1.0])
+        self.assertEqual(self.session.get.call_args.kwargs["timeout"], (5.0, 30.0))
+
+    def test_honours_retry_after(self):
+        self.session.get.side_effect = [response(None, 429, {"Retry-After": "7"}), response({"ok": 1})]
+        self.assertEqual(self.client.get_json("https://h/x"), {"ok": 1})
+        self.assertEqual(self.sleeps, [7.0])
+
+    def test_vk_rate_limit_is_retried(self):
+        too_many = {"error": {"error_code": 6, "error_msg": "Too many requests per second"}}
+        self.session.get.side_effect = [response(too_many), response({"response": {"items": []}})]
+        self.assertEqual(self.client.get_json("https://h/x", classify=classify_vk_error), {"response": {"items": []}})
+        self.assertEqual(len(self.sleeps), 1)
+
+    def test_fatal_api_error_is_returned(self):
+        denied = {"error": {"error_code": 5, "error_msg": "User authorization failed"}}
+        self.session.get.return_value = response(denied, 401)
+        self.assertEqual(self.client.get_json("https://h/x", classify=classify_vk_error), denied)
+        self.assertEqual(self.session.get.call_count, 1)
+
+    def test_youtube_rate_limit_on_403(self):
+        limited = {"error": {"code": 403, "errors": [{"reason": "rateLimitExceeded"}], "message": "Rate limit"}}
+        quota = {"error": {"code": 403, "errors": [{"reason": "quotaExceeded"}], "message": "Quota"}}
+        self.session.get.side_effect = [response(limited, 403), response(quota, 403)]
+        self.assertEqual(self.client.get_json("https://h/x", classify=classify_youtube_error), quota)
+        self.assertEqual(len(self.sleeps), 1)
+
+    def test_gives_up_after_max_attempts(self):
+        self.session.get.return_value = response(None, 503)
+        with self.assertRaises(HTTPClientError):
+            self.client.get_json("https://h/x")
+        self.assertEqual(self.session.get.call_count, 4)
+        self.assertEqual(len(self.sleeps), 3)
+
+    def test_circuit_breaker_opens_per_host(self):
+        client = HttpClient(retry=RetryPolicy(max_attempts=1), failure_threshold=2, session=self.session,
+                            sleep=self.sleeps.append)
+        self.session.get.side_effect = requests.ConnectionError("down")
+        for _ in range(2):
+            with self.assertRaises(HTTPClientError):
+                client.get_json("https://down/x")
+        with self.assertRaises(CircuitOpenError):
+            client.get_json("https://down/x")
+        self.assertEqual(self.session.get.call_count, 2)
+        self.session.get.side_effect = None
+        self.session.get.return_value = response({"ok": 1})
+        self.assertEqual(client.get_json("https://up/x"), {"ok": 1})
+
+    def test_breaker_half_open_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "half_open")
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+
+    def test_rate_limited_probe_closes_breaker(self):
+        client = HttpClient(retry=RetryPolicy(max_attempts=1), failure_threshold=1, reset_timeout=0,
+                            session=self.session, sleep=self.sleeps.append)
+        self.session.get.side_effect = [requests.ConnectionError("down"), response(None, 429), response({"ok": 1})]
+        with self.assertRaises(HTTPClientError):
+            client.get_json("https://h/x")
+        self.assertEqual(client.breaker("h").state, "half_open")
+        with self.assertRaises(HTTPClientError):
+            client.get_json("https://h/x")
+        self.assertEqual(client.get_json("https://h/x"), {"ok": 1})
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("12"), 12.0)
+        self.assertIsNone(parse_retry_after("soon"))
+        later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+        self.assertAlmostEqual(parse_retry_after(later), 60, delta=2)
+
+class TestVKRetries(unittest.TestCase):
+    def setUp(self):
+        self.session = MagicMock()
+
+    def test_keeps_progress_when_rate_limit_persists(self):
+        page = {"response": {"items": [{"from_id": i, "text": f"c{i}", "date": 0} for i in range(100)]}}
+        too_many = {"error": {"error_code": 6, "error_msg": "Too many requests per second"}}
+        self.session.get.side_effect = [response(page)] + [response(too_many)] * 3
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = CommentsStorage(db_path=os.path.join(tmp, "data"))
+            client = HttpClient(retry=RetryPolicy(max_attempts=3), session=self.session, sleep=lambda _: None)
+            parser = ApiVKParser(storage=storage, http_client=client)
+            self.assertEqual(parser.save_json("-1", "2", "token", ""), 100)
+        self.assertEqual(self.session.get.call_count, 4)
+
+class TestConnectionPooling(unittest.TestCase):
+    def test_keep_alive_and_gzip(self):
+        from benchmarks.servers import ReplayServer
+        client = HttpClient()
+        with ReplayServer(total=500) as server:
+            pages = [client.get_json(server.vk_url, params={"offset": offset, "count": 100})
+                     for offset in range(0, 500, 100)]
+            client.close()
+        self.assertEqual([len(page["response"]["items"]) for page in pages], [100] * 5)
+        self.assertEqual(server.requests, 5)
+        self.assertEqual(server.connections, 1)
+
+    def test_sessions_per_thread_share_pool(self):
+        import threading
+        client = HttpClient(pool_size=4)
+        sessions = [client.session]
+        thread = threading.Thread(target=lambda: sessions.append(client.session))
+        thread.start()
+        thread.join()
+        self.assertIsNot(sessions[0], sessions[1])
+        self.assertIs(sessions[0].get_adapter("https://api.vk.com"), sessions[1].get_adapter("https://api.vk.com"))
+        self.assertIs(client.session, sessions[0])
+
+    def test_http2_client(self):
+        from benchmarks.servers import ReplayServer
+        client = HttpClient(http2=True)
+        with ReplayServer(total=10) as server:
+            page = client.get_json(server.youtube_url, params={"maxResults": 10})
+            client.close()
+        self.assertEqual(len(page["items"]), 10)
+
+if __name__ == '__main__':
+    unittest.main()
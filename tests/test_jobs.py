@@ -0,0 +1,128 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from comment_parser.crawler import jobs
+from comment_parser.crawler.jobs import iter_job_manifest, merge_segments, run_manifest
+from comment_parser.network.http_client import HttpClient
+from comment_parser.storage.comments_storage import CommentsStorage
+from comment_parser.storage.models import CreateComment
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, body):
+        self.body = body
+
+    def json(self):
+        return self.body
+
+class FakeVKSession:
+    """Picklable stand-in for requests.Session, handed to worker processes through http_options."""
+
+    def get(self, url, params=None, **kwargs):
+        if params['post_id'] == 'crash':
+            os._exit(1)
+        items = [{'from_id': os.getpid(), 'text': f"{params['post_id']}-{i}", 'date': 0, 'likes': {'count': 1}}
+                 for i in range(2)] if params['offset'] == 0 else []
+        return FakeResponse({'response': {'items': items}})
+
+class TestJobManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = CommentsStorage(db_path=os.path.join(self.tmp.name, "data"), fsync=False)
+        self.manifest = os.path.join(self.tmp.name, "jobs.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_manifest(self, lines):
+        with open(self.manifest, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines))
+
+    def test_iter_job_manifest(self):
+        self.write_manifest([
+            '{"platform": "vk", "owner_id": "-1", "post_id": "2"}',
+            '',
+            '# comment',
+            '{broken',
+        ])
+        entries = list(iter_job_manifest(self.manifest))
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(entries[0][0], 1)
+        self.assertEqual(entries[0][1]["platform"], "vk")
+        self.assertEqual(entries[1][0], 4)
+        self.assertIsNotNone(entries[1][2])
+
+    def test_run_in_process(self):
+        def fake_get(url, params=None, **kwargs):
+            response = MagicMock(status_code=200)
+            items = [{'from_id': 1, 'text': 'hi', 'date': 0, 'likes': {'count': 1}}] if params['offset'] == 0 else []
+            response.json.return_value = {'response': {'items': items}}
+            return response
+        session = MagicMock()
+        session.get.side_effect = fake_get
+        self.write_manifest([json.dumps({"platform": "vk", "owner_id": "-1", "post_id": str(i)}) for i in range(3)]
+                            + ['not json'])
+        report = run_manifest(self.manifest, {"vk_token": "t"}, storage=self.storage, chunk_size=2,
+                              http_client=HttpClient(session=session))
+        self.assertEqual(report["total_jobs"], 4)
+        self.assertEqual(report["failed_jobs"], 1)
+        self.assertEqual(report["total_saved"], 3)
+        self.assertEqual([r["line"] for r in report["jobs"]], [1, 2, 3, 4])
+
+    def test_run_with_worker_pool(self):
+        self.write_manifest([json.dumps({"platform": "vk", "owner_id": "-1"}) for _ in range(5)])
+        report = run_manifest(self.manifest, {}, storage=self.storage, workers=2, chunk_size=1)
+        self.assertEqual(report["total_jobs"], 5)
+        self.assertEqual(report["failed_jobs"], 5)
+        self.assertFalse(os.path.exists(f"{self.storage.db_path}.segments"))
+
+    def test_workers_write_segments_that_are_merged(self):
+        self.write_manifest([json.dumps({"platform": "vk", "owner_id": "-1", "post_id": str(i)}) for i in range(6)])
+        report = run_manifest(self.manifest, {"vk_token": "t"}, storage=self.storage, workers=2, chunk_size=1,
+                              http_options={"session": FakeVKSession()})
+        self.assertEqual((report["failed_jobs"], report["total_saved"]), (0, 12))
+        self.assertGreater(len({result["worker"] for result in report["jobs"]}), 1)
+        comments = list(self.storage.iter_comments())
+        self.assertEqual(sorted(c["content"] for c in comments), sorted(f"{p}-{i}" for p in range(6) for i in range(2)))
+        self.assertEqual(len({c["id"] for c in comments}), 12)
+        self.assertEqual(self.storage.get_comment(comments[0]["id"]).content, comments[0]["content"])
+        self.assertFalse(os.path.exists(f"{self.storage.db_path}.segments"))
+
+    def test_finished_work_is_merged_when_a_worker_dies(self):
+        post_ids = ["0", "1", "crash"]
+        self.write_manifest([json.dumps({"platform": "vk", "owner_id": "-1", "post_id": p}) for p in post_ids])
+        report = run_manifest(self.manifest, {"vk_token": "t"}, storage=self.storage, workers=2, chunk_size=1,
+                              http_options={"session": FakeVKSession()})
+        self.assertEqual(report["total_jobs"], 3)
+        crashed = report["jobs"][2]
+        self.assertEqual((crashed["platform"], crashed["saved"]), ("vk", 0))
+        self.assertTrue(crashed["error"].startswith("Worker failed"))
+        # Everything reported as saved is in the main storage; a job that finished just before
+        # the crash may have lost its result, but not its comments
+        self.assertGreaterEqual(len(list(self.storage.iter_comments())), max(report["total_saved"], 2))
+
+    def test_worker_translation_cache_is_in_main_root(self):
+        segment_dir = os.path.join(self.tmp.name, "segments")
+        jobs._init_worker({}, segment_dir, self.storage.db_path, "ru", None, 1)
+        try:
+            service = jobs._worker_orchestrator.storage.processors[-1]
+            self.assertEqual(service.cache.path, os.path.join(self.storage.db_path, "translation_cache.json"))
+        finally:
+            jobs._worker_orchestrator = None
+
+    def test_merge_segments(self):
+        segment_dir = os.path.join(self.tmp.name, "segments")
+        os.makedirs(segment_dir)
+        for i in range(2):
+            segment = CommentsStorage(db_path=os.path.join(segment_dir, f"segment-{i}"), fsync=False)
+            segment.create_comment(CreateComment(url="u", content=f"c{i}", likes=0, date="", source="vk", author="a"))
+        self.assertEqual(merge_segments(self.storage, segment_dir), 2)
+        self.assertEqual(sorted(c.content for c in self.storage.get_all_comments()), ["c0", "c1"])
+        self.assertFalse(os.path.exists(segment_dir))
+
+if __name__ == '__main__':
+    unittest.main()
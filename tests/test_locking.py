@@ -0,0 +1,75 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from comment_parser.storage.comments_storage import CommentsStorage
+from comment_parser.storage.locking import FileLock
+
+
+def write_batches(db_path, writer, batches, batch_size):
+    storage = CommentsStorage(db_path=db_path, block_size=7, checkpoint_size=7, fsync=False)
+    for batch in range(batches):
+        storage.create_comments([{"url": "u", "content": f"{writer}-{batch}-{i}", "likes": 0, "date": "",
+                                  "source": "vk", "author": str(writer)} for i in range(batch_size)])
+
+
+class TestFileLock(unittest.TestCase):
+    def test_exclusive_lock_blocks_other_holders(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "db.lock")
+            first, second = FileLock(path), FileLock(path)
+            first.acquire()
+            acquired = threading.Event()
+
+            def wait_for_lock():
+                second.acquire()
+                acquired.set()
+                second.release()
+
+            thread = threading.Thread(target=wait_for_lock)
+            thread.start()
+            time.sleep(0.1)
+            self.assertFalse(acquired.is_set())
+            first.release()
+            thread.join(5)
+            self.assertTrue(acquired.is_set())
+            first.close()
+            second.close()
+
+
+class TestConcurrentWriters(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "db.seg")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_processes_do_not_lose_comments(self):
+        context = multiprocessing.get_context("spawn")
+        writers = [context.Process(target=write_batches, args=(self.db_path, writer, 20, 3)) for writer in range(4)]
+        for process in writers:
+            process.start()
+        for process in writers:
+            process.join(60)
+            self.assertEqual(process.exitcode, 0)
+        contents = [c["content"] for c in CommentsStorage(db_path=self.db_path).iter_comments()]
+        self.assertEqual(len(contents), 4 * 20 * 3)
+        self.assertEqual(len(set(contents)), len(contents))
+
+    def test_instances_see_each_others_writes(self):
+        first = CommentsStorage(db_path=self.db_path, block_size=4, checkpoint_size=4, fsync=False)
+        second = CommentsStorage(db_path=self.db_path, block_size=4, checkpoint_size=4, fsync=False)
+        write_batches(self.db_path, 0, 1, 3)
+        first.create_comments([{"url": "u", "content": "first", "likes": 0, "date": "", "source": "vk", "author": "a"}])
+        second.create_comments([{"url": "u", "content": "second", "likes": 0, "date": "", "source": "vk", "author": "a"}])
+        expected = ["0-0-0", "0-0-1", "0-0-2", "first", "second"]
+        self.assertEqual([c["content"] for c in first.iter_comments()], expected)
+        self.assertEqual([c["content"] for c in second.iter_comments()], expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import json
+import os
+import tempfile
+import unittest
+from comment_parser.monitoring.metrics import MetricsRegistry, METRICS, COMMENTS_STORED, STORAGE_WRITE_SECONDS
+from comment_parser.storage.comments_storage import CommentsStorage
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_disabled_is_noop(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("c_total")
+        histogram = registry.histogram("h_seconds")
+        counter.inc(5, source="vk")
+        histogram.observe(0.2)
+        with histogram.time():
+            pass
+        self.assertEqual(counter.value(source="vk"), 0)
+        self.assertEqual(histogram.count(), 0)
+
+    def test_counter_and_histogram(self):
+        registry = MetricsRegistry(enabled=True)
+        counter = registry.counter("c_total")
+        counter.inc(source="vk")
+        counter.inc(2, source="vk")
+        counter.inc(source="youtube")
+        self.assertEqual(counter.value(source="vk"), 3)
+        self.assertEqual(counter.total(), 4)
+
+        histogram = registry.histogram("h_seconds", buckets=(0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5)
+        self.assertEqual(histogram.count(), 3)
+        self.assertAlmostEqual(histogram.sum(), 5.55)
+        self.assertEqual(registry.counter("c_total"), counter)
+        with self.assertRaises(ValueError):
+            registry.histogram("c_total")
+
+    def test_quantile(self):
+        registry = MetricsRegistry(enabled=True)
+        histogram = registry.histogram("h_seconds", buckets=(0.1, 0.2, 1.0))
+        self.assertEqual(histogram.quantile(0.5), 0.0)
+        for value in (0.05, 0.15, 0.15, 0.5):
+            histogram.observe(value)
+        self.assertAlmostEqual(histogram.quantile(0.25), 0.1)
+        self.assertAlmostEqual(histogram.quantile(0.5), 0.15)
+        self.assertAlmostEqual(histogram.quantile(1.0), 1.0)
+        histogram.observe(5)
+        self.assertEqual(histogram.quantile(1.0), 1.0)
+
+    def test_prometheus_format(self):
+        registry = MetricsRegistry(enabled=True)
+        registry.counter("c_total", "Things").inc(platform='v"k')
+        registry.histogram("h_seconds", buckets=(0.1, 1.0)).observe(0.5)
+        text = registry.to_prometheus()
+        self.assertIn("# HELP c_total Things", text)
+        self.assertIn("# TYPE c_total counter", text)
+        self.assertIn('c_total{platform="v\\"k"} 1', text)
+        self.assertIn('h_seconds_bucket{le="0.1"} 0', text)
+        self.assertIn('h_seconds_bucket{le="1.0"} 1', text)
+        self.assertIn('h_seconds_bucket{le="+Inf"} 1', text)
+        self.assertIn("h_seconds_count 1", text)
+
+    def test_write_json(self):
+        registry = MetricsRegistry(enabled=True)
+        registry.counter("comments_stored_total").inc(10, source="vk")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "metrics.json")
+            registry.write(path)
+            with open(path, encoding='utf-8') as f:
+                snapshot = json.load(f)
+        self.assertEqual(snapshot["counters"]["comments_stored_total"], [{"labels": {"source": "vk"}, "value": 10}])
+        self.assertGreater(snapshot["comments_per_sec"], 0)
+
+class TestStorageMetrics(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        METRICS.enable()
+        METRICS.reset()
+
+    def tearDown(self):
+        METRICS.disable()
+        METRICS.reset()
+        self.tmp.cleanup()
+
+    def test_storage_write_is_measured(self):
+        storage = CommentsStorage(db_path=os.path.join(self.tmp.name, "db.json"))
+        storage.create_comments([
+            {"url": "u", "content": "a", "likes": 1, "date": "", "source": "vk"},
+            {"url": "u", "content": "b", "likes": 2, "date": "", "source": "vk"},
+        ])
+        self.assertEqual(COMMENTS_STORED.value(source="vk"), 2)
+        self.assertEqual(STORAGE_WRITE_SECONDS.count(op="create"), 1)
+        self.assertGreater(METRICS.counter("storage_bytes_written_total").total(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
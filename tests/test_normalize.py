@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from comment_parser.storage.comments_storage import CommentsStorage
+from comment_parser.storage.models import CommentRecord
+from comment_parser.storage.normalize import normalize_record, parse_date, parse_dates, parse_likes
+
+NOW = 1_700_000_000
+DAY = 86400
+
+class TestNormalize(unittest.TestCase):
+    def test_absolute_dates(self):
+        self.assertEqual(parse_date("2024-01-01T00:00:00Z"), 1704067200)
+        self.assertEqual(parse_date("2024-01-01T03:00:00.250z"), 1704078000)
+        self.assertEqual(parse_date("2024-01-01 03:00:00+03:00"), 1704067200)
+        self.assertEqual(parse_date("2024-01-01 00:00:00"), 1704067200)
+        self.assertEqual(parse_date(datetime(2024, 1, 1, tzinfo=timezone.utc)), 1704067200)
+        self.assertEqual(parse_date(1704067200), 1704067200)
+        self.assertIsNone(parse_date("not a date"))
+        self.assertIsNone(parse_date(""))
+
+    def test_relative_dates(self):
+        cases = {
+            "3 weeks ago": 21 * DAY,
+            "an hour ago (edited)": 3600,
+            "Streamed 2 days ago": 2 * DAY,
+            "2 дня назад": 2 * DAY,
+            "год назад": 365 * DAY,
+            "неделю назад": 7 * DAY,
+            "4 ч. назад": 4 * 3600,
+            "2 мес. назад": 60 * DAY,
+            "15 мин. назад": 15 * 60,
+            "3 нед. назад": 21 * DAY,
+            "1 г. назад": 365 * DAY,
+            "5 хв. тому": 5 * 60,
+            "3 години тому": 3 * 3600,
+            "vor 3 Wochen": 21 * DAY,
+            "hace 1 año": 365 * DAY,
+            "il y a 2 mois": 60 * DAY,
+        }
+        for text, offset in cases.items():
+            self.assertEqual(parse_date(text, now=NOW), NOW - offset, text)
+
+    def test_parse_dates_batch(self):
+        self.assertEqual(parse_dates(["1 day ago", "1 day ago", None], now=NOW), [NOW - DAY, NOW - DAY, None])
+
+    def test_likes(self):
+        cases = {"12": 12, "1.2K": 1200, "1,2 тыс.": 1200, "3M": 3_000_000, "2,5 млн": 2_500_000,
+                 "1 234": 1234, "1,234": 1234, "": 0, "n/a": 0}
+        for text, likes in cases.items():
+            self.assertEqual(parse_likes(text), likes, text)
+        self.assertEqual(parse_likes(7), 7)
+
+    def test_normalize_record(self):
+        record = normalize_record({"date": "5 minutes ago", "likes": "1.5K"}, now=NOW)
+        self.assertEqual(record, {"date": "5 minutes ago", "likes": 1500, "timestamp": NOW - 300})
+
+    def test_storage_normalizes_on_write(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = CommentsStorage(db_path=os.path.join(tmp, "data"))
+            storage.create_comments([
+                CommentRecord(url="u", content="a", likes=1, date="2024-01-01T00:00:00Z", source="youtube", author="x"),
+                CommentRecord(url="u", content="b", likes=1, date="01.01.2024", source="vk", author="x", timestamp=1704067200),
+            ])
+            self.assertEqual([c.timestamp for c in storage.get_all_comments()], [1704067200, 1704067200])
+            self.assertEqual(len(list(storage.iter_comments(date_from=1704067200, date_to=1704067201))), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from comment_parser.crawler.orchestrator import CrawlOrchestrator, extract_video_id
+from comment_parser.network.http_client import HttpClient
+from comment_parser.storage.comments_storage import CommentsStorage
+
+def vk_page(count):
+    return {'response': {'items': [
+        {'id': i, 'from_id': i, 'text': f'comment {i}', 'date': 1640995200, 'likes': {'count': i}}
+        for i in range(count)
+    ]}}
+
+class TestCrawlOrchestrator(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = CommentsStorage(db_path=os.path.join(self.tmp.name, "data"), fsync=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_extract_video_id(self):
+        self.assertEqual(extract_video_id("https://www.youtube.com/watch?v=dQw4w9WgXcQ"), "dQw4w9WgXcQ")
+        self.assertIsNone(extract_video_id("https://example.com"))
+
+    def test_invalid_jobs_are_reported(self):
+        orchestrator = CrawlOrchestrator(config={}, storage=self.storage)
+        report = orchestrator.run_sync([
+            {"platform": "vk", "owner_id": "-1"},
+            {"platform": "myspace"},
+            {"platform": "telegram", "channel": "@chan"},
+        ])
+        self.assertEqual(report["failed_jobs"], 3)
+        self.assertEqual(report["total_saved"], 0)
+
+    def test_runs_blocking_jobs_concurrently_with_limits(self):
+        active = {"now": 0, "peak": 0}
+        lock = threading.Lock()
+
+        def fake_get(url, params=None, **kwargs):
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            time.sleep(0.05)
+            with lock:
+                active["now"] -= 1
+            response = MagicMock(status_code=200)
+            response.json.return_value = vk_page(3) if params.get('offset', 0) == 0 else vk_page(0)
+            return response
+
+        session = MagicMock()
+        session.get.side_effect = fake_get
+        orchestrator = CrawlOrchestrator(config={"vk_token": "token"}, storage=self.storage,
+                                         max_concurrency=8, platform_limits={"vk": 2},
+                                         http_client=HttpClient(session=session))
+        jobs = [{"platform": "vk", "owner_id": "-1", "post_id": str(i)} for i in range(6)]
+        report = orchestrator.run_sync(jobs)
+
+        self.assertEqual(report["failed_jobs"], 0)
+        self.assertEqual(report["total_saved"], 18)
+        self.assertEqual(report["per_platform"]["vk"]["jobs"], 6)
+        self.assertEqual(len(self.storage.get_all_comments()), 18)
+        self.assertLessEqual(active["peak"], 2)
+        self.assertGreater(active["peak"], 1)
+
+    def test_parser_errors_fail_the_job(self):
+        def fake_get(url, params=None, **kwargs):
+            response = MagicMock(status_code=200)
+            if 'videoId' in params:
+                response.json.return_value = {'error': {'code': 400, 'message': 'API key not valid'}}
+            elif params['post_id'] == '1':
+                response.json.return_value = {'error': {'error_code': 5, 'error_msg': 'User authorization failed'}}
+            else:
+                response.json.return_value = vk_page(2) if params.get('offset', 0) == 0 else vk_page(0)
+            return response
+
+        session = MagicMock()
+        session.get.side_effect = fake_get
+        orchestrator = CrawlOrchestrator(config={"vk_token": "token", "youtube_api_key": "key"}, storage=self.storage,
+                                         http_client=HttpClient(session=session))
+        report = orchestrator.run_sync([
+            {"platform": "vk", "owner_id": "-1", "post_id": "1"},
+            {"platform": "vk", "owner_id": "-1", "post_id": "2"},
+            {"platform": "youtube", "video_url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ"},
+        ])
+        self.assertEqual(report["failed_jobs"], 2)
+        self.assertEqual([result["error"] for result in report["jobs"]],
+                         ["User authorization failed", None, "API key not valid"])
+        self.assertEqual(report["total_saved"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
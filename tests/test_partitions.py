@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+import unittest
+
+from comment_parser.storage.comments_storage import CommentsStorage
+from comment_parser.storage.models import CreateComment
+from comment_parser.storage.partitions import parse_partition_key, partition_key, partition_may_match
+
+
+class TestPartitionKeys(unittest.TestCase):
+    def test_key_from_source_and_date(self):
+        self.assertEqual(partition_key("vk", 1704103200), "source=vk/date=2024-01-01")
+        self.assertEqual(partition_key("", None), "source=unknown/date=unknown")
+        self.assertEqual(parse_partition_key(partition_key("a/b", 0)), ("a/b", "1970-01-01"))
+
+    def test_pruning(self):
+        key = "source=vk/date=2024-01-01"
+        day = 1704067200
+        self.assertTrue(partition_may_match(key, source="vk", ts_from=day, ts_to=day + 1))
+        self.assertFalse(partition_may_match(key, source="youtube"))
+        self.assertFalse(partition_may_match(key, ts_from=day + 86400))
+        self.assertFalse(partition_may_match(key, ts_to=day))
+        self.assertFalse(partition_may_match("source=vk/date=unknown", ts_from=day))
+
+
+class TestPartitionedStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "data")
+        self.storage = CommentsStorage(db_path=self.root)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, source, date, count=1):
+        self.storage.create_comments([CreateComment(url="u", content=f"{source} {date}", likes=0, date=date,
+                                                    source=source, author="a") for _ in range(count)])
+
+    def test_layout_and_manifest(self):
+        self.write("vk", "2024-01-01 10:00:00", 2)
+        self.write("youtube", "2024-01-02T10:00:00Z")
+        self.write("vk", "")
+        self.storage.close()
+        self.assertTrue(os.path.exists(os.path.join(self.root, "source=vk", "date=2024-01-01", "comments.seg")))
+        with open(os.path.join(self.root, "manifest.json"), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        self.assertEqual({key: partition["count"] for key, partition in manifest["partitions"].items()}, {
+            "source=vk/date=2024-01-01": 2,
+            "source=vk/date=unknown": 1,
+            "source=youtube/date=2024-01-02": 1,
+        })
+
+    def test_queries_prune_partitions(self):
+        for day in range(1, 6):
+            self.write("vk", f"2024-01-0{day} 12:00:00")
+        self.write("youtube", "2024-01-03 12:00:00")
+        self.storage.close()
+        self.assertEqual(list(self.storage.partitions(source="vk", date_from="2024-01-02", date_to="2024-01-04")),
+                         ["source=vk/date=2024-01-02", "source=vk/date=2024-01-03"])
+        partitions, _ = self.storage._snapshot(source="youtube")
+        self.assertEqual(len(partitions), 1)
+        self.assertEqual([c["content"] for c in self.storage.iter_comments(date_from="2024-01-03", date_to="2024-01-04")],
+                         ["vk 2024-01-03 12:00:00", "youtube 2024-01-03 12:00:00"])
+
+    def test_writes_only_touch_hot_partitions(self):
+        self.write("vk", "2024-01-01 12:00:00")
+        self.storage.close()
+        cold = os.path.join(self.root, "source=vk", "date=2024-01-01", "comments.seg")
+        size, mtime = os.path.getsize(cold), os.stat(cold).st_mtime_ns
+        self.write("vk", "2024-01-02 12:00:00", 5)
+        self.storage.close()
+        self.assertEqual((os.path.getsize(cold), os.stat(cold).st_mtime_ns), (size, mtime))
+        self.assertEqual(len(list(self.storage.iter_comments())), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
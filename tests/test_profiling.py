@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from comment_parser.monitoring.profiling import PHASES, Profiler, StackSampler, phase
+from comment_parser.storage.comments_storage import CommentsStorage
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+class TestPhases(unittest.TestCase):
+    def test_phase_is_noop_without_profiler(self):
+        PHASES.reset()
+        with phase("fetch"):
+            pass
+        self.assertEqual(PHASES.summary(), {})
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_profile_run(self):
+        storage = CommentsStorage(db_path=os.path.join(self.tmp.name, "db.json"))
+        profiler = Profiler(interval=0.001)
+        profiler.start()
+        try:
+            with phase("fetch"):
+                busy_loop(0.05)
+            storage.create_comments([{"url": "u", "content": "a", "likes": 1, "date": "", "source": "vk"}])
+        finally:
+            profiler.stop()
+
+        summary = PHASES.summary()
+        self.assertEqual(list(summary)[:3], ["fetch", "validate", "store"])
+        self.assertGreaterEqual(summary["fetch"]["seconds"], 0.05)
+        self.assertFalse(PHASES.enabled)
+
+        paths = profiler.write(os.path.join(self.tmp.name, "out", "run"))
+        self.assertEqual([os.path.basename(p) for p in paths], ["run.collapsed", "run.phases.json", "run.pstats"])
+        with open(paths[0], encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines)
+        self.assertTrue(any("busy_loop" in line for line in lines))
+        stack, count = lines[0].rsplit(" ", 1)
+        self.assertTrue(stack.startswith("MainThread;"))
+        self.assertGreater(int(count), 0)
+        with open(paths[1], encoding='utf-8') as f:
+            self.assertIn("fetch", json.load(f)["phases"])
+
+    def test_pluggable_sampler(self):
+        class FixedSampler:
+            def start(self):
+                self.started = True
+            def stop(self):
+                pass
+            def collapsed(self):
+                return {"MainThread;main;fetch": 3}
+
+        profiler = Profiler(use_cprofile=False, sampler=FixedSampler())
+        profiler.start()
+        profiler.stop()
+        paths = profiler.write(os.path.join(self.tmp.name, "run"))
+        self.assertEqual(len(paths), 2)
+        with open(paths[0], encoding='utf-8') as f:
+            self.assertEqual(f.read(), "MainThread;main;fetch 3\n")
+
+class TestStackSampler(unittest.TestCase):
+    def test_sample_collapses_frames(self):
+        import sys
+        sampler = StackSampler()
+        sampler.sample("T", sys._getframe())
+        (stack, count), = sampler.collapsed().items()
+        self.assertTrue(stack.startswith("T;"))
+        self.assertIn("test_sample_collapses_frames (test_profiling.py:", stack.split(";")[-1])
+        self.assertEqual(count, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import gzip
+import os
+import pickle
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock
+from comment_parser.network.http_client import CacheMissError, HttpClient
+from comment_parser.network.response_cache import ResponseCache, cache_key
+
+URL = "https://api.vk.com/method/wall.getComments"
+
+def response(body, status=200):
+    mock = MagicMock(status_code=status, headers={})
+    mock.json.return_value = body
+    return mock
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_ignores_tokens_and_param_order(self):
+        first = cache_key(URL, {"owner_id": "-1", "offset": 0, "access_token": "a"})
+        second = cache_key(URL, {"offset": 0, "access_token": "b", "owner_id": "-1"})
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, cache_key(URL, {"owner_id": "-1", "offset": 100}))
+
+    def test_roundtrip_is_compressed_without_secrets(self):
+        cache = ResponseCache(self.path)
+        body = {"response": {"items": [{"text": "привет " * 200}]}}
+        cache.put(URL, {"offset": 0, "access_token": "secret"}, body)
+        self.assertEqual(cache.get(URL, {"offset": 0, "access_token": "other"}), body)
+        self.assertLess(cache.total_bytes, len("привет " * 200))
+        for root, _, files in os.walk(self.path):
+            for name in files:
+                with gzip.open(os.path.join(root, name), 'rt', encoding='utf-8') as f:
+                    self.assertNotIn("secret", f.read())
+        self.assertEqual(ResponseCache(self.path).get(URL, {"offset": 0}), body)
+
+    def test_ttl(self):
+        cache = ResponseCache(self.path, ttl=0.05)
+        cache.put(URL, {"offset": 0}, {"ok": 1})
+        time.sleep(0.1)
+        self.assertEqual(ResponseCache(self.path, replay_only=True, ttl=0.05).get(URL, {"offset": 0}), {"ok": 1})
+        self.assertIsNone(cache.get(URL, {"offset": 0}))
+        self.assertEqual(len(cache), 0)
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(self.path, max_bytes=10 ** 9, compresslevel=0)
+        for offset in range(3):
+            cache.put(URL, {"offset": offset}, {"items": "x" * 1000})
+            time.sleep(0.01)
+        cache.get(URL, {"offset": 0})
+        cache.max_bytes = cache.total_bytes - 100
+        cache.put(URL, {"offset": 0}, {"items": "x" * 1000})
+        self.assertIsNone(cache.get(URL, {"offset": 1}))
+        self.assertIsNotNone(cache.get(URL, {"offset": 2}))
+        self.assertEqual(cache.stats["evictions"], 1)
+
+    def test_picklable(self):
+        cache = pickle.loads(pickle.dumps(ResponseCache(self.path)))
+        cache.put(URL, None, {"ok": 1})
+        self.assertEqual(cache.get(URL), {"ok": 1})
+
+class TestClientCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.session = MagicMock()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_second_run_is_served_from_cache(self):
+        cache = ResponseCache(self.tmp.name)
+        client = HttpClient(session=self.session, cache=cache)
+        self.session.get.return_value = response({"response": {"items": [1]}})
+        self.assertEqual(client.get_json(URL, {"offset": 0, "access_token": "a"}), {"response": {"items": [1]}})
+        self.assertEqual(client.get_json(URL, {"offset": 0, "access_token": "b"}), {"response": {"items": [1]}})
+        self.assertEqual(self.session.get.call_count, 1)
+
+    def test_errors_are_not_cached(self):
+        client = HttpClient(session=self.session, cache=ResponseCache(self.tmp.name))
+        self.session.get.return_value = response({"error": {"error_code": 5}}, 401)
+        client.get_json(URL, {"offset": 0})
+        client.get_json(URL, {"offset": 0})
+        self.assertEqual(self.session.get.call_count, 2)
+
+    def test_replay_only(self):
+        ResponseCache(self.tmp.name).put(URL, {"offset": 0}, {"response": {"items": []}})
+        client = HttpClient(session=self.session, cache=ResponseCache(self.tmp.name, replay_only=True))
+        self.assertEqual(client.get_json(URL, {"offset": 0}), {"response": {"items": []}})
+        with self.assertRaises(CacheMissError):
+            client.get_json(URL, {"offset": 100})
+        self.session.get.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from comment_parser.storage.comments_storage import CommentsStorage
+from comment_parser.storage.segments import _HAS_ZSTD, Segment, bloom_build, bloom_contains, is_legacy_json
+
+
+def make_records(count, source="vk", start=0):
+    return [{"id": f"id-{i}", "url": "u", "content": f"comment {i}", "likes": i, "date": "",
+             "source": source, "author": "a", "timestamp": 1700000000 + i} for i in range(start, start + count)]
+
+
+class TestSegment(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "db.seg")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_append_and_read_back(self):
+        segment = Segment(self.path, block_size=10)
+        segment.append(make_records(25))
+        self.assertEqual(len(segment.blocks), 3)
+        self.assertEqual(segment.count, 25)
+        self.assertEqual([r["id"] for r in segment.iter_records()], [f"id-{i}" for i in range(25)])
+        self.assertEqual(segment.get("id-17")["content"], "comment 17")
+        self.assertIsNone(segment.get("missing"))
+        # Another instance sees the same blocks
+        self.assertEqual(Segment(self.path).count, 25)
+
+    def test_blocks_are_compressed(self):
+        segment = Segment(self.path)
+        records = make_records(1000)
+        segment.append(records)
+        self.assertLess(os.path.getsize(self.path) * 4, len(json.dumps(records, indent=2)))
+
+    def test_predicate_skips_blocks(self):
+        segment = Segment(self.path, block_size=10)
+        segment.append(make_records(10, "vk") + make_records(10, "youtube", start=10))
+        decoded = []
+        records = list(segment.iter_records(lambda block: decoded.append(block) or "youtube" in block["sources"]))
+        self.assertEqual(len(decoded), 2)
+        self.assertEqual({r["source"] for r in records}, {"youtube"})
+
+    def test_bloom_filter(self):
+        bloom = bloom_build([f"id-{i}" for i in range(100)])
+        self.assertTrue(all(bloom_contains(bloom, f"id-{i}") for i in range(100)))
+        false_positives = sum(bloom_contains(bloom, f"other-{i}") for i in range(1000))
+        self.assertLess(false_positives, 50)
+
+    def test_rebuild_index(self):
+        Segment(self.path, block_size=10).append(make_records(25))
+        os.remove(f"{self.path}.idx")
+        segment = Segment(self.path)
+        self.assertEqual(segment.count, 25)
+        self.assertEqual(segment.get("id-3")["likes"], 3)
+
+    def test_torn_index_line_is_ignored(self):
+        Segment(self.path, block_size=10).append(make_records(20))
+        with open(f"{self.path}.idx", 'ab') as f:
+            f.write(b'{"offset": 999')
+        self.assertEqual(Segment(self.path).count, 20)
+
+    @unittest.skipUnless(_HAS_ZSTD, "zstandard is not installed")
+    def test_zstd_and_gzip_blocks_mix(self):
+        Segment(self.path, codec="gzip").append(make_records(5))
+        Segment(self.path, codec="zstd").append(make_records(5, start=5))
+        self.assertEqual(len(list(Segment(self.path).iter_records())), 10)
+
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError):
+            Segment(self.path, codec="lz4")
+
+
+class TestLegacyMigration(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "comments_db.json")
+        legacy = {r.pop("id"): r for r in make_records(30)}
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(legacy, f, indent=2)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_import_legacy(self):
+        storage = CommentsStorage(db_path=os.path.join(self.tmp.name, "data"), block_size=8)
+        self.assertEqual(storage.import_legacy(self.path), 30)
+        self.assertTrue(is_legacy_json(self.path))
+        (partition,) = storage.partitions().values()
+        self.assertEqual(partition["count"], 30)
+        self.assertEqual(sum(len(blocks) for _, blocks in storage._snapshot()[0]), 4)
+
+    def test_import_is_done_once(self):
+        import fix_json
+        from comment_parser.storage import comments_storage
+        root = os.path.join(self.tmp.name, "data")
+        with mock.patch.object(comments_storage, "LEGACY_DB_PATHS", (self.path,)), \
+                mock.patch.dict(os.environ, {"COMMENTS_DATA_ROOT": root}):
+            # Opening the fresh default root imports the legacy DB already
+            fix_json.fix_json_encoding(self.path)
+        storage = CommentsStorage(db_path=root)
+        self.assertEqual(storage.import_legacy(self.path), 0)
+        self.assertEqual(len(list(storage.iter_comments())), 30)
+
+    def test_storage_migrates_on_open(self):
+        storage = CommentsStorage(db_path=self.path)
+        self.assertEqual(storage.get_comment("id-12").content, "comment 12")
+        self.assertEqual(len(list(storage.iter_comments(min_likes=20))), 10)
+
+    def test_merge_copies_blocks(self):
+        storage = CommentsStorage(db_path=os.path.join(self.tmp.name, "main"))
+        self.assertEqual(storage.merge_segment(self.path), 30)
+        self.assertEqual(storage.get_comment("id-29").likes, 29)
+        self.assertEqual(len(list(storage.iter_comments(source="vk"))), 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
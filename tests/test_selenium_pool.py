@@ -0,0 +1,117 @@
+import functools
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from comment_parser.storage.comments_storage import CommentsStorage
+from comment_parser.youtube.selenium_pool import SeleniumPool
+
+
+class FakeDriver:
+    def quit(self):
+        pass
+
+
+class FakeParser:
+    """
+    Stands in for SeleniumYouTubeParser in the worker processes. The video id picks
+    the behaviour; marker files in `state_dir` tell a retry from the first attempt.
+    """
+
+    def __init__(self, state_dir):
+        self.state_dir = state_dir
+
+    def _create_driver(self):
+        return FakeDriver()
+
+    def _first_attempt(self, video_id):
+        marker = os.path.join(self.state_dir, video_id)
+        if os.path.exists(marker):
+            return False
+        open(marker, 'w').close()
+        return True
+
+    def stream_comments(self, video_url, max_comments=None, scroll_pause=2.0, debug=False, driver=None):
+        assert isinstance(driver, FakeDriver)
+        video_id = video_url.rsplit("=", 1)[1]
+        time.sleep(0.1)
+        for i in range(3):
+            yield {"source": "youtube", "url": video_url, "id": f"{video_id}-{i}", "content": f"{video_id} comment {i}",
+                   "likes": i, "date": "", "timestamp": None, "author": "a"}
+            if i == 1 and video_id == "flaky" and self._first_attempt(video_id):
+                raise RuntimeError("page crashed")
+            if i == 1 and video_id == "crash" and self._first_attempt(video_id):
+                os._exit(3)
+            if i == 1 and video_id == "hang" and self._first_attempt(video_id):
+                time.sleep(60)
+        if video_id == "broken":
+            raise RuntimeError("always broken")
+        if video_id == "exit-when-idle":
+            # The worker dies shortly after reporting the video done
+            threading.Timer(0.3, os._exit, (4,)).start()
+        if video_id == "slow-flaky" and self._first_attempt(video_id):
+            with open(os.path.join(self.state_dir, "slow-flaky-pid"), 'w') as f:
+                f.write(str(os.getpid()))
+            time.sleep(1.5)
+            raise RuntimeError("page crashed")
+
+
+def url(video_id):
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+class TestSeleniumPool(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = CommentsStorage(db_path=os.path.join(self.tmp.name, "data"), fsync=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def pool(self, **kwargs):
+        return SeleniumPool(storage=self.storage, parser_factory=functools.partial(FakeParser, self.tmp.name),
+                            batch_size=2, **kwargs)
+
+    def test_videos_are_spread_across_workers(self):
+        videos = [url(f"v{i}") for i in range(8)]
+        report = self.pool(workers=3).run(videos + [videos[0]])
+        self.assertEqual((report["total_videos"], report["failed_videos"], report["total_saved"]), (8, 0, 24))
+        self.assertEqual([video["video_url"] for video in report["videos"]], videos)
+        self.assertGreater(len({video["worker"] for video in report["videos"]}), 1)
+        self.assertEqual(len(list(self.storage.iter_comments())), 24)
+
+    def test_failures_are_retried_without_duplicates(self):
+        report = self.pool(workers=2, max_retries=1).run([url("flaky"), url("crash"), url("broken"), url("ok")])
+        videos = {video["video_url"]: video for video in report["videos"]}
+        self.assertEqual([videos[url(v)]["attempts"] for v in ("flaky", "crash", "broken", "ok")], [2, 2, 2, 1])
+        self.assertEqual(videos[url("broken")]["error"], "RuntimeError: always broken")
+        self.assertIsNone(videos[url("crash")]["error"])
+        # Comments saved before a failure are not stored again by the retry
+        self.assertEqual([videos[url(v)]["saved"] for v in ("flaky", "crash", "ok")], [3, 3, 3])
+        contents = [c["content"] for c in self.storage.iter_comments()]
+        self.assertEqual(len(contents), len(set(contents)))
+        self.assertEqual(report["failed_videos"], 1)
+
+    def test_hung_video_is_requeued(self):
+        report = self.pool(workers=1, task_timeout=1).run([url("hang"), url("ok")])
+        videos = {video["video_url"]: video for video in report["videos"]}
+        self.assertEqual([videos[url(v)]["attempts"] for v in ("hang", "ok")], [2, 1])
+        self.assertEqual(report["failed_videos"], 0)
+        self.assertEqual(videos[url("hang")]["saved"], 3)
+        self.assertEqual(len(list(self.storage.iter_comments())), 6)
+
+    def test_worker_dying_while_idle_is_replaced(self):
+        report = self.pool(workers=2).run([url("exit-when-idle"), url("slow-flaky")])
+        self.assertEqual(report["failed_videos"], 0)
+        with open(os.path.join(self.tmp.name, "slow-flaky-pid")) as f:
+            first_worker = int(f.read())
+        # The retry goes to the replacement of the dead worker, not back to the one that failed
+        retry = {video["video_url"]: video for video in report["videos"]}[url("slow-flaky")]
+        self.assertEqual(retry["attempts"], 2)
+        self.assertNotEqual(retry["worker"], first_worker)
+
+
+if __name__ == '__main__':
+    unittest.main()
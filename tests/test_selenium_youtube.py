@@ -0,0 +1,121 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from selenium.common.exceptions import NoSuchElementException
+
+from comment_parser.youtube.selenium_youtube import (BLOCKED_URLS, LEAN_WINDOW_SIZE, PAUSE_VIDEO_JS,
+                                                     PRUNE_COMMENTS_JS, WINDOW_SIZE, SeleniumYouTubeParser)
+
+FIELDS = {
+    "yt-attributed-string#content-text": "content",
+    "yt-formatted-string#author-text": "author",
+    "a.yt-simple-endpoint.style-scope.yt-formatted-string": "date",
+    "span#vote-count-middle": "likes",
+}
+
+
+class FakeThread:
+    def __init__(self, index):
+        self.values = {"id": f"c{index}", "content": f"comment {index}", "author": f"@user{index}",
+                       "date": "2 days ago", "likes": str(index)}
+        self.lookups = 0
+
+    def get_attribute(self, name):
+        return self.values[name]
+
+    def find_element(self, by, selector):
+        self.lookups += 1
+        if selector not in FIELDS:
+            raise NoSuchElementException(selector)
+        return SimpleNamespace(text=self.values[FIELDS[selector]])
+
+
+class FakeDriver:
+    """A video page that loads `page_size` more comment threads on every scroll to the bottom."""
+
+    def __init__(self, total, page_size=5):
+        self.threads = [FakeThread(i) for i in range(total)]
+        self.page_size = page_size
+        self.loaded = 0
+        self.dom = []
+        self.max_dom = 0
+        self.scripts = []
+        self.cdp = []
+
+    def get(self, url):
+        pass
+
+    def find_element(self, by, selector):
+        if selector == "ytd-comments":
+            return object()
+        raise NoSuchElementException(selector)
+
+    def find_elements(self, by, selector):
+        return list(self.dom)
+
+    def execute_script(self, script, *args):
+        self.scripts.append(script)
+        if script == PRUNE_COMMENTS_JS:
+            for element in args[0]:
+                self.dom.remove(element)
+        elif "scrollTo" in script:
+            batch = self.threads[self.loaded:self.loaded + self.page_size]
+            self.loaded += len(batch)
+            self.dom.extend(batch)
+            self.max_dom = max(self.max_dom, len(self.dom))
+        elif "scrollHeight" in script:
+            spinner = 50 if self.loaded < len(self.threads) else 0
+            return 100 + 100 * len(self.dom) + spinner
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp.append((command, params))
+
+    def quit(self):
+        raise AssertionError("a driver passed in must be left open")
+
+
+class TestSeleniumYouTubeParser(unittest.TestCase):
+    def scrape(self, driver, **kwargs):
+        parser = SeleniumYouTubeParser(storage=object(), slow_mode=False, **kwargs)
+        with mock.patch("comment_parser.youtube.selenium_youtube.time.sleep"):
+            return list(parser.stream_comments("https://www.youtube.com/watch?v=x", driver=driver))
+
+    def test_threads_are_read_once(self):
+        driver = FakeDriver(23)
+        comments = self.scrape(driver)
+        self.assertEqual([c["id"] for c in comments], [f"c{i}" for i in range(23)])
+        self.assertEqual((comments[3]["author"], comments[3]["likes"]), ("@user3", 3))
+        # Threads already read are skipped by id in later scrolls
+        self.assertTrue(all(thread.lookups == 4 for thread in driver.threads))
+        self.assertEqual(len(driver.dom), 23)
+
+    def test_pruned_page_stays_small(self):
+        driver = FakeDriver(23)
+        comments = self.scrape(driver, prune_dom=True)
+        self.assertEqual([c["id"] for c in comments], [f"c{i}" for i in range(23)])
+        self.assertEqual((driver.max_dom, len(driver.dom)), (5, 0))
+
+    def test_lean_profile(self):
+        driver = FakeDriver(3)
+        self.scrape(driver)
+        self.assertEqual(driver.scripts.count(PAUSE_VIDEO_JS), 2)
+        SeleniumYouTubeParser(storage=object())._block_resources(driver)
+        self.assertEqual(driver.cdp, [("Network.enable", {}), ("Network.setBlockedURLs", {"urls": BLOCKED_URLS})])
+        driver = FakeDriver(3)
+        self.scrape(driver, lean=False)
+        self.assertNotIn(PAUSE_VIDEO_JS, driver.scripts)
+
+    def test_browser_options(self):
+        for lean, size in ((True, LEAN_WINDOW_SIZE), (False, WINDOW_SIZE)):
+            with mock.patch("comment_parser.youtube.selenium_youtube._load_uc", return_value=False), \
+                    mock.patch("comment_parser.youtube.selenium_youtube.webdriver.Chrome") as chrome:
+                driver = SeleniumYouTubeParser(storage=object(), lean=lean)._create_driver()
+            arguments = chrome.call_args.kwargs["options"].arguments
+            self.assertEqual(arguments.count("--disable-gpu"), 1)
+            self.assertIn("--window-size={},{}".format(*size), arguments)
+            driver.set_window_size.assert_called_once_with(*size)
+
+
+if __name__ == '__main__':
+    unittest.main()
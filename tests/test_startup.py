@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+MAIN = os.path.join(ROOT, "main.py")
+
+HEAVY_MODULES = ("telethon", "selenium", "undetected_chromedriver", "requests", "pydantic", "googletrans")
+
+# Import time budget for main.py on top of a bare interpreter start, in microseconds.
+IMPORT_BUDGET_US = 150_000
+
+
+def import_times(*args):
+    """Runs python -X importtime and returns {module: self time in us}."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT, capture_output=True, text=True, timeout=60,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(self_us)
+    return result, times
+
+
+class TestStartup(unittest.TestCase):
+    def setUp(self):
+        _, self.baseline = import_times("-c", "pass")
+
+    def assert_fast(self, *args):
+        result, times = import_times(MAIN, *args)
+        loaded = [name for name in times if name.split(".")[0] in HEAVY_MODULES]
+        self.assertEqual(loaded, [], f"heavy modules imported: {loaded}")
+        extra = sum(us for name, us in times.items() if name not in self.baseline)
+        self.assertLess(extra, IMPORT_BUDGET_US, f"main.py imports took {extra} us")
+        return result
+
+    def test_help_is_fast(self):
+        result = self.assert_fast("--help")
+        self.assertEqual(result.returncode, 0)
+        self.assertIn("--platform", result.stdout)
+
+    def test_check_config_is_fast(self):
+        result = self.assert_fast("--platform", "vk", "--owner_id", "-1", "--post_id", "1",
+                                  "--token", "t", "--config", os.devnull, "--check_config")
+        self.assertEqual(result.returncode, 0)
+
+    def test_check_config_reports_problems(self):
+        result = self.assert_fast("--platform", "telegram", "--config", os.devnull, "--check_config")
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("Missing fields for telegram", result.stdout)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,17 +1,16 @@
 import unittest
 import os
 import json
+import tempfile
 from comment_parser.storage.comments_storage import CommentsStorage
 from comment_parser.storage.models import CreateComment
 
 class TestCommentsStorage(unittest.TestCase):
     def setUp(self):
-        # Clear any existing file
-        db_path = os.path.join(os.path.dirname(__file__), "..", "comment_parser", "storage", "comments_db.json")
-        try:
-            os.remove(db_path)
-        except FileNotFoundError:
-            pass
+        # Default data root, pointed at an empty directory
+        self.tmp = tempfile.TemporaryDirectory()
+        self.previous_root = os.environ.get("COMMENTS_DATA_ROOT")
+        os.environ["COMMENTS_DATA_ROOT"] = os.path.join(self.tmp.name, "comments")
         self.storage = CommentsStorage()
 
     def test_create_comment(self):
@@ -46,11 +45,48 @@ class TestCommentsStorage(unittest.TestCase):
             self.fail("No comments found in database")
 
     def tearDown(self):
-        db_path = os.path.join(os.path.dirname(__file__), "..", "comment_parser", "storage", "comments_db.json")
-        try:
-            os.remove(db_path)
-        except FileNotFoundError:
-            pass
+        if self.previous_root is None:
+            os.environ.pop("COMMENTS_DATA_ROOT", None)
+        else:
+            os.environ["COMMENTS_DATA_ROOT"] = self.previous_root
+        self.tmp.cleanup()
+
+class TestCommentsQuery(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = CommentsStorage(db_path=os.path.join(self.tmp.name, "data"))
+        self.storage.create_comments([
+            CreateComment(url="https://vk.com/wall-1_1", content="first", likes=1,
+                          date="2024-01-01 10:00:00", source="vk", author="1"),
+            CreateComment(url="https://vk.com/wall-1_1", content="second", likes=10,
+                          date="2024-02-01 10:00:00", source="vk", author="2"),
+            CreateComment(url="https://youtube.com/watch?v=x", content="third", likes=5,
+                          date="2024-03-01T00:00:00Z", source="youtube", author="2"),
+            CreateComment(url="https://youtube.com/watch?v=x", content="fourth", likes=50,
+                          date="3 weeks ago", source="youtube", author="3"),
+        ])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def contents(self, **filters):
+        return [c["content"] for c in self.storage.iter_comments(**filters)]
+
+    def test_filters(self):
+        self.assertEqual(self.contents(source="vk"), ["first", "second"])
+        self.assertEqual(self.contents(author="2"), ["second", "third"])
+        self.assertEqual(self.contents(url="https://youtube.com/watch?v=x", min_likes=10), ["fourth"])
+        self.assertEqual(self.contents(date_from="2024-01-15", date_to="2024-03-01T00:00:00+00:00"), ["second"])
+
+    def test_projection_and_pagination(self):
+        page = list(self.storage.iter_comments(fields=["content", "likes"], offset=1, limit=2))
+        self.assertEqual(page, [{"content": "second", "likes": 10}, {"content": "third", "likes": 5}])
+
+    def test_get_comment(self):
+        comment_id = next(self.storage.iter_comments(fields=["id"]))["id"]
+        comment = self.storage.get_comment(comment_id)
+        self.assertEqual(comment.content, "first")
+        self.assertEqual(comment.author, "1")
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
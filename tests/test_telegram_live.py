@@ -0,0 +1,213 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from telethon import utils
+from telethon.tl.types import Channel, Message, MessageFwdHeader, MessageReplyHeader, PeerChannel
+
+from comment_parser.storage.comments_storage import CommentsStorage
+from comment_parser.storage.models import CommentRecord
+from comment_parser.telegram.api_telegram import CommentBatcher, TelegramCommentsParser
+
+CHANNEL_ID = 100
+GROUP_ID = 200
+DATE = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+
+
+def group_message(client, message_id, text, reply_to=None, channel_post=None):
+    message = Message(
+        id=message_id, peer_id=PeerChannel(GROUP_ID), date=DATE, message=text,
+        reply_to=MessageReplyHeader(reply_to_msg_id=reply_to) if reply_to else None,
+        fwd_from=MessageFwdHeader(date=DATE, channel_post=channel_post) if channel_post else None,
+    )
+    message._client = client
+    return message
+
+
+class FakeClient:
+    """Discussion group with history, new messages pushed to the registered handler."""
+
+    parse_mode = None
+
+    def __init__(self):
+        self.group = Channel(id=GROUP_ID, title="group", photo=None, date=DATE, megagroup=True)
+        self.messages = {}
+        self.handlers = []
+        self.connected = True
+
+    def post(self, message_id, channel_post):
+        self.messages[message_id] = group_message(self, message_id, f"post {channel_post}", channel_post=channel_post)
+
+    def reply(self, message_id, text, root):
+        self.messages[message_id] = group_message(self, message_id, text, reply_to=root)
+        return self.messages[message_id]
+
+    async def push(self, message):
+        for callback, _ in self.handlers:
+            await callback(SimpleNamespace(chat_id=utils.get_peer_id(self.group), message=message))
+
+    async def __call__(self, request):
+        return SimpleNamespace(full_chat=SimpleNamespace(linked_chat_id=GROUP_ID), chats=[self.group])
+
+    async def get_entity(self, entity):
+        return SimpleNamespace(username="channel", id=CHANNEL_ID)
+
+    async def get_messages(self, group, ids=None, limit=None):
+        if ids is not None:
+            return self.messages.get(ids)
+        return [self.messages[message_id] for message_id in sorted(self.messages, reverse=True)[:limit]]
+
+    async def iter_messages(self, group, min_id=0, reverse=False):
+        for message_id in sorted(self.messages):
+            if message_id > min_id:
+                yield self.messages[message_id]
+
+    def add_event_handler(self, callback, event):
+        self.handlers.append((callback, event))
+
+    def remove_event_handler(self, callback, event):
+        self.handlers.remove((callback, event))
+
+    def is_connected(self):
+        return self.connected
+
+
+def record(content):
+    return CommentRecord(url="u", content=content, likes=0, date="", source="telegram", author="a")
+
+
+class TestCommentBatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = CommentsStorage(db_path=os.path.join(self.tmp.name, "data"), fsync=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_batches_by_size_and_latency(self):
+        flushes = []
+
+        async def run():
+            batcher = CommentBatcher(self.storage, flush_interval=0.1, max_batch=3, on_flush=flushes.append)
+            writer = asyncio.create_task(batcher.run())
+            for i in range(4):
+                batcher.add(1, i + 1, record(f"c{i}"))
+            await asyncio.sleep(0.05)
+            # A full batch does not wait for the interval
+            self.assertEqual(flushes, [{1: 3}])
+            await asyncio.sleep(0.1)
+            self.assertEqual(flushes[-1], {1: 4})
+            batcher.add(2, 7, record("last"))
+            await batcher.close()
+            await writer
+            return batcher.saved
+
+        self.assertEqual(asyncio.run(run()), 5)
+        self.assertEqual(flushes[-1], {1: 4, 2: 7})
+        self.assertEqual(self.storage.last_seq, 3)
+
+
+class TestTelegramLive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = CommentsStorage(db_path=os.path.join(self.tmp.name, "data"), fsync=False)
+        self.state_path = os.path.join(self.tmp.name, "live.json")
+        self.client = FakeClient()
+        self.client.post(1, channel_post=50)
+        self.client.reply(2, "old comment", root=1)
+        self.parser = TelegramCommentsParser(1, "hash", storage=self.storage)
+        self.parser.client = self.client
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def contents(self):
+        return [c["content"] for c in self.storage.iter_comments()]
+
+    def monitor(self, scenario, **kwargs):
+        async def run():
+            stop = asyncio.Event()
+            task = asyncio.create_task(self.parser.monitor(["@channel"], flush_interval=0.05, state_path=self.state_path,
+                                                           check_interval=0.02, stop=stop, **kwargs))
+            await asyncio.sleep(0.05)
+            await scenario()
+            await asyncio.sleep(0.1)
+            stop.set()
+            return await task
+
+        return asyncio.run(run())
+
+    def test_new_comments_are_stored(self):
+        async def scenario():
+            await self.client.push(self.client.reply(3, "new comment", root=1))
+            self.client.post(4, channel_post=51)
+            await self.client.push(self.client.messages[4])
+            await self.client.push(self.client.reply(5, "second post comment", root=4))
+
+        self.assertEqual(self.monitor(scenario), 2)
+        # History is not downloaded on the first run
+        self.assertEqual(self.contents(), ["new comment", "second post comment"])
+        comment = next(self.storage.iter_comments(fields=["url"]))
+        self.assertEqual(comment["url"], "https.t.me/@channel/50?comment=3")
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f), {str(utils.get_peer_id(self.client.group)): 5})
+
+    def test_gap_is_backfilled_after_reconnect(self):
+        async def scenario():
+            await self.client.push(self.client.reply(3, "before drop", root=1))
+            self.client.connected = False
+            await asyncio.sleep(0.05)
+            # Posted while the connection was down: no events for these
+            self.client.reply(4, "missed 1", root=1)
+            self.client.reply(5, "missed 2", root=1)
+            self.client.connected = True
+            await asyncio.sleep(0.05)
+            await self.client.push(self.client.messages[5])
+            await self.client.push(self.client.reply(6, "after", root=1))
+
+        self.assertEqual(self.monitor(scenario), 4)
+        self.assertEqual(sorted(self.contents()), ["after", "before drop", "missed 1", "missed 2"])
+
+    def test_unnoticed_drop_is_backfilled(self):
+        async def scenario():
+            # Lost between two connection checks: is_connected() never reports the drop
+            self.client.reply(3, "missed", root=1)
+            await asyncio.sleep(0.1)
+
+        self.assertEqual(self.monitor(scenario, backfill_interval=0.05), 1)
+        self.assertEqual(self.contents(), ["missed"])
+
+    def test_gap_before_a_live_message_is_backfilled(self):
+        async def scenario():
+            # Lost to an update gap, then a later message gets through and is stored
+            self.client.reply(3, "missed", root=1)
+            await self.client.push(self.client.reply(4, "live after gap", root=1))
+            await asyncio.sleep(0.4)
+            # Found by the periodic backfill, not only by the last one on stop
+            self.assertIn("missed", self.contents())
+
+        self.assertEqual(self.monitor(scenario, backfill_interval=0.2), 2)
+        self.assertEqual(sorted(self.contents()), ["live after gap", "missed"])
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f), {str(utils.get_peer_id(self.client.group)): 4})
+
+    def test_restart_resumes_from_saved_position(self):
+        async def first():
+            await self.client.push(self.client.reply(3, "first run", root=1))
+
+        self.monitor(first)
+        self.client.reply(4, "while stopped", root=1)
+
+        async def nothing():
+            pass
+
+        self.assertEqual(self.monitor(nothing), 1)
+        self.assertEqual(self.contents(), ["first run", "while stopped"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from comment_parser.storage.comments_storage import CommentsStorage
+from comment_parser.storage.models import CreateComment
+from comment_parser.storage.text_index import TextIndex, build_match_query, tokenize
+
+def comment(content, source="vk", date="2024-01-01 10:00:00"):
+    return CreateComment(url="u", content=content, likes=0, date=date, source=source, author="a")
+
+class TestTextIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = TextIndex(os.path.join(self.tmp.name, "index.sqlite"))
+        self.storage = CommentsStorage(db_path=os.path.join(self.tmp.name, "data"), listeners=[self.index])
+        self.storage.create_comments([
+            comment("Отличное видео, спасибо!"),
+            comment("Ёлка на главной площади"),
+            comment("Free money, click here", source="youtube", date="2024-02-01T00:00:00Z"),
+            comment("money is not free", source="youtube", date="2024-03-01T00:00:00Z"),
+        ])
+        self.contents = {c["id"]: c["content"] for c in self.storage.iter_comments()}
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def search(self, query, **filters):
+        return sorted(self.contents[i] for i in self.index.search(query, **filters))
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("Ёлка, HELLO-world_42!"), ["елка", "hello", "world", "42"])
+
+    def test_indexed_on_write(self):
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual(self.search("ВИДЕО"), ["Отличное видео, спасибо!"])
+        self.assertEqual(self.search("елка"), ["Ёлка на главной площади"])
+
+    def test_phrase_and_boolean(self):
+        self.assertEqual(self.search('"free money"'), ["Free money, click here"])
+        self.assertEqual(self.search("free money"), ["Free money, click here", "money is not free"])
+        self.assertEqual(self.search("money -click"), ["money is not free"])
+        self.assertEqual(self.search("click OR спасибо"), ["Free money, click here", "Отличное видео, спасибо!"])
+        with self.assertRaises(ValueError):
+            build_match_query("NOT money")
+
+    def test_filters(self):
+        self.assertEqual(self.search("money", source="vk"), [])
+        self.assertEqual(self.search("money", date_from="2024-02-15"), ["money is not free"])
+
+    def test_build_is_incremental(self):
+        index = TextIndex(os.path.join(self.tmp.name, "rebuilt.sqlite"))
+        self.assertEqual(index.build(self.storage), 4)
+        self.assertEqual(index.build(self.storage), 0)
+        index.close()
+
+    def test_build_matches_listener_dates(self):
+        # Relative dates only resolve to a timestamp when written, build() must use the stored one
+        self.storage.create_comments([comment("relative date", date="3 weeks ago")])
+        index = TextIndex(os.path.join(self.tmp.name, "rebuilt.sqlite"))
+        index.build(self.storage)
+        for filters in ({"date_from": "2024-06-01"}, {"date_to": "2024-06-01"}):
+            self.assertEqual(index.search("relative", **filters), self.index.search("relative", **filters))
+        self.assertEqual(len(index.search("relative", date_from="2024-06-01")), 1)
+        index.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from comment_parser.storage.comments_storage import CommentsStorage
+from comment_parser.storage.models import CreateComment
+from comment_parser.translation.langid import guess_language
+from comment_parser.translation import translator
+from comment_parser.translation.translator import TranslationCache, TranslationService
+
+class StubBackend:
+    def __init__(self):
+        self.calls = []
+
+    def translate_batch(self, texts, target_language):
+        self.calls.append(list(texts))
+        return [f"[{target_language}] {text}" for text in texts]
+
+class SlowBackend(StubBackend):
+    def translate_batch(self, texts, target_language):
+        time.sleep(0.3)
+        return super().translate_batch(texts, target_language)
+
+class FailingBackend:
+    def translate_batch(self, texts, target_language):
+        raise ConnectionError("network down")
+
+class TestTranslationService(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmp.name, "cache.json")
+        self.backend = StubBackend()
+        self.service = TranslationService("ru", backend=self.backend,
+                                          cache=TranslationCache(self.cache_path), batch_size=2)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_guess_language(self):
+        self.assertEqual(guess_language("Привет, как дела?"), "ru")
+        self.assertEqual(guess_language("Це дуже гарне відео"), "uk")
+        self.assertEqual(guess_language("This is the best video I have seen"), "en")
+        self.assertIsNone(guess_language("first!"))
+        self.assertIsNone(guess_language("🔥🔥🔥"))
+
+    def test_batches_and_skips(self):
+        texts = ["first!", "Отличное видео", "🔥🔥", "This is great", "FIRST!", "nice"]
+        result = self.service.translate_batch(texts)
+        self.assertEqual(result[1], "Отличное видео")
+        self.assertEqual(result[2], "🔥🔥")
+        self.assertEqual(result[0], "[ru] first!")
+        self.assertEqual(result[4], "[ru] first!")
+        # "first!" and "FIRST!" share a cache key, so only 3 unique texts in chunks of 2
+        self.assertEqual([len(call) for call in self.backend.calls], [2, 1])
+
+    def test_cache_is_persistent(self):
+        self.service.translate_batch(["first!"])
+        backend = StubBackend()
+        service = TranslationService("ru", backend=backend, cache=TranslationCache(self.cache_path))
+        self.assertEqual(service.translate("First!"), "[ru] first!")
+        self.assertEqual(backend.calls, [])
+
+    def test_default_cache_is_in_data_root(self):
+        root = os.path.join(self.tmp.name, "data")
+        legacy = TranslationCache(os.path.join(self.tmp.name, "legacy.json"))
+        legacy.put("ru:old", "старый")
+        legacy.flush()
+        with mock.patch.dict(os.environ, {"COMMENTS_DATA_ROOT": root}), \
+                mock.patch.object(translator, "LEGACY_CACHE_PATH", legacy.path):
+            service = TranslationService("ru", backend=self.backend)
+            self.assertEqual(service.cache.path, os.path.join(root, "translation_cache.json"))
+            # Entries of the old cache in the package directory are carried over
+            self.assertEqual(service.cache.get("ru:old"), "старый")
+            service.translate("hello")
+            service.cache.flush()
+            self.assertEqual(len(translator.default_cache()), 2)
+
+    def test_cache_is_bounded(self):
+        cache = TranslationCache(max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.put(key, key)
+        cache.get("b")
+        cache.put("d", "d")
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNone(cache.get("c"))
+        self.assertEqual(cache.get("b"), "b")
+
+    def test_backend_errors_keep_original(self):
+        service = TranslationService("ru", backend=FailingBackend(), cache=TranslationCache())
+        self.assertEqual(service.translate("hello there"), "hello there")
+
+    def test_storage_processor(self):
+        db_path = os.path.join(self.tmp.name, "data")
+        storage = CommentsStorage(db_path=db_path, processors=[self.service])
+        saved = storage.create_comments([
+            CreateComment(url="u", content="nice", likes=0, date="", source="test", author="a"),
+            CreateComment(url="u", content="Круто", likes=0, date="", source="test", author="b"),
+        ])
+        self.assertEqual(saved, 2)
+        contents = [c.content for c in storage.get_all_comments()]
+        self.assertEqual(contents, ["[ru] nice", "Круто"])
+
+    def test_writers_translate_in_parallel(self):
+        service = TranslationService("ru", backend=SlowBackend(), cache=TranslationCache())
+        storage = CommentsStorage(db_path=os.path.join(self.tmp.name, "data"), processors=[service], fsync=False)
+        writers = [threading.Thread(target=storage.create_comments, args=([
+            CreateComment(url="u", content=f"comment {i}", likes=0, date="", source="test", author="a")],))
+            for i in range(3)]
+        started = time.monotonic()
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join()
+        # Backend calls overlap instead of queueing behind the storage lock
+        self.assertLess(time.monotonic() - started, 0.8)
+        self.assertEqual(len(storage.get_all_comments()), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,14 +1,24 @@
+import os
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
+from comment_parser.network.http_client import HttpClient
+from comment_parser.storage.comments_storage import CommentsStorage
+from comment_parser.storage.models import CommentRecord
 from comment_parser.vk.api_vk import ApiVKParser
 
 class TestVKParser(unittest.TestCase):
     def setUp(self):
-        self.parser = ApiVKParser()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = CommentsStorage(db_path=os.path.join(self.tmp.name, "data"), fsync=False)
+        self.session = MagicMock()
+        self.parser = ApiVKParser(storage=self.storage, http_client=HttpClient(session=self.session))
 
-    @patch('comment_parser.vk.api_vk.requests.get')
-    def test_parse_comments_success(self, mock_get):
-        mock_response = MagicMock()
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parse_comments_success(self):
+        mock_response = MagicMock(status_code=200)
         mock_response.json.return_value = {
             'response': {
                 'items': [
@@ -22,22 +32,58 @@ class TestVKParser(unittest.TestCase):
                 ]
             }
         }
-        mock_get.return_value = mock_response
+        self.session.get.return_value = mock_response
 
         result = self.parser.parse_comments('123', 'token', 10, '456')
         self.assertIsInstance(result, list)
         self.assertEqual(len(result), 1)
 
-    @patch('comment_parser.vk.api_vk.requests.get')
-    def test_parse_comments_api_error(self, mock_get):
-        mock_response = MagicMock()
+    def test_parse_comments_api_error(self):
+        mock_response = MagicMock(status_code=200)
         mock_response.json.return_value = {
             'error': {'error_msg': 'Invalid token'}
         }
-        mock_get.return_value = mock_response
+        self.session.get.return_value = mock_response
 
         result = self.parser.parse_comments('123', 'invalid_token', 10, '456')
         self.assertIsNone(result)
 
+class TestVKStreaming(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = CommentsStorage(db_path=os.path.join(self.tmp.name, "data"), fsync=False)
+        self.session = MagicMock()
+        self.parser = ApiVKParser(storage=self.storage, http_client=HttpClient(session=self.session))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def fake_get(self, url, params=None, **kwargs):
+        offset = params['offset']
+        items = [{'from_id': i, 'text': f'c{i}', 'date': 0, 'likes': {'count': 1}}
+                 for i in range(offset, min(offset + 100, 250))]
+        response = MagicMock(status_code=200)
+        response.json.return_value = {'response': {'items': items}}
+        return response
+
+    def test_save_json_stores_page_by_page(self):
+        self.session.get.side_effect = self.fake_get
+        with patch.object(self.storage, 'create_comments', wraps=self.storage.create_comments) as create:
+            saved = self.parser.save_json('-1', '2', 'token', '', max_comments=150)
+        self.assertEqual(saved, 150)
+        self.assertEqual(create.call_count, 2)
+        self.assertEqual(len(self.storage.get_all_comments()), 150)
+
+    def test_keeps_progress_on_api_error(self):
+        first_page = self.fake_get(None, {'offset': 0})
+        error = MagicMock(status_code=200)
+        error.json.return_value = {'error': {'error_msg': 'Internal server error'}}
+        self.session.get.side_effect = [first_page, error]
+        self.assertEqual(self.parser.save_json('-1', '2', 'token', ''), 100)
+
+    def test_convert_vk_to_records(self):
+        records = list(self.parser.convert_vk_to_records([{'from_id': 5, 'text': 'hi', 'date': 0}], 'u'))
+        self.assertEqual(records, [CommentRecord(url='u', content='hi', likes=0, date='', source='vk', author='5')])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,118 @@
+import json
+import os
+import tempfile
+import unittest
+
+from comment_parser.storage.comments_storage import CommentsStorage
+from comment_parser.storage.models import CreateComment
+from comment_parser.storage.wal import WriteAheadLog
+
+
+def comments(count, start=0):
+    return [CreateComment(url="u", content=f"c{i}", likes=i, date="", source="vk", author="a")
+            for i in range(start, start + count)]
+
+
+class TestWriteAheadLog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "db.seg.wal")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_replay_after_seq(self):
+        wal = WriteAheadLog(self.path)
+        wal.append(1, [{"id": "a"}])
+        wal.append(2, [{"id": "b"}, {"id": "c"}])
+        entries = list(wal.replay())
+        self.assertEqual([(seq, records) for seq, records, _ in entries],
+                         [(1, [{"id": "a"}]), (2, [{"id": "b"}, {"id": "c"}])])
+        self.assertEqual([seq for seq, _, _ in wal.replay(after_seq=1)], [2])
+        self.assertEqual([seq for seq, _, _ in wal.replay(start=entries[0][2])], [2])
+
+    def test_torn_tail_is_truncated(self):
+        wal = WriteAheadLog(self.path, fsync=False)
+        wal.append(1, [{"id": "a"}])
+        size = wal.size()
+        wal.append(2, [{"id": "b"}])
+        os.truncate(self.path, wal.size() - 3)
+        self.assertEqual([seq for seq, _, _ in wal.replay(truncate=False)], [1])
+        self.assertGreater(wal.size(), size)
+        self.assertEqual([seq for seq, _, _ in wal.replay()], [1])
+        self.assertEqual(wal.size(), size)
+
+
+class TestCrashRecovery(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "db.seg")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def contents(self, storage):
+        return [c["content"] for c in storage.iter_comments()]
+
+    def blocks(self, storage):
+        return sum(len(blocks) for _, blocks in storage._snapshot()[0])
+
+    def test_unclosed_storage_is_replayed(self):
+        storage = CommentsStorage(db_path=self.db_path, block_size=100)
+        storage.create_comments(comments(3))
+        comment_id = next(storage.iter_comments(fields=["id"]))["id"]
+        self.assertEqual(storage.get_comment(comment_id).content, "c0")
+        # No close(): the process "crashed" with everything still in the log
+        recovered = CommentsStorage(db_path=self.db_path, block_size=100)
+        self.assertEqual(self.contents(recovered), ["c0", "c1", "c2"])
+        self.assertEqual(recovered.get_comment(comment_id).content, "c0")
+
+    def test_checkpoint_seals_blocks(self):
+        storage = CommentsStorage(db_path=self.db_path, block_size=4, checkpoint_size=4)
+        storage.create_comments(comments(3))
+        self.assertEqual(self.blocks(storage), 0)
+        storage.create_comments(comments(2, start=3))
+        self.assertEqual(self.blocks(storage), 2)
+        self.assertEqual(storage.wal.size(), 0)
+        storage.create_comments(comments(1, start=5))
+        storage.close()
+        self.assertEqual(self.contents(CommentsStorage(db_path=self.db_path)), [f"c{i}" for i in range(6)])
+
+    def test_interrupted_checkpoint_is_rolled_back(self):
+        storage = CommentsStorage(db_path=self.db_path, block_size=100)
+        storage.create_comments(comments(2))
+        storage.close()
+        storage.create_comments(comments(2, start=2))
+        # Killed after writing the blocks but before committing the checkpoint
+        with storage._locked():
+            storage._seal(storage._tail)
+        recovered = CommentsStorage(db_path=self.db_path, block_size=100)
+        self.assertEqual(self.contents(recovered), ["c0", "c1", "c2", "c3"])
+        self.assertEqual(self.blocks(recovered), 1)
+        recovered.close()
+        self.assertEqual(self.contents(recovered), ["c0", "c1", "c2", "c3"])
+        self.assertEqual(self.blocks(recovered), 2)
+
+    def test_torn_batch_is_dropped(self):
+        storage = CommentsStorage(db_path=self.db_path, block_size=100)
+        storage.create_comments(comments(2))
+        storage.create_comments(comments(2, start=2))
+        os.truncate(storage.wal.path, storage.wal.size() - 1)
+        self.assertEqual(self.contents(CommentsStorage(db_path=self.db_path)), ["c0", "c1"])
+
+    def test_truncated_legacy_json_is_salvaged(self):
+        legacy_path = os.path.join(self.tmp.name, "comments_db.json")
+        records = {f"id-{i}": {"url": "u", "content": f"c{i}", "likes": 0, "date": "", "source": "vk",
+                               "author": "a"} for i in range(5)}
+        raw = json.dumps(records, indent=2)
+        with open(legacy_path, 'w', encoding='utf-8') as f:
+            f.write(raw[:raw.index('"id-3"') + 20])
+        storage = CommentsStorage(db_path=legacy_path)
+        self.assertEqual(self.contents(storage), ["c0", "c1", "c2"])
+        # The original is moved aside, not rewritten
+        self.assertTrue(os.path.isdir(legacy_path))
+        self.assertEqual(os.path.getsize(f"{legacy_path}.legacy"), len(raw[:raw.index('"id-3"') + 20]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,14 +1,23 @@
+import os
+import tempfile
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock
+from comment_parser.network.http_client import HttpClient
+from comment_parser.storage.comments_storage import CommentsStorage
 from comment_parser.youtube.api_youtube import YouTubeAPIParser
 
 class TestYouTubeAPIParser(unittest.TestCase):
     def setUp(self):
-        self.parser = YouTubeAPIParser()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = CommentsStorage(db_path=os.path.join(self.tmp.name, "data"), fsync=False)
+        self.session = MagicMock()
+        self.parser = YouTubeAPIParser(storage=self.storage, http_client=HttpClient(session=self.session))
 
-    @patch('comment_parser.youtube.api_youtube.requests.get')
-    def test_parse_comments_success(self, mock_get):
-        mock_response = MagicMock()
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parse_comments_success(self):
+        mock_response = MagicMock(status_code=200)
         mock_response.json.return_value = {
             'items': [
                 {
@@ -25,19 +34,18 @@ class TestYouTubeAPIParser(unittest.TestCase):
                 }
             ]
         }
-        mock_get.return_value = mock_response
+        self.session.get.return_value = mock_response
 
         result = self.parser.parse_comments('test_video_id', 'api_key', 10)
-        self.assertIsInstance(result, int)
-        self.assertGreaterEqual(result, 0)
+        self.assertEqual(result, 1)
+        self.assertEqual([c['content'] for c in self.storage.iter_comments()], ['Test YouTube comment'])
 
-    @patch('comment_parser.youtube.api_youtube.requests.get')
-    def test_parse_comments_api_error(self, mock_get):
-        mock_response = MagicMock()
+    def test_parse_comments_api_error(self):
+        mock_response = MagicMock(status_code=200)
         mock_response.json.return_value = {
             'error': {'message': 'Invalid API key'}
         }
-        mock_get.return_value = mock_response
+        self.session.get.return_value = mock_response
 
         result = self.parser.parse_comments('test_video_id', 'invalid_key', 10)
         self.assertEqual(result, 0)